@@ -0,0 +1,41 @@
+"""Add document chunks
+
+Revision ID: 002
+Revises: 001
+Create Date: 2024-02-01 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+from pgvector.sqlalchemy import Vector
+import uuid
+
+revision = '002'
+down_revision = '001'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table('document_chunks',
+        sa.Column('id', postgresql.UUID(as_uuid=True), primary_key=True, default=uuid.uuid4),
+        sa.Column('company_id', postgresql.UUID(as_uuid=True), sa.ForeignKey('companies.id', ondelete='CASCADE'), nullable=False),
+        sa.Column('document_id', postgresql.UUID(as_uuid=True), sa.ForeignKey('documents.id', ondelete='CASCADE'), nullable=False),
+        sa.Column('chunk_index', sa.Integer(), nullable=False),
+        sa.Column('content', sa.Text(), nullable=False),
+        sa.Column('start_offset', sa.Integer(), nullable=False),
+        sa.Column('end_offset', sa.Integer(), nullable=False),
+        sa.Column('token_count', sa.Integer(), nullable=False),
+        sa.Column('embedding', Vector(1536), nullable=True),
+        sa.Column('created_at', sa.DateTime(), default=sa.func.now())
+    )
+    
+    op.create_index('ix_document_chunks_company_id', 'document_chunks', ['company_id'])
+    op.create_index('ix_document_chunks_document_id', 'document_chunks', ['document_id'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_document_chunks_document_id')
+    op.drop_index('ix_document_chunks_company_id')
+    op.drop_table('document_chunks')
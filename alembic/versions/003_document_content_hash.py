@@ -0,0 +1,24 @@
+"""Add document content hash
+
+Revision ID: 003
+Revises: 002
+Create Date: 2024-02-08 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = '003'
+down_revision = '002'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column('documents', sa.Column('content_hash', sa.String(64), nullable=True))
+    op.create_index('ix_documents_company_content_hash', 'documents', ['company_id', 'content_hash'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_documents_company_content_hash')
+    op.drop_column('documents', 'content_hash')
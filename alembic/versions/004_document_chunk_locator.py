@@ -0,0 +1,23 @@
+"""Add document chunk locator
+
+Revision ID: 004
+Revises: 003
+Create Date: 2024-02-15 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+revision = '004'
+down_revision = '003'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column('document_chunks', sa.Column('locator', postgresql.JSON(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('document_chunks', 'locator')
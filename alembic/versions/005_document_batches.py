@@ -0,0 +1,45 @@
+"""Add document batches
+
+Revision ID: 005
+Revises: 004
+Create Date: 2024-02-22 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+import uuid
+
+revision = '005'
+down_revision = '004'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table('document_batches',
+        sa.Column('id', postgresql.UUID(as_uuid=True), primary_key=True, default=uuid.uuid4),
+        sa.Column('company_id', postgresql.UUID(as_uuid=True), sa.ForeignKey('companies.id', ondelete='CASCADE'), nullable=False),
+        sa.Column('created_by', postgresql.UUID(as_uuid=True), nullable=True),
+        sa.Column('status', sa.Enum('PROCESSING', 'COMPLETED', name='batchstatus'), nullable=True),
+        sa.Column('total_documents', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('created_at', sa.DateTime(), default=sa.func.now()),
+        sa.Column('completed_at', sa.DateTime(), nullable=True)
+    )
+    op.create_index('ix_document_batches_company_id', 'document_batches', ['company_id'])
+    
+    op.add_column('documents', sa.Column(
+        'batch_id',
+        postgresql.UUID(as_uuid=True),
+        sa.ForeignKey('document_batches.id', ondelete='SET NULL'),
+        nullable=True
+    ))
+    op.create_index('ix_documents_batch_id', 'documents', ['batch_id'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_documents_batch_id')
+    op.drop_column('documents', 'batch_id')
+    op.drop_index('ix_document_batches_company_id')
+    op.drop_table('document_batches')
+    op.execute('DROP TYPE IF EXISTS batchstatus')
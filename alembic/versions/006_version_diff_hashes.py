@@ -0,0 +1,26 @@
+"""Add content hashes for incremental version processing
+
+Revision ID: 006
+Revises: 005
+Create Date: 2024-03-01 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = '006'
+down_revision = '005'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column('document_chunks', sa.Column('content_hash', sa.String(64), nullable=True))
+    op.add_column('knowledge_entries', sa.Column('source_chunk_hash', sa.String(64), nullable=True))
+    op.create_index('ix_knowledge_entries_document_source_hash', 'knowledge_entries', ['document_id', 'source_chunk_hash'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_knowledge_entries_document_source_hash')
+    op.drop_column('knowledge_entries', 'source_chunk_hash')
+    op.drop_column('document_chunks', 'content_hash')
@@ -0,0 +1,32 @@
+"""Add document processing checkpoints
+
+Revision ID: 007
+Revises: 006
+Create Date: 2024-03-08 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+revision = '007'
+down_revision = '006'
+branch_labels = None
+depends_on = None
+
+processing_stage = sa.Enum(
+    'EXTRACTED', 'EMBEDDED', 'CLASSIFIED', 'SUMMARIZED', 'KNOWLEDGE_EXTRACTED', 'COMPLETED',
+    name='processingstage'
+)
+
+
+def upgrade() -> None:
+    processing_stage.create(op.get_bind(), checkfirst=True)
+    op.add_column('documents', sa.Column('processing_stage', processing_stage, nullable=True))
+    op.add_column('documents', sa.Column('stage_outputs', postgresql.JSON(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('documents', 'stage_outputs')
+    op.drop_column('documents', 'processing_stage')
+    processing_stage.drop(op.get_bind(), checkfirst=True)
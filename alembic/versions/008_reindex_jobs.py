@@ -0,0 +1,40 @@
+"""Add reindex jobs
+
+Revision ID: 008
+Revises: 007
+Create Date: 2024-03-15 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+import uuid
+
+revision = '008'
+down_revision = '007'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table('reindex_jobs',
+        sa.Column('id', postgresql.UUID(as_uuid=True), primary_key=True, default=uuid.uuid4),
+        sa.Column('model_name', sa.String(), nullable=False),
+        sa.Column('dimension', sa.Integer(), nullable=True),
+        sa.Column('status', sa.Enum('PENDING', 'RUNNING', 'READY', 'COMPLETED', 'FAILED', name='reindexstatus'), nullable=True),
+        sa.Column('auto_cutover', sa.Boolean(), default=False),
+        sa.Column('checkpoint', postgresql.JSON(), nullable=True),
+        sa.Column('rows_total', sa.Integer(), default=0),
+        sa.Column('rows_done', sa.Integer(), default=0),
+        sa.Column('rows_per_second', sa.Float(), nullable=True),
+        sa.Column('eta_seconds', sa.Float(), nullable=True),
+        sa.Column('error', sa.Text(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), default=sa.func.now()),
+        sa.Column('updated_at', sa.DateTime(), default=sa.func.now()),
+        sa.Column('completed_at', sa.DateTime(), nullable=True)
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('reindex_jobs')
+    op.execute('DROP TYPE IF EXISTS reindexstatus')
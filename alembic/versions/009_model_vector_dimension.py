@@ -0,0 +1,63 @@
+"""Size embedding columns from the configured model and record them
+
+Revision ID: 009
+Revises: 008
+Create Date: 2024-03-22 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+import uuid
+from app.core.config import settings
+from app.core.vectors import EMBEDDING_DIMENSION, EMBEDDING_STORAGE, vector_sql_type
+
+revision = '009'
+down_revision = '008'
+branch_labels = None
+depends_on = None
+
+VECTOR_TABLES = ('document_chunks', 'knowledge_entries', 'documents')
+
+
+def upgrade() -> None:
+    embedding_columns = op.create_table('embedding_columns',
+        sa.Column('id', postgresql.UUID(as_uuid=True), primary_key=True, default=uuid.uuid4),
+        sa.Column('table_name', sa.String(), nullable=False),
+        sa.Column('column_name', sa.String(), nullable=False),
+        sa.Column('model_name', sa.String(), nullable=False),
+        sa.Column('dimension', sa.Integer(), nullable=False),
+        sa.Column('storage', sa.String(), nullable=False),
+        sa.Column('created_at', sa.DateTime(), default=sa.func.now()),
+        sa.Column('updated_at', sa.DateTime(), default=sa.func.now()),
+        sa.UniqueConstraint('table_name', 'column_name', name='uq_embedding_columns_table_column')
+    )
+
+    # Vectors of another width cannot be cast; they are cleared and need a reindex
+    for table in VECTOR_TABLES:
+        op.execute(f"""
+            ALTER TABLE {table} ALTER COLUMN embedding TYPE {vector_sql_type()}
+            USING CASE WHEN vector_dims(embedding) = {EMBEDDING_DIMENSION}
+                       THEN embedding::{vector_sql_type()} END
+        """)
+
+    op.bulk_insert(embedding_columns, [
+        {
+            'id': uuid.uuid4(),
+            'table_name': table,
+            'column_name': 'embedding',
+            'model_name': settings.HUGGINGFACE_MODEL,
+            'dimension': EMBEDDING_DIMENSION,
+            'storage': EMBEDDING_STORAGE.value
+        }
+        for table in VECTOR_TABLES
+    ])
+
+
+def downgrade() -> None:
+    for table in VECTOR_TABLES:
+        op.execute(f"""
+            ALTER TABLE {table} ALTER COLUMN embedding TYPE vector(1536)
+            USING CASE WHEN vector_dims(embedding) = 1536 THEN embedding::vector(1536) END
+        """)
+    op.drop_table('embedding_columns')
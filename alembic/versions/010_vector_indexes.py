@@ -0,0 +1,34 @@
+"""Add ANN indexes on embedding columns
+
+Revision ID: 010
+Revises: 009
+Create Date: 2024-03-29 00:00:00.000000
+
+"""
+from alembic import op
+from app.core.config import settings
+from app.core.vectors import vector_index_sql, binary_index_sql
+
+revision = '010'
+down_revision = '009'
+branch_labels = None
+depends_on = None
+
+VECTOR_TABLES = ('document_chunks', 'knowledge_entries', 'documents')
+
+
+def upgrade() -> None:
+    # CONCURRENTLY so existing tenants keep writing while the graphs build
+    with op.get_context().autocommit_block():
+        op.execute(f"SET maintenance_work_mem = '{settings.VECTOR_INDEX_MAINTENANCE_WORK_MEM}'")
+        for table in VECTOR_TABLES:
+            op.execute(vector_index_sql(table, f'ix_{table}_embedding'))
+            # Built regardless of EMBEDDING_BINARY_RESCORE, which is only read at query time
+            op.execute(binary_index_sql(table, f'ix_{table}_embedding_binary'))
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for table in VECTOR_TABLES:
+            op.execute(f'DROP INDEX CONCURRENTLY IF EXISTS ix_{table}_embedding_binary')
+            op.execute(f'DROP INDEX CONCURRENTLY IF EXISTS ix_{table}_embedding')
@@ -0,0 +1,44 @@
+"""Add full-text search vectors to knowledge entries and chunks
+
+Revision ID: 011
+Revises: 010
+Create Date: 2024-04-05 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+from app.core.config import settings
+
+revision = '011'
+down_revision = '010'
+branch_labels = None
+depends_on = None
+
+CONFIG = settings.FULLTEXT_SEARCH_CONFIG
+
+
+def upgrade() -> None:
+    op.add_column('knowledge_entries', sa.Column(
+        'search_vector',
+        postgresql.TSVECTOR(),
+        sa.Computed(
+            f"setweight(to_tsvector('{CONFIG}', coalesce(title, '')), 'A') || "
+            f"setweight(to_tsvector('{CONFIG}', coalesce(content, '')), 'B')",
+            persisted=True
+        )
+    ))
+    op.add_column('document_chunks', sa.Column(
+        'search_vector',
+        postgresql.TSVECTOR(),
+        sa.Computed(f"to_tsvector('{CONFIG}', content)", persisted=True)
+    ))
+    op.create_index('ix_knowledge_entries_search_vector', 'knowledge_entries', ['search_vector'], postgresql_using='gin')
+    op.create_index('ix_document_chunks_search_vector', 'document_chunks', ['search_vector'], postgresql_using='gin')
+
+
+def downgrade() -> None:
+    op.drop_index('ix_document_chunks_search_vector')
+    op.drop_index('ix_knowledge_entries_search_vector')
+    op.drop_column('document_chunks', 'search_vector')
+    op.drop_column('knowledge_entries', 'search_vector')
@@ -0,0 +1,30 @@
+"""Build the binary-quantized indexes skipped when 010 ran with rescoring off
+
+Revision ID: 012
+Revises: 011
+Create Date: 2024-04-12 00:00:00.000000
+
+"""
+from alembic import op
+from app.core.config import settings
+from app.core.vectors import binary_index_sql
+
+revision = '012'
+down_revision = '011'
+branch_labels = None
+depends_on = None
+
+VECTOR_TABLES = ('document_chunks', 'knowledge_entries', 'documents')
+
+
+def upgrade() -> None:
+    # IF NOT EXISTS makes this a no-op where 010 already built them
+    with op.get_context().autocommit_block():
+        op.execute(f"SET maintenance_work_mem = '{settings.VECTOR_INDEX_MAINTENANCE_WORK_MEM}'")
+        for table in VECTOR_TABLES:
+            op.execute(binary_index_sql(table, f'ix_{table}_embedding_binary'))
+
+
+def downgrade() -> None:
+    # 010 owns these indexes now, so they stay
+    pass
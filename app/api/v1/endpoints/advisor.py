@@ -1,11 +1,18 @@
+import asyncio
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import text
 from app.core.database import get_db
 from app.api.dependencies import get_current_active_user
 from app.models.user import User
 from app.schemas.knowledge import AdvisorQuery
 from app.services.ai_service import answer_query, generate_embedding
+from app.core.config import settings
+from app.services.retrieval import (
+    search_knowledge_entries,
+    search_chunks,
+    hybrid_search_knowledge_entries,
+    hybrid_search_chunks
+)
 
 router = APIRouter()
 
@@ -21,37 +28,43 @@ async def ask_advisor(
     
     query_embedding = await generate_embedding(query_data.query)
     
-    sql = text("""
-        SELECT id, title, content, knowledge_type, risk_level, deadline,
-               embedding <=> :query_embedding as distance
-        FROM knowledge_entries
-        WHERE company_id = :company_id AND is_active = true
-        ORDER BY distance
-        LIMIT :limit
-    """)
+    search_options = {"ef_search": query_data.ef_search, "probes": query_data.probes}
+    if settings.HYBRID_SEARCH_ENABLED:
+        # Lexical matches catch invoice numbers, tax IDs and clause references embeddings blur
+        relevant_entries, relevant_chunks = await asyncio.gather(
+            hybrid_search_knowledge_entries(
+                current_user.company_id, query_data.query, query_embedding, query_data.context_limit,
+                **search_options
+            ),
+            hybrid_search_chunks(
+                current_user.company_id, query_data.query, query_embedding, query_data.context_limit,
+                **search_options
+            )
+        )
+    else:
+        relevant_entries = await search_knowledge_entries(
+            db, current_user.company_id, query_embedding, query_data.context_limit, **search_options
+        )
+        relevant_chunks = await search_chunks(
+            db, current_user.company_id, query_embedding, query_data.context_limit, **search_options
+        )
     
-    result = await db.execute(
-        sql,
-        {
-            "query_embedding": str(query_embedding),
-            "company_id": str(current_user.company_id),
-            "limit": query_data.context_limit
-        }
-    )
-    
-    relevant_entries = result.fetchall()
-    
-    if not relevant_entries:
+    if not relevant_entries and not relevant_chunks:
         return {
             "query": query_data.query,
             "answer": "I don't have enough information to answer this question. Please upload relevant documents first.",
             "sources": []
         }
     
-    context = "\n\n".join([
-        f"[{entry.knowledge_type}] {entry.title}: {entry.content}"
-        for entry in relevant_entries
-    ])
+    context = "\n\n".join(
+        [
+            f"[{entry.knowledge_type}] {entry.title}: {entry.content}"
+            for entry in relevant_entries
+        ] + [
+            f"[excerpt from {chunk.original_filename}] {chunk.content}"
+            for chunk in relevant_chunks
+        ]
+    )
     
     answer = await answer_query(query_data.query, context)
     
@@ -66,5 +79,17 @@ async def ask_advisor(
                 "risk_level": entry.risk_level
             }
             for entry in relevant_entries
+        ] + [
+            {
+                "id": str(chunk.id),
+                "title": chunk.original_filename,
+                "type": "document_chunk",
+                "document_id": str(chunk.document_id),
+                "chunk_index": chunk.chunk_index,
+                "start_offset": chunk.start_offset,
+                "end_offset": chunk.end_offset,
+                "locator": chunk.locator
+            }
+            for chunk in relevant_chunks
         ]
     }
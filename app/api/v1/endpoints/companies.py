@@ -9,6 +9,7 @@ from app.models.user import User, UserRole
 from app.models.company import Company
 from app.models.document import Document
 from app.schemas.company import CompanyCreate, CompanyUpdate, CompanyResponse
+from app.services.tenant_vector_cache import bump_tenant_version
 
 router = APIRouter()
 
@@ -106,6 +107,8 @@ async def delete_company(
     
     await db.delete(company)
     await db.commit()
+    # Knowledge entries went with the company; drop its cached matrix on every worker
+    await bump_tenant_version(company_id)
 
 
 @router.get("/{company_id}/stats")
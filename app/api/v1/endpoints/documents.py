@@ -1,20 +1,80 @@
-from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, status
+from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Query, status
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, text
-from typing import List, Optional
+from sqlalchemy import select, func, text, update
+from typing import List, Optional, Dict, Any, BinaryIO
 from datetime import datetime
+import asyncio
+import mimetypes
+import os
 import uuid
+import zipfile
 from app.core.database import get_db
-from app.api.dependencies import get_current_active_user
-from app.models.user import User
+from app.api.dependencies import get_current_active_user, require_role
+from app.models.user import User, UserRole
 from app.models.document import Document, DocumentStatus, DocumentType
-from app.schemas.document import DocumentResponse, DocumentUpdate
+from app.models.document_batch import DocumentBatch, BatchStatus
+from app.schemas.document import DocumentResponse, DocumentUpdate, DocumentBatchResponse, DocumentRedriveRequest
 from app.tasks.document_tasks import process_document_task
+from app.services.bulk_writer import bulk_insert
+from app.services.task_queues import enqueue_bulk
+from app.services.deduplication import find_stored_files_by_hash
+from app.services.versioning import find_newer_version
+from app.services.s3_service import upload_fileobj, delete_file
+from app.utils.streams import CountingReader, UploadTooLargeError
 from app.core.config import settings
 
 router = APIRouter()
 
 
+def _extension(filename: str) -> str:
+    return f".{filename.split('.')[-1]}" if '.' in filename else ""
+
+
+async def _store_upload(
+    current_user: User,
+    document_id: uuid.UUID,
+    filename: str,
+    file_obj: BinaryIO,
+    mime_type: str,
+    max_bytes: int
+) -> Dict[str, Any]:
+    file_key = f"{current_user.company_id}/{document_id}/{filename}"
+    
+    # Stream the upload straight into object storage; only the key goes through the broker
+    reader = CountingReader(file_obj, max_bytes=max_bytes)
+    try:
+        stored = await upload_fileobj(reader, file_key, mime_type)
+    except UploadTooLargeError:
+        await delete_file(file_key)
+        raise HTTPException(status_code=400, detail=f"File too large: {filename}")
+    
+    if not stored:
+        raise HTTPException(status_code=502, detail=f"Failed to store file: {filename}")
+    
+    return {
+        "id": document_id,
+        "company_id": current_user.company_id,
+        "filename": file_key,
+        "original_filename": filename,
+        "file_path": file_key,
+        "file_size": reader.bytes_read,
+        "mime_type": mime_type,
+        "content_hash": reader.sha256,
+        "uploaded_by": current_user.id,
+        "status": DocumentStatus.UPLOADED
+    }
+
+
+async def _reuse_stored_objects(db: AsyncSession, company_id: uuid.UUID, rows: List[Dict[str, Any]]):
+    # Identical content already stored for this company (or earlier in the same batch): keep a single object
+    existing = await find_stored_files_by_hash(db, company_id, {row["content_hash"] for row in rows})
+    for row in rows:
+        file_key = existing.setdefault(row["content_hash"], row["file_path"])
+        if file_key != row["file_path"]:
+            await delete_file(row["file_path"])
+            row["filename"] = row["file_path"] = file_key
+
+
 @router.post("/upload", response_model=DocumentResponse, status_code=status.HTTP_201_CREATED)
 async def upload_document(
     file: UploadFile = File(...),
@@ -24,40 +84,193 @@ async def upload_document(
     if not current_user.company_id:
         raise HTTPException(status_code=400, detail="User must belong to a company")
     
-    file_ext = f".{file.filename.split('.')[-1]}" if '.' in file.filename else ""
-    if file_ext not in settings.allowed_extensions_list:
+    if _extension(file.filename) not in settings.allowed_extensions_list:
         raise HTTPException(status_code=400, detail="File type not allowed")
     
-    file_content = await file.read()
-    file_size = len(file_content)
-    
-    if file_size > settings.MAX_UPLOAD_SIZE_MB * 1024 * 1024:
+    max_bytes = settings.MAX_UPLOAD_SIZE_MB * 1024 * 1024
+    if file.size is not None and file.size > max_bytes:
         raise HTTPException(status_code=400, detail="File too large")
     
     document_id = uuid.uuid4()
-    file_key = f"{current_user.company_id}/{document_id}/{file.filename}"
+    mime_type = file.content_type or "application/octet-stream"
+    values = await _store_upload(current_user, document_id, file.filename, file.file, mime_type, max_bytes)
+    await _reuse_stored_objects(db, current_user.company_id, [values])
+    file_key = values["file_path"]
     
-    document = Document(
-        id=document_id,
-        company_id=current_user.company_id,
-        filename=file_key,
-        original_filename=file.filename,
-        file_path=file_key,
-        file_size=file_size,
-        mime_type=file.content_type or "application/octet-stream",
-        uploaded_by=current_user.id,
-        status=DocumentStatus.UPLOADED
-    )
+    document = Document(**values)
     
     db.add(document)
     await db.commit()
     await db.refresh(document)
     
-    process_document_task.delay(str(document.id), file_content, file.content_type)
+    process_document_task.delay(str(document.id), file_key)
     
     return document
 
 
+def _iter_batch_entries(files: List[UploadFile]):
+    # Yields (filename, declared size, opener, mime type); zip archives are expanded member by member
+    for file in files:
+        if _extension(file.filename).lower() == ".zip":
+            try:
+                archive = zipfile.ZipFile(file.file)
+            except zipfile.BadZipFile:
+                raise HTTPException(status_code=400, detail=f"Invalid zip archive: {file.filename}")
+            for info in archive.infolist():
+                name = os.path.basename(info.filename)
+                if info.is_dir() or not name or name.startswith(".") or info.filename.startswith("__MACOSX/"):
+                    continue
+                mime_type = mimetypes.guess_type(name)[0] or "application/octet-stream"
+                yield name, info.file_size, lambda info=info, archive=archive: archive.open(info), mime_type
+        else:
+            mime_type = file.content_type or "application/octet-stream"
+            yield file.filename, file.size, lambda file=file: file.file, mime_type
+
+
+@router.post("/batch", response_model=DocumentBatchResponse, status_code=status.HTTP_201_CREATED)
+async def upload_document_batch(
+    files: List[UploadFile] = File(...),
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    if not current_user.company_id:
+        raise HTTPException(status_code=400, detail="User must belong to a company")
+    
+    max_bytes = settings.MAX_UPLOAD_SIZE_MB * 1024 * 1024
+    entries = list(_iter_batch_entries(files))
+    if not entries:
+        raise HTTPException(status_code=400, detail="No files in batch")
+    if len(entries) > settings.BATCH_MAX_FILES:
+        raise HTTPException(status_code=400, detail=f"Batch exceeds {settings.BATCH_MAX_FILES} files")
+    for filename, size, _, _ in entries:
+        if _extension(filename) not in settings.allowed_extensions_list:
+            raise HTTPException(status_code=400, detail=f"File type not allowed: {filename}")
+        if size is not None and size > max_bytes:
+            raise HTTPException(status_code=400, detail=f"File too large: {filename}")
+    
+    limiter = asyncio.Semaphore(settings.BATCH_UPLOAD_CONCURRENCY)
+    
+    async def store(filename, open_entry, mime_type):
+        async with limiter:
+            file_obj = open_entry()
+            try:
+                return await _store_upload(current_user, uuid.uuid4(), filename, file_obj, mime_type, max_bytes)
+            finally:
+                if isinstance(file_obj, zipfile.ZipExtFile):
+                    file_obj.close()
+    
+    results = await asyncio.gather(
+        *(store(filename, open_entry, mime_type) for filename, _, open_entry, mime_type in entries),
+        return_exceptions=True
+    )
+    rows = [result for result in results if isinstance(result, dict)]
+    errors = [result for result in results if isinstance(result, BaseException)]
+    if errors:
+        # All-or-nothing: drop what was already stored before reporting the first failure
+        await asyncio.gather(*(delete_file(row["file_path"]) for row in rows))
+        raise errors[0]
+    
+    await _reuse_stored_objects(db, current_user.company_id, rows)
+    
+    batch = DocumentBatch(
+        company_id=current_user.company_id,
+        created_by=current_user.id,
+        status=BatchStatus.PROCESSING,
+        total_documents=len(rows)
+    )
+    db.add(batch)
+    await db.flush()
+    
+    # One multi-row insert for the whole batch instead of a commit per file
+    await bulk_insert(db, Document, [{**row, "batch_id": batch.id} for row in rows])
+    await db.commit()
+    
+    # Bulk work goes through the per-tenant fair queue; the last document to finish completes the batch
+    await enqueue_bulk(
+        process_document_task.name,
+        [(current_user.company_id, [str(row["id"]), row["file_path"]]) for row in rows]
+    )
+    
+    return DocumentBatchResponse(
+        id=batch.id,
+        status=batch.status,
+        total_documents=batch.total_documents,
+        status_counts={DocumentStatus.UPLOADED.value: len(rows)},
+        completed_documents=0,
+        created_at=batch.created_at,
+        completed_at=batch.completed_at
+    )
+
+
+@router.post("/redrive")
+async def redrive_failed_documents(
+    request: DocumentRedriveRequest,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(require_role([UserRole.SUPER_ADMIN, UserRole.ADMIN]))
+):
+    filters = [Document.status == DocumentStatus.FAILED]
+    if current_user.role != UserRole.SUPER_ADMIN:
+        filters.append(Document.company_id == current_user.company_id)
+    if request.document_ids:
+        filters.append(Document.id.in_(request.document_ids))
+    
+    result = await db.execute(
+        select(Document).where(*filters).order_by(Document.created_at.asc()).limit(request.limit)
+    )
+    documents = result.scalars().all()
+    
+    # Checkpointed stage outputs are kept, so each document resumes at its first incomplete stage
+    for document in documents:
+        document.status = DocumentStatus.UPLOADED
+    # A completed batch is finalized only once, so reopen it for its redriven documents to count again
+    batch_ids = {document.batch_id for document in documents if document.batch_id is not None}
+    if batch_ids:
+        await db.execute(
+            update(DocumentBatch)
+            .where(DocumentBatch.id.in_(batch_ids))
+            .values(status=BatchStatus.PROCESSING, completed_at=None)
+        )
+    await db.commit()
+    
+    await enqueue_bulk(
+        process_document_task.name,
+        [(document.company_id, [str(document.id), document.file_path]) for document in documents]
+    )
+    
+    return {
+        "redriven": len(documents),
+        "document_ids": [str(document.id) for document in documents]
+    }
+
+
+@router.get("/batches/{batch_id}", response_model=DocumentBatchResponse)
+async def get_document_batch(
+    batch_id: uuid.UUID,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    batch = await db.get(DocumentBatch, batch_id)
+    if not batch or batch.company_id != current_user.company_id:
+        raise HTTPException(status_code=404, detail="Batch not found")
+    
+    result = await db.execute(
+        select(Document.status, func.count())
+        .where(Document.batch_id == batch_id)
+        .group_by(Document.status)
+    )
+    status_counts = {document_status.value: count for document_status, count in result.all()}
+    
+    return DocumentBatchResponse(
+        id=batch.id,
+        status=batch.status,
+        total_documents=batch.total_documents,
+        status_counts=status_counts,
+        completed_documents=status_counts.get(DocumentStatus.PROCESSED.value, 0) + status_counts.get(DocumentStatus.FAILED.value, 0),
+        created_at=batch.created_at,
+        completed_at=batch.completed_at
+    )
+
+
 @router.get("/", response_model=List[DocumentResponse])
 async def list_documents(
     skip: int = 0,
@@ -106,7 +319,8 @@ async def update_document(
     if not document or document.company_id != current_user.company_id:
         raise HTTPException(status_code=404, detail="Document not found")
     
-    for field, value in update_data.model_dump(exclude_unset=True).items():
+    # by_alias maps "metadata" onto the model's metadata_ attribute
+    for field, value in update_data.model_dump(exclude_unset=True, by_alias=True).items():
         setattr(document, field, value)
     
     await db.commit()
@@ -114,6 +328,53 @@ async def update_document(
     return document
 
 
+@router.post("/{document_id}/versions", response_model=DocumentResponse, status_code=status.HTTP_201_CREATED)
+async def upload_document_version(
+    document_id: uuid.UUID,
+    file: UploadFile = File(...),
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    parent = await db.get(Document, document_id)
+    if not parent or parent.company_id != current_user.company_id:
+        raise HTTPException(status_code=404, detail="Document not found")
+    
+    # Versions form a chain so each one can be diffed against its direct predecessor
+    newer = await find_newer_version(db, parent.id)
+    if newer is not None:
+        raise HTTPException(
+            status_code=409,
+            detail=f"Document already has a newer version: {newer.id}"
+        )
+    
+    if _extension(file.filename) not in settings.allowed_extensions_list:
+        raise HTTPException(status_code=400, detail="File type not allowed")
+    
+    max_bytes = settings.MAX_UPLOAD_SIZE_MB * 1024 * 1024
+    if file.size is not None and file.size > max_bytes:
+        raise HTTPException(status_code=400, detail="File too large")
+    
+    mime_type = file.content_type or "application/octet-stream"
+    values = await _store_upload(current_user, uuid.uuid4(), file.filename, file.file, mime_type, max_bytes)
+    await _reuse_stored_objects(db, current_user.company_id, [values])
+    
+    document = Document(
+        **values,
+        parent_id=parent.id,
+        version=(parent.version or 1) + 1,
+        document_type=parent.document_type,
+        tags=parent.tags
+    )
+    
+    db.add(document)
+    await db.commit()
+    await db.refresh(document)
+    
+    process_document_task.delay(str(document.id), values["file_path"])
+    
+    return document
+
+
 @router.post("/search")
 async def search_documents(
     query: str,
@@ -123,11 +384,13 @@ async def search_documents(
     date_from: Optional[datetime] = None,
     date_to: Optional[datetime] = None,
     limit: int = 50,
+    ef_search: Optional[int] = Query(default=None, ge=1, le=1000),
+    probes: Optional[int] = Query(default=None, ge=1, le=1000),
     db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_active_user)
 ):
-    from sqlalchemy import or_, text
     from app.services.ai_service import generate_embedding
+    from app.services.retrieval import search_documents_by_chunks
     
     if not current_user.company_id:
         raise HTTPException(status_code=400, detail="User must belong to a company")
@@ -147,30 +410,26 @@ async def search_documents(
     if date_to:
         filters.append(Document.created_at <= date_to)
     
-    # Semantic search with embeddings
+    # Semantic search over document chunks
     if query:
         query_embedding = await generate_embedding(query)
         
-        sql = text("""
-            SELECT id, filename, original_filename, document_type, status, 
-                   created_at, embedding <=> :query_embedding as distance
-            FROM documents
-            WHERE company_id = :company_id
-            ORDER BY distance
-            LIMIT :limit
-        """)
-        
-        result = await db.execute(
-            sql,
+        documents = await search_documents_by_chunks(
+            db, current_user.company_id, query_embedding, limit,
+            ef_search=ef_search, probes=probes
+        )
+        return [
             {
-                "query_embedding": str(query_embedding),
-                "company_id": str(current_user.company_id),
-                "limit": limit
+                "id": str(doc.id),
+                "filename": doc.filename,
+                "type": doc.document_type,
+                "distance": doc.distance,
+                "chunk_index": doc.chunk_index,
+                "locator": doc.locator,
+                "snippet": doc.content
             }
-        )
-        
-        documents = result.fetchall()
-        return [{"id": str(doc.id), "filename": doc.filename, "type": doc.document_type, "distance": doc.distance} for doc in documents]
+            for doc in documents
+        ]
     
     # Regular filtered search
     result = await db.execute(
@@ -0,0 +1,26 @@
+from fastapi import APIRouter, Depends
+from typing import Dict, Any
+from app.api.dependencies import require_role
+from app.models.user import User, UserRole
+
+router = APIRouter()
+
+
+@router.get("/metrics")
+async def get_system_metrics(
+    current_user: User = Depends(require_role([UserRole.SUPER_ADMIN]))
+) -> Dict[str, Any]:
+    from app.services.ai_service import embedding_engine, embedding_cache, llm_cache, rate_limiter
+    from app.services import classification
+    from app.services.task_queues import queue_stats
+    from app.services.tenant_vector_cache import tenant_vector_cache
+    
+    return {
+        "embedding_engine": embedding_engine.stats(),
+        "embedding_cache": embedding_cache.stats(),
+        "llm_cache": llm_cache.stats(),
+        "groq_rate_limiter": rate_limiter.stats(),
+        "classification": classification.stats(),
+        "queues": await queue_stats(),
+        "tenant_vector_cache": tenant_vector_cache.stats()
+    }
@@ -1,5 +1,5 @@
 from fastapi import APIRouter
-from app.api.v1.endpoints import auth, documents, advisor, analytics
+from app.api.v1.endpoints import auth, documents, advisor, analytics, system
 
 api_router = APIRouter()
 
@@ -7,3 +7,4 @@ api_router.include_router(auth.router, prefix="/auth", tags=["Authentication"])
 api_router.include_router(documents.router, prefix="/documents", tags=["Documents"])
 api_router.include_router(advisor.router, prefix="/advisor", tags=["AI Advisor"])
 api_router.include_router(analytics.router, prefix="/analytics", tags=["Analytics"])
+api_router.include_router(system.router, prefix="/system", tags=["System"])
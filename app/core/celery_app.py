@@ -1,6 +1,11 @@
 from celery import Celery
+from kombu import Queue
 from app.core.config import settings
 
+QUEUE_INTERACTIVE = "interactive"
+QUEUE_BULK = "bulk"
+QUEUE_SCHEDULED = "scheduled"
+
 celery_app = Celery(
     "sme_kb_worker",
     broker=settings.CELERY_BROKER_URL,
@@ -9,6 +14,8 @@ celery_app = Celery(
         "app.tasks.document_tasks",
         "app.tasks.notification_tasks",
         "app.tasks.ai_tasks",
+        "app.tasks.queue_tasks",
+        "app.tasks.reindex_tasks",
     ]
 )
 
@@ -21,6 +28,17 @@ celery_app.conf.update(
     task_track_started=True,
     task_time_limit=30 * 60,
     task_soft_time_limit=25 * 60,
+    # Separate queues so backfills and periodic jobs never sit in front of user uploads
+    task_queues=(Queue(QUEUE_INTERACTIVE), Queue(QUEUE_BULK), Queue(QUEUE_SCHEDULED)),
+    task_default_queue=QUEUE_INTERACTIVE,
+    task_routes={
+        "app.tasks.notification_tasks.*": {"queue": QUEUE_SCHEDULED},
+        "app.tasks.queue_tasks.*": {"queue": QUEUE_SCHEDULED},
+        "app.tasks.ai_tasks.*": {"queue": QUEUE_BULK},
+        "app.tasks.reindex_tasks.*": {"queue": QUEUE_BULK},
+    },
+    worker_prefetch_multiplier=1,
+    task_acks_late=True,
 )
 
 celery_app.conf.beat_schedule = {
@@ -32,4 +50,15 @@ celery_app.conf.beat_schedule = {
         "task": "app.tasks.notification_tasks.check_expiring_contracts",
         "schedule": 86400.0,
     },
+    "pump-bulk-queue": {
+        "task": "app.tasks.queue_tasks.pump_bulk_queue",
+        "schedule": settings.BULK_QUEUE_PUMP_INTERVAL_SECONDS,
+    },
+    "ensure-tenant-vector-indexes": {
+        "task": "app.tasks.reindex_tasks.ensure_tenant_vector_indexes",
+        "schedule": 86400.0,
+    },
 }
+
+# Registers the per-process event loop, DB pool and Redis setup
+import app.core.worker_runtime  # noqa: E402,F401
@@ -1,5 +1,5 @@
 from pydantic_settings import BaseSettings
-from typing import List
+from typing import List, Optional
 from functools import lru_cache
 
 
@@ -18,23 +18,117 @@ class Settings(BaseSettings):
     DATABASE_URL: str
     DATABASE_POOL_SIZE: int = 20
     DATABASE_MAX_OVERFLOW: int = 10
+    BULK_INSERT_BATCH_SIZE: int = 500
+    BULK_COPY_MIN_ROWS: int = 200
     
     REDIS_URL: str
     REDIS_CACHE_TTL: int = 3600
     
     CELERY_BROKER_URL: str
     CELERY_RESULT_BACKEND: str
+    BULK_QUEUE_TARGET_DEPTH: int = 8
+    BULK_QUEUE_PUMP_INTERVAL_SECONDS: float = 5.0
     
     AWS_ACCESS_KEY_ID: str
     AWS_SECRET_ACCESS_KEY: str
     AWS_REGION: str = "us-east-1"
     S3_BUCKET_NAME: str
+    S3_MAX_POOL_CONNECTIONS: int = 32
+    S3_EXECUTOR_WORKERS: int = 16
+    S3_MULTIPART_THRESHOLD_MB: int = 8
+    S3_MULTIPART_CHUNKSIZE_MB: int = 8
+    S3_MULTIPART_CONCURRENCY: int = 8
+    
+    STORAGE_BACKEND: str = "s3"
+    LOCAL_STORAGE_PATH: str = "/app/uploads"
     
     GROQ_API_KEY: str
     GROQ_MODEL: str = "llama-3.1-70b-versatile"
+    GROQ_REQUESTS_PER_MINUTE: int = 30
+    GROQ_TOKENS_PER_MINUTE: int = 20000
+    GROQ_TIMEOUT_SECONDS: float = 60.0
+    GROQ_MAX_RETRIES: int = 5
+    GROQ_BACKOFF_BASE_SECONDS: float = 1.0
+    GROQ_BACKOFF_MAX_SECONDS: float = 30.0
+    GROQ_MAX_CONCURRENCY: int = 8
+    GROQ_LATENCY_TARGET_SECONDS: float = 20.0
+    LLM_CACHE_ENABLED: bool = True
+    LLM_CACHE_MAX_TEMPERATURE: float = 0.3
+    LLM_CACHE_DETERMINISTIC_TEMPERATURE: float = 0.1
+    LLM_CACHE_TTL: int = 86400
+    LLM_CACHE_DETERMINISTIC_TTL: int = 30 * 86400
+    LLM_CACHE_MAX_ENTRY_BYTES: int = 64 * 1024
+    LLM_CACHE_MAX_BYTES: int = 256 * 1024 * 1024
+    LLM_CACHE_EVICT_TO_RATIO: float = 0.9
+    LLM_MAP_CHUNK_TOKENS: int = 650
+    LLM_MAP_OVERLAP_TOKENS: int = 50
+    LLM_MAP_MIN_CHUNK_TOKENS: int = 250
+    LLM_MAP_CONCURRENCY: int = 4
     HUGGINGFACE_MODEL: str = "sentence-transformers/all-MiniLM-L6-v2"
+    EMBEDDING_DIMENSION: Optional[int] = None
+    EMBEDDING_STORAGE: str = "vector"
+    EMBEDDING_BINARY_RESCORE: bool = False
+    EMBEDDING_RESCORE_OVERSAMPLE: int = 8
+    VECTOR_INDEX_TYPE: str = "hnsw"
+    HNSW_M: int = 16
+    HNSW_EF_CONSTRUCTION: int = 64
+    HNSW_EF_SEARCH: int = 40
+    HNSW_MAX_SCAN_TUPLES: int = 20000
+    IVFFLAT_LISTS: int = 100
+    IVFFLAT_PROBES: int = 10
+    VECTOR_ITERATIVE_SCAN: str = "relaxed_order"
+    VECTOR_TENANT_INDEX_MIN_ROWS: int = 50000
+    VECTOR_INDEX_MAINTENANCE_WORK_MEM: str = "512MB"
+    VECTOR_INDEX_BUILD_TIME_LIMIT_SECONDS: int = 6 * 3600
+    FULLTEXT_SEARCH_CONFIG: str = "simple"
+    HYBRID_SEARCH_ENABLED: bool = True
+    HYBRID_CANDIDATE_MULTIPLIER: int = 4
+    RRF_K: int = 60
+    VECTOR_CACHE_ENABLED: bool = False
+    VECTOR_CACHE_MAX_BYTES: int = 256 * 1024 * 1024
+    VECTOR_CACHE_MAX_TENANT_ROWS: int = 20000
+    VECTOR_CACHE_MAX_AGE_SECONDS: float = 300.0
+    EMBEDDING_BATCH_SIZE: int = 32
+    EMBEDDING_MAX_BATCH_SIZE: int = 64
+    EMBEDDING_MAX_WAIT_MS: float = 5.0
+    EMBEDDING_CACHE_LOCAL_SIZE: int = 10000
+    EMBEDDING_CACHE_TTL: int = 7 * 86400
+    REINDEX_BATCH_SIZE: int = 512
+    REINDEX_TASK_SLICE_SECONDS: float = 20 * 60
+    REINDEX_CUTOVER_LOCK_TIMEOUT_MS: int = 5000
+    API_WARM_UP_MODELS: bool = False
+    WORKER_WARM_UP_MODELS: bool = True
+    
+    PIPELINE_MAX_CONCURRENCY: int = 4
+    DOCUMENT_TASK_MAX_RETRIES: int = 3
+    DOCUMENT_TASK_RETRY_BACKOFF_SECONDS: int = 30
+    DOCUMENT_PARENT_WAIT_SECONDS: int = 30
+    DOCUMENT_PARENT_WAIT_MAX_INTERVAL_SECONDS: int = 300
+    DOCUMENT_PARENT_WAIT_TIMEOUT_SECONDS: int = 6 * 3600
+    
+    LOCAL_CLASSIFIER_MODEL_PATH: str = "models/custom_classifier.pkl"
+    KEYWORD_CLASSIFIER_PATH: str = "models/keyword_classifier.json"
+    LOCAL_CLASSIFIER_CONFIDENCE_THRESHOLD: float = 0.6
+    LOCAL_CLASSIFIER_PREVIEW_CHARS: int = 3000
+    
+    # Chunk sizes count whitespace words, not model tokens. The default chunk is capped at
+    # (EMBEDDING_MAX_SEQ_LENGTH - 2) / CHUNK_WORDPIECES_PER_WORD words so the encoder, which
+    # truncates at its max_seq_length in WordPieces, sees the whole chunk
+    CHUNK_MAX_TOKENS: int = 200
+    CHUNK_OVERLAP_TOKENS: int = 40
+    CHUNK_WORDPIECES_PER_WORD: float = 1.5
+    EMBEDDING_MAX_SEQ_LENGTH: int = 256
+    CHUNK_SEARCH_OVERSAMPLE: int = 4
     
     MAX_UPLOAD_SIZE_MB: int = 50
+    BATCH_MAX_FILES: int = 500
+    BATCH_UPLOAD_CONCURRENCY: int = 8
+    DOWNLOAD_SPOOL_MAX_MB: int = 8
+    EXTRACT_BLOCK_CHARS: int = 4000
+    PDF_MAX_PAGES: int = 300
+    PDF_PAGE_TIMEOUT_SECONDS: float = 20.0
+    PDF_PAGES_PER_TASK: int = 8
+    PDF_EXTRACTION_WORKERS: int = 4
     ALLOWED_EXTENSIONS: str = ".pdf,.docx,.xlsx,.doc,.xls,.txt"
     
     SMTP_HOST: str = "smtp.gmail.com"
@@ -2,12 +2,17 @@ from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, async_sess
 from sqlalchemy.orm import declarative_base
 from app.core.config import settings
 
-engine = create_async_engine(
-    settings.DATABASE_URL,
-    pool_size=settings.DATABASE_POOL_SIZE,
-    max_overflow=settings.DATABASE_MAX_OVERFLOW,
-    echo=settings.DEBUG,
-)
+
+def _create_engine():
+    return create_async_engine(
+        settings.DATABASE_URL,
+        pool_size=settings.DATABASE_POOL_SIZE,
+        max_overflow=settings.DATABASE_MAX_OVERFLOW,
+        echo=settings.DEBUG,
+    )
+
+
+engine = _create_engine()
 
 AsyncSessionLocal = async_sessionmaker(
     engine,
@@ -20,6 +25,15 @@ AsyncSessionLocal = async_sessionmaker(
 Base = declarative_base()
 
 
+def configure_engine():
+    # Gives a forked worker its own pool; inherited asyncpg connections belong to the parent's loop
+    global engine
+    engine.sync_engine.dispose(close=False)
+    engine = _create_engine()
+    AsyncSessionLocal.configure(bind=engine)
+    return engine
+
+
 async def get_db() -> AsyncSession:
     async with AsyncSessionLocal() as session:
         try:
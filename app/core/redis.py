@@ -3,22 +3,33 @@ from typing import Optional
 from app.core.config import settings
 
 redis_client: Optional[aioredis.Redis] = None
+redis_binary_client: Optional[aioredis.Redis] = None
 
 
 async def get_redis() -> aioredis.Redis:
     return redis_client
 
 
+async def get_redis_binary() -> aioredis.Redis:
+    return redis_binary_client
+
+
 async def init_redis():
-    global redis_client
+    global redis_client, redis_binary_client
     redis_client = await aioredis.from_url(
         settings.REDIS_URL,
         encoding="utf-8",
         decode_responses=True
     )
+    redis_binary_client = await aioredis.from_url(
+        settings.REDIS_URL,
+        decode_responses=False
+    )
 
 
 async def close_redis():
-    global redis_client
+    global redis_client, redis_binary_client
     if redis_client:
         await redis_client.close()
+    if redis_binary_client:
+        await redis_binary_client.close()
@@ -0,0 +1,84 @@
+import enum
+from typing import Optional
+from pgvector.sqlalchemy import Vector, HALFVEC
+from app.core.config import settings
+
+# Output width of the embedding models we ship configs for; others need EMBEDDING_DIMENSION
+KNOWN_MODEL_DIMENSIONS = {
+    "sentence-transformers/all-MiniLM-L6-v2": 384,
+    "sentence-transformers/all-MiniLM-L12-v2": 384,
+    "sentence-transformers/paraphrase-multilingual-MiniLM-L12-v2": 384,
+    "sentence-transformers/all-mpnet-base-v2": 768,
+    "sentence-transformers/paraphrase-multilingual-mpnet-base-v2": 768,
+    "BAAI/bge-small-en-v1.5": 384,
+    "BAAI/bge-base-en-v1.5": 768,
+    "BAAI/bge-large-en-v1.5": 1024,
+    "intfloat/multilingual-e5-small": 384,
+    "intfloat/multilingual-e5-base": 768,
+    "intfloat/multilingual-e5-large": 1024,
+}
+
+
+class VectorStorage(str, enum.Enum):
+    FULL = "vector"
+    HALF = "halfvec"
+
+
+def model_dimension(model_name: Optional[str] = None) -> int:
+    model_name = model_name or settings.HUGGINGFACE_MODEL
+    if model_name == settings.HUGGINGFACE_MODEL and settings.EMBEDDING_DIMENSION:
+        return settings.EMBEDDING_DIMENSION
+    if model_name not in KNOWN_MODEL_DIMENSIONS:
+        raise ValueError(f"Unknown embedding dimension for {model_name}; set EMBEDDING_DIMENSION")
+    return KNOWN_MODEL_DIMENSIONS[model_name]
+
+
+EMBEDDING_DIMENSION = model_dimension()
+EMBEDDING_STORAGE = VectorStorage(settings.EMBEDDING_STORAGE)
+
+
+def embedding_column_type(dimension: int = EMBEDDING_DIMENSION):
+    # halfvec halves heap and index size; pgvector >= 0.7 on the server
+    if EMBEDDING_STORAGE == VectorStorage.HALF:
+        return HALFVEC(dimension)
+    return Vector(dimension)
+
+
+def vector_sql_type(dimension: int = EMBEDDING_DIMENSION) -> str:
+    return f"{EMBEDDING_STORAGE.value}({dimension})"
+
+
+def query_vector_sql(param: str = "query_embedding") -> str:
+    return f"CAST(:{param} AS {vector_sql_type()})"
+
+
+def binary_candidates_sql(table: str, where: str, param: str = "query_embedding") -> str:
+    # Hamming distance over sign bits picks candidates cheaply; callers rescore them with <=>
+    return f"""
+        SELECT id FROM {table}
+        WHERE {where}
+        ORDER BY binary_quantize(embedding)::bit({EMBEDDING_DIMENSION}) <~> binary_quantize({query_vector_sql(param)})
+        LIMIT :rescore_candidates
+    """
+
+
+def vector_index_sql(table: str, name: str, column: str = "embedding", where: Optional[str] = None) -> str:
+    operator_class = f"{EMBEDDING_STORAGE.value}_cosine_ops"
+    if settings.VECTOR_INDEX_TYPE == "ivfflat":
+        method, options = "ivfflat", f"lists = {settings.IVFFLAT_LISTS}"
+    else:
+        method, options = "hnsw", f"m = {settings.HNSW_M}, ef_construction = {settings.HNSW_EF_CONSTRUCTION}"
+    statement = (
+        f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {name} ON {table} "
+        f"USING {method} ({column} {operator_class}) WITH ({options})"
+    )
+    return f"{statement} WHERE {where}" if where else statement
+
+
+def binary_index_sql(table: str, name: str, column: str = "embedding", dimension: int = EMBEDDING_DIMENSION) -> str:
+    # Must match the expression binary_candidates_sql orders by
+    return (
+        f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {name} ON {table} "
+        f"USING hnsw ((binary_quantize({column})::bit({dimension})) bit_hamming_ops) "
+        f"WITH (m = {settings.HNSW_M}, ef_construction = {settings.HNSW_EF_CONSTRUCTION})"
+    )
@@ -0,0 +1,81 @@
+import asyncio
+import os
+from typing import Any, Coroutine, Optional
+from celery.signals import worker_process_init, worker_process_shutdown
+from app.core import database
+from app.core.config import settings
+from app.core.redis import init_redis, close_redis
+
+_loop: Optional[asyncio.AbstractEventLoop] = None
+_loop_pid: Optional[int] = None
+_started_pid: Optional[int] = None
+
+
+def get_loop() -> asyncio.AbstractEventLoop:
+    # One loop per worker process so pooled DB, Redis and HTTP connections survive between tasks
+    global _loop, _loop_pid
+    if _loop is None or _loop.is_closed() or _loop_pid != os.getpid():
+        _loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(_loop)
+        _loop_pid = os.getpid()
+    return _loop
+
+
+async def _startup():
+    database.configure_engine()
+    await init_redis()
+
+
+async def _shutdown():
+    await close_redis()
+    await database.engine.dispose()
+
+
+def _ensure_started():
+    global _started_pid
+    if _started_pid != os.getpid():
+        _started_pid = os.getpid()
+        get_loop().run_until_complete(_startup())
+
+
+def _cancel_pending(loop: asyncio.AbstractEventLoop):
+    tasks = [task for task in asyncio.all_tasks(loop) if not task.done()]
+    for task in tasks:
+        task.cancel()
+    if tasks:
+        loop.run_until_complete(asyncio.gather(*tasks, return_exceptions=True))
+
+
+def run_async(coro: Coroutine[Any, Any, Any]) -> Any:
+    _ensure_started()
+    loop = get_loop()
+    task = loop.create_task(coro)
+    try:
+        return loop.run_until_complete(task)
+    except BaseException:
+        # A soft time limit raises out of the loop while the task waits on I/O; left
+        # pending it would resume inside the next task's run and keep writing
+        _cancel_pending(loop)
+        raise
+
+
+@worker_process_init.connect
+def init_worker_process(**kwargs):
+    _ensure_started()
+    if settings.WORKER_WARM_UP_MODELS:
+        # Load models before the first task instead of inside it
+        from app.services.ai_service import warm_up
+        from app.services.ml_service import get_local_classifier
+        warm_up()
+        get_local_classifier(settings.LOCAL_CLASSIFIER_MODEL_PATH, settings.KEYWORD_CLASSIFIER_PATH)
+
+
+@worker_process_shutdown.connect
+def shutdown_worker_process(**kwargs):
+    if _started_pid != os.getpid():
+        return
+    loop = get_loop()
+    try:
+        loop.run_until_complete(_shutdown())
+    finally:
+        loop.close()
@@ -1,14 +1,22 @@
+import asyncio
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from contextlib import asynccontextmanager
 from app.core.config import settings
 from app.core.redis import init_redis, close_redis
+from app.core.database import AsyncSessionLocal
+from app.services.vector_storage import verify_embedding_columns
 from app.api.v1.router import api_router
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     await init_redis()
+    async with AsyncSessionLocal() as db:
+        await verify_embedding_columns(db)
+    if settings.API_WARM_UP_MODELS:
+        from app.services.ai_service import warm_up
+        await asyncio.to_thread(warm_up)
     yield
     await close_redis()
 
@@ -1,15 +1,23 @@
 from app.models.user import User, UserRole
 from app.models.company import Company
-from app.models.document import Document, DocumentType, DocumentStatus
+from app.models.document import Document, DocumentType, DocumentStatus, ProcessingStage
+from app.models.document_chunk import DocumentChunk
+from app.models.document_batch import DocumentBatch, BatchStatus
 from app.models.knowledge_entry import KnowledgeEntry, KnowledgeType, RiskLevel
 from app.models.notification import Notification, NotificationType
 from app.models.audit_log import AuditLog
+from app.models.reindex_job import ReindexJob, ReindexStatus
+from app.models.embedding_column import EmbeddingColumn
 
 __all__ = [
     "User", "UserRole",
     "Company",
-    "Document", "DocumentType", "DocumentStatus",
+    "Document", "DocumentType", "DocumentStatus", "ProcessingStage",
+    "DocumentChunk",
+    "DocumentBatch", "BatchStatus",
     "KnowledgeEntry", "KnowledgeType", "RiskLevel",
     "Notification", "NotificationType",
-    "AuditLog"
+    "AuditLog",
+    "ReindexJob", "ReindexStatus",
+    "EmbeddingColumn"
 ]
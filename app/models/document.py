@@ -1,11 +1,11 @@
-from sqlalchemy import Column, String, DateTime, ForeignKey, Integer, Enum as SQLEnum, JSON, Text
+from sqlalchemy import Column, String, DateTime, ForeignKey, Integer, Enum as SQLEnum, JSON, Text, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.dialects.postgresql import UUID
-from pgvector.sqlalchemy import Vector
 from datetime import datetime
 import uuid
 import enum
 from app.core.database import Base
+from app.core.vectors import embedding_column_type
 
 
 class DocumentType(str, enum.Enum):
@@ -26,8 +26,20 @@ class DocumentStatus(str, enum.Enum):
     FAILED = "failed"
 
 
+class ProcessingStage(str, enum.Enum):
+    EXTRACTED = "extracted"
+    EMBEDDED = "embedded"
+    CLASSIFIED = "classified"
+    SUMMARIZED = "summarized"
+    KNOWLEDGE_EXTRACTED = "knowledge_extracted"
+    COMPLETED = "completed"
+
+
 class Document(Base):
     __tablename__ = "documents"
+    __table_args__ = (
+        Index("ix_documents_company_content_hash", "company_id", "content_hash"),
+    )
     
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     company_id = Column(UUID(as_uuid=True), ForeignKey("companies.id", ondelete="CASCADE"), nullable=False)
@@ -36,20 +48,27 @@ class Document(Base):
     file_path = Column(String, nullable=False)
     file_size = Column(Integer, nullable=False)
     mime_type = Column(String, nullable=False)
+    content_hash = Column(String(64), nullable=True)
     document_type = Column(SQLEnum(DocumentType), default=DocumentType.OTHER)
     status = Column(SQLEnum(DocumentStatus), default=DocumentStatus.UPLOADED)
+    processing_stage = Column(SQLEnum(ProcessingStage), nullable=True)
+    stage_outputs = Column(JSON, default={})
     version = Column(Integer, default=1)
     parent_id = Column(UUID(as_uuid=True), ForeignKey("documents.id"), nullable=True)
+    batch_id = Column(UUID(as_uuid=True), ForeignKey("document_batches.id", ondelete="SET NULL"), nullable=True, index=True)
     extracted_text = Column(Text, nullable=True)
     summary = Column(Text, nullable=True)
-    metadata = Column(JSON, default={})
+    # "metadata" is reserved on declarative models; the column keeps its name
+    metadata_ = Column("metadata", JSON, default={})
     tags = Column(JSON, default=[])
-    embedding = Column(Vector(1536), nullable=True)
+    embedding = Column(embedding_column_type(), nullable=True)
     uploaded_by = Column(UUID(as_uuid=True), nullable=True)
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     processed_at = Column(DateTime, nullable=True)
     
     company = relationship("Company", back_populates="documents")
+    batch = relationship("DocumentBatch", back_populates="documents")
     knowledge_entries = relationship("KnowledgeEntry", back_populates="document", cascade="all, delete-orphan")
+    chunks = relationship("DocumentChunk", back_populates="document", cascade="all, delete-orphan", order_by="DocumentChunk.chunk_index")
     versions = relationship("Document", backref="parent", remote_side=[id])
@@ -0,0 +1,26 @@
+from sqlalchemy import Column, DateTime, ForeignKey, Integer, Enum as SQLEnum
+from sqlalchemy.orm import relationship
+from sqlalchemy.dialects.postgresql import UUID
+from datetime import datetime
+import uuid
+import enum
+from app.core.database import Base
+
+
+class BatchStatus(str, enum.Enum):
+    PROCESSING = "processing"
+    COMPLETED = "completed"
+
+
+class DocumentBatch(Base):
+    __tablename__ = "document_batches"
+
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    company_id = Column(UUID(as_uuid=True), ForeignKey("companies.id", ondelete="CASCADE"), nullable=False, index=True)
+    created_by = Column(UUID(as_uuid=True), nullable=True)
+    status = Column(SQLEnum(BatchStatus), default=BatchStatus.PROCESSING)
+    total_documents = Column(Integer, nullable=False, default=0)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    completed_at = Column(DateTime, nullable=True)
+
+    documents = relationship("Document", back_populates="batch")
@@ -0,0 +1,33 @@
+from sqlalchemy import Column, DateTime, ForeignKey, Integer, String, Text, JSON, Index, Computed
+from sqlalchemy.orm import relationship
+from sqlalchemy.dialects.postgresql import UUID, TSVECTOR
+from datetime import datetime
+import uuid
+from app.core.config import settings
+from app.core.database import Base
+from app.core.vectors import embedding_column_type
+
+
+class DocumentChunk(Base):
+    __tablename__ = "document_chunks"
+    __table_args__ = (
+        Index("ix_document_chunks_search_vector", "search_vector", postgresql_using="gin"),
+    )
+
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    company_id = Column(UUID(as_uuid=True), ForeignKey("companies.id", ondelete="CASCADE"), nullable=False, index=True)
+    document_id = Column(UUID(as_uuid=True), ForeignKey("documents.id", ondelete="CASCADE"), nullable=False, index=True)
+    chunk_index = Column(Integer, nullable=False)
+    content = Column(Text, nullable=False)
+    start_offset = Column(Integer, nullable=False)
+    end_offset = Column(Integer, nullable=False)
+    token_count = Column(Integer, nullable=False)
+    content_hash = Column(String(64), nullable=True)
+    locator = Column(JSON, default={})
+    embedding = Column(embedding_column_type(), nullable=True)
+    search_vector = Column(TSVECTOR, Computed(
+        f"to_tsvector('{settings.FULLTEXT_SEARCH_CONFIG}', content)", persisted=True
+    ))
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+    document = relationship("Document", back_populates="chunks")
@@ -0,0 +1,21 @@
+from sqlalchemy import Column, String, DateTime, Integer, UniqueConstraint
+from sqlalchemy.dialects.postgresql import UUID
+from datetime import datetime
+import uuid
+from app.core.database import Base
+
+
+class EmbeddingColumn(Base):
+    __tablename__ = "embedding_columns"
+    __table_args__ = (
+        UniqueConstraint("table_name", "column_name", name="uq_embedding_columns_table_column"),
+    )
+
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    table_name = Column(String, nullable=False)
+    column_name = Column(String, nullable=False, default="embedding")
+    model_name = Column(String, nullable=False)
+    dimension = Column(Integer, nullable=False)
+    storage = Column(String, nullable=False)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
@@ -1,11 +1,12 @@
-from sqlalchemy import Column, String, DateTime, ForeignKey, Text, JSON, Enum as SQLEnum, Boolean
+from sqlalchemy import Column, String, DateTime, ForeignKey, Text, JSON, Enum as SQLEnum, Boolean, Index, Computed
 from sqlalchemy.orm import relationship
-from sqlalchemy.dialects.postgresql import UUID
-from pgvector.sqlalchemy import Vector
+from sqlalchemy.dialects.postgresql import UUID, TSVECTOR
 from datetime import datetime
 import uuid
 import enum
+from app.core.config import settings
 from app.core.database import Base
+from app.core.vectors import embedding_column_type
 
 
 class KnowledgeType(str, enum.Enum):
@@ -26,6 +27,10 @@ class RiskLevel(str, enum.Enum):
 
 class KnowledgeEntry(Base):
     __tablename__ = "knowledge_entries"
+    __table_args__ = (
+        Index("ix_knowledge_entries_document_source_hash", "document_id", "source_chunk_hash"),
+        Index("ix_knowledge_entries_search_vector", "search_vector", postgresql_using="gin"),
+    )
     
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     company_id = Column(UUID(as_uuid=True), ForeignKey("companies.id", ondelete="CASCADE"), nullable=False)
@@ -35,9 +40,16 @@ class KnowledgeEntry(Base):
     content = Column(Text, nullable=False)
     risk_level = Column(SQLEnum(RiskLevel), nullable=True)
     deadline = Column(DateTime, nullable=True)
-    metadata = Column(JSON, default={})
+    # "metadata" is reserved on declarative models; the column keeps its name
+    metadata_ = Column("metadata", JSON, default={})
     tags = Column(JSON, default=[])
-    embedding = Column(Vector(1536), nullable=True)
+    embedding = Column(embedding_column_type(), nullable=True)
+    source_chunk_hash = Column(String(64), nullable=True)
+    search_vector = Column(TSVECTOR, Computed(
+        f"setweight(to_tsvector('{settings.FULLTEXT_SEARCH_CONFIG}', coalesce(title, '')), 'A') || "
+        f"setweight(to_tsvector('{settings.FULLTEXT_SEARCH_CONFIG}', coalesce(content, '')), 'B')",
+        persisted=True
+    ))
     is_active = Column(Boolean, default=True)
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
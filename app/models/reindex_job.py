@@ -0,0 +1,33 @@
+from sqlalchemy import Column, String, DateTime, Integer, Float, Text, JSON, Boolean, Enum as SQLEnum
+from sqlalchemy.dialects.postgresql import UUID
+from datetime import datetime
+import uuid
+import enum
+from app.core.database import Base
+
+
+class ReindexStatus(str, enum.Enum):
+    PENDING = "pending"
+    RUNNING = "running"
+    READY = "ready"
+    COMPLETED = "completed"
+    FAILED = "failed"
+
+
+class ReindexJob(Base):
+    __tablename__ = "reindex_jobs"
+
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    model_name = Column(String, nullable=False)
+    dimension = Column(Integer, nullable=True)
+    status = Column(SQLEnum(ReindexStatus), default=ReindexStatus.PENDING)
+    auto_cutover = Column(Boolean, default=False)
+    checkpoint = Column(JSON, default={})
+    rows_total = Column(Integer, default=0)
+    rows_done = Column(Integer, default=0)
+    rows_per_second = Column(Float, nullable=True)
+    eta_seconds = Column(Float, nullable=True)
+    error = Column(Text, nullable=True)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    completed_at = Column(DateTime, nullable=True)
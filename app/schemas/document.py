@@ -1,7 +1,8 @@
-from pydantic import BaseModel, UUID4
+from pydantic import AliasChoices, BaseModel, Field, UUID4
 from datetime import datetime
 from typing import Optional, List, Dict, Any
-from app.models.document import DocumentType, DocumentStatus
+from app.models.document import DocumentType, DocumentStatus, ProcessingStage
+from app.models.document_batch import BatchStatus
 
 
 class DocumentBase(BaseModel):
@@ -12,7 +13,7 @@ class DocumentBase(BaseModel):
 class DocumentUpdate(BaseModel):
     document_type: Optional[DocumentType] = None
     tags: Optional[List[str]] = None
-    metadata: Optional[Dict[str, Any]] = None
+    metadata: Optional[Dict[str, Any]] = Field(default=None, serialization_alias="metadata_")
 
 
 class DocumentResponse(DocumentBase):
@@ -22,12 +23,28 @@ class DocumentResponse(DocumentBase):
     file_size: int
     mime_type: str
     status: DocumentStatus
+    processing_stage: Optional[ProcessingStage] = None
     version: int
     summary: Optional[str]
     tags: List[str]
-    metadata: Dict[str, Any]
+    metadata: Dict[str, Any] = Field(validation_alias=AliasChoices("metadata_", "metadata"))
     created_at: datetime
     processed_at: Optional[datetime]
     
     class Config:
         from_attributes = True
+
+
+class DocumentBatchResponse(BaseModel):
+    id: UUID4
+    status: BatchStatus
+    total_documents: int
+    status_counts: Dict[str, int]
+    completed_documents: int
+    created_at: datetime
+    completed_at: Optional[datetime]
+
+
+class DocumentRedriveRequest(BaseModel):
+    document_ids: Optional[List[UUID4]] = None
+    limit: int = 100
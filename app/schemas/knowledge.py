@@ -1,4 +1,4 @@
-from pydantic import BaseModel, UUID4
+from pydantic import AliasChoices, BaseModel, UUID4, Field
 from datetime import datetime
 from typing import Optional, List, Dict, Any
 from app.models.knowledge_entry import KnowledgeType, RiskLevel
@@ -17,7 +17,7 @@ class KnowledgeEntryResponse(KnowledgeEntryBase):
     company_id: UUID4
     document_id: Optional[UUID4]
     tags: List[str]
-    metadata: Dict[str, Any]
+    metadata: Dict[str, Any] = Field(validation_alias=AliasChoices("metadata_", "metadata"))
     is_active: bool
     created_at: datetime
     
@@ -28,3 +28,6 @@ class KnowledgeEntryResponse(KnowledgeEntryBase):
 class AdvisorQuery(BaseModel):
     query: str
     context_limit: int = 5
+    # Per-request recall/latency trade-off; server defaults when omitted
+    ef_search: Optional[int] = Field(default=None, ge=1, le=1000)
+    probes: Optional[int] = Field(default=None, ge=1, le=1000)
@@ -1,32 +1,239 @@
 from groq import AsyncGroq
-from sentence_transformers import SentenceTransformer
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional, Callable, Awaitable
 from app.core.config import settings
+from app.core.vectors import EMBEDDING_DIMENSION
+from app.services.embedding_engine import EmbeddingEngine
+from app.services.embedding_cache import EmbeddingCache
+from app.services.llm_cache import LLMResponseCache
+from app.services.chunking import chunk_text, content_defined_windows
+from app.services.rate_limiter import GroqRateLimiter, estimate_tokens
+import asyncio
 import json
+import threading
+import time
 
-client = AsyncGroq(api_key=settings.GROQ_API_KEY)
-embedding_model = SentenceTransformer(settings.HUGGINGFACE_MODEL)
+KNOWLEDGE_KEYS = ("obligations", "deadlines", "risks", "metrics")
+
+_client: Optional[AsyncGroq] = None
+_embedding_model = None
+# Separate locks so a chat call never waits behind the embedding model's first load
+_client_lock = threading.Lock()
+_model_lock = threading.Lock()
+
+
+def get_client() -> AsyncGroq:
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                # Retries and timeouts are owned by the rate limiter so every attempt is budgeted
+                _client = AsyncGroq(
+                    api_key=settings.GROQ_API_KEY,
+                    max_retries=0,
+                    timeout=settings.GROQ_TIMEOUT_SECONDS
+                )
+    return _client
+
+
+def get_embedding_model():
+    # Loaded on first use so importing this module (API, tests, beat) stays cheap
+    global _embedding_model
+    if _embedding_model is None:
+        with _model_lock:
+            if _embedding_model is None:
+                from sentence_transformers import SentenceTransformer
+                model = SentenceTransformer(settings.HUGGINGFACE_MODEL)
+                if model.get_sentence_embedding_dimension() != EMBEDDING_DIMENSION:
+                    raise ValueError(
+                        f"{settings.HUGGINGFACE_MODEL} produces {model.get_sentence_embedding_dimension()}-dimension "
+                        f"vectors but the embedding columns hold {EMBEDDING_DIMENSION}"
+                    )
+                if model.max_seq_length < settings.EMBEDDING_MAX_SEQ_LENGTH:
+                    # Chunks are sized for EMBEDDING_MAX_SEQ_LENGTH; a shorter window would cut their tails
+                    raise ValueError(
+                        f"{settings.HUGGINGFACE_MODEL} reads {model.max_seq_length} tokens per input but chunks "
+                        f"are sized for EMBEDDING_MAX_SEQ_LENGTH={settings.EMBEDDING_MAX_SEQ_LENGTH}"
+                    )
+                _embedding_model = model
+    return _embedding_model
+
+
+def warm_up():
+    get_client()
+    get_embedding_model().encode(["warm up"], convert_to_numpy=True)
+
+
+embedding_engine = EmbeddingEngine(
+    encode=lambda texts: get_embedding_model().encode(
+        texts,
+        batch_size=settings.EMBEDDING_BATCH_SIZE,
+        convert_to_numpy=True
+    ),
+    max_batch_size=settings.EMBEDDING_MAX_BATCH_SIZE,
+    max_wait_ms=settings.EMBEDDING_MAX_WAIT_MS
+)
+
+embedding_cache = EmbeddingCache(
+    model_name=settings.HUGGINGFACE_MODEL,
+    max_local_entries=settings.EMBEDDING_CACHE_LOCAL_SIZE,
+    ttl=settings.EMBEDDING_CACHE_TTL
+)
+
+llm_cache = LLMResponseCache()
+rate_limiter = GroqRateLimiter()
 
 
 async def generate_embedding(text: str) -> List[float]:
-    embedding = embedding_model.encode(text, convert_to_tensor=False)
-    return embedding.tolist()
+    embeddings = await generate_embeddings([text])
+    return embeddings[0]
+
+
+async def generate_embeddings(texts: List[str]) -> List[List[float]]:
+    if not texts:
+        return []
+    
+    embeddings = await embedding_cache.get_many(texts)
+    missing = [i for i, embedding in enumerate(embeddings) if embedding is None]
+    
+    if missing:
+        unique_texts = list(dict.fromkeys(texts[i] for i in missing))
+        encoded = await embedding_engine.embed(unique_texts)
+        await embedding_cache.set_many(unique_texts, encoded)
+        
+        encoded_by_text = dict(zip(unique_texts, encoded))
+        for i in missing:
+            embeddings[i] = encoded_by_text[texts[i]]
+    
+    return embeddings
+
+
+async def _chat(
+    system_prompt: str,
+    user_prompt: str,
+    max_tokens: int,
+    temperature: float,
+    use_cache: Optional[bool] = None
+) -> str:
+    cache_enabled = llm_cache.should_cache(temperature) if use_cache is None else use_cache
+    if cache_enabled:
+        cache_key = llm_cache.key(settings.GROQ_MODEL, system_prompt, user_prompt, temperature, max_tokens)
+        cached = await llm_cache.get(cache_key)
+        if cached is not None:
+            return cached
+    
+    response = await rate_limiter.call(
+        lambda: get_client().chat.completions.create(
+            model=settings.GROQ_MODEL,
+            messages=[
+                {"role": "system", "content": system_prompt},
+                {"role": "user", "content": user_prompt}
+            ],
+            max_tokens=max_tokens,
+            temperature=temperature
+        ),
+        estimated_tokens=estimate_tokens(system_prompt, user_prompt) + max_tokens
+    )
+    content = response.choices[0].message.content
+    
+    if cache_enabled and content:
+        await llm_cache.set(cache_key, content, temperature)
+    return content
 
 
-async def summarize_document(text: str) -> str:
-    response = await client.chat.completions.create(
-        model=settings.GROQ_MODEL,
-        messages=[
-            {"role": "system", "content": "You are an expert at summarizing business documents. Provide concise, actionable summaries."},
-            {"role": "user", "content": f"Summarize this document:\n\n{text[:4000]}"}
-        ],
+def split_for_llm(text: str) -> List[str]:
+    chunks = chunk_text(
+        text,
+        max_tokens=settings.LLM_MAP_CHUNK_TOKENS,
+        overlap_tokens=settings.LLM_MAP_OVERLAP_TOKENS
+    )
+    return [chunk["content"] for chunk in chunks] or [text]
+
+
+def split_for_extraction(text: str) -> List[str]:
+    # Content-defined windows so a new version re-extracts only the windows it changed.
+    # Every window is extracted; the map concurrency and rate limiter bound the fan-out
+    windows = content_defined_windows(
+        text,
+        max_tokens=settings.LLM_MAP_CHUNK_TOKENS,
+        min_tokens=settings.LLM_MAP_MIN_CHUNK_TOKENS
+    )
+    return windows or [text]
+
+
+async def _map_chunks(
+    chunks: List[str],
+    func: Callable[[int, str], Awaitable[Any]],
+    stage: str,
+    timings: Optional[List[Dict[str, Any]]] = None
+) -> List[Any]:
+    limiter = asyncio.Semaphore(settings.LLM_MAP_CONCURRENCY)
+    
+    async def run(index: int, chunk: str):
+        async with limiter:
+            started = time.perf_counter()
+            result = await func(index, chunk)
+            if timings is not None:
+                timings.append({
+                    "stage": stage,
+                    "chunk": index,
+                    "chars": len(chunk),
+                    "seconds": round(time.perf_counter() - started, 4)
+                })
+            return result
+    
+    return await asyncio.gather(*(run(index, chunk) for index, chunk in enumerate(chunks)))
+
+
+async def _summarize_text(text: str, use_cache: Optional[bool] = None) -> str:
+    return await _chat(
+        "You are an expert at summarizing business documents. Provide concise, actionable summaries.",
+        f"Summarize this document:\n\n{text}",
         max_tokens=500,
-        temperature=0.3
+        temperature=0.3,
+        use_cache=use_cache
     )
-    return response.choices[0].message.content
 
 
-async def extract_knowledge(text: str, document_type: str) -> Dict[str, Any]:
+async def summarize_document(
+    text: str,
+    use_cache: Optional[bool] = None,
+    timings: Optional[List[Dict[str, Any]]] = None
+) -> str:
+    chunks = split_for_llm(text)
+    if len(chunks) == 1:
+        return await _summarize_text(chunks[0], use_cache=use_cache)
+    
+    async def summarize_part(index: int, chunk: str) -> str:
+        return await _chat(
+            "You are an expert at summarizing business documents. Summarize the given section, keeping every obligation, deadline, amount and risk it mentions.",
+            f"Section {index + 1} of {len(chunks)}:\n\n{chunk}",
+            max_tokens=300,
+            temperature=0.3,
+            use_cache=use_cache
+        )
+    
+    partials = await _map_chunks(chunks, summarize_part, "summarize_map", timings)
+    
+    # Reduce; very long documents fold the section summaries again until they fit one call
+    combined = "\n\n".join(partials)
+    while len(split_for_llm(combined)) > 1:
+        partials = await _map_chunks(split_for_llm(combined), summarize_part, "summarize_fold", timings)
+        combined = "\n\n".join(partials)
+    
+    started = time.perf_counter()
+    summary = await _chat(
+        "You are an expert at summarizing business documents. Provide concise, actionable summaries.",
+        f"Combine these section summaries of one document into a single summary:\n\n{combined}",
+        max_tokens=500,
+        temperature=0.3,
+        use_cache=use_cache
+    )
+    if timings is not None:
+        timings.append({"stage": "summarize_reduce", "chars": len(combined), "seconds": round(time.perf_counter() - started, 4)})
+    return summary
+
+
+async def _extract_knowledge_text(text: str, document_type: str, use_cache: Optional[bool] = None) -> Dict[str, Any]:
     prompt = f"""Extract key information from this {document_type} document:
     - Obligations and responsibilities
     - Important deadlines
@@ -34,47 +241,52 @@ async def extract_knowledge(text: str, document_type: str) -> Dict[str, Any]:
     - Key metrics or financial data
     
     Document text:
-    {text[:4000]}
+    {text}
     
     Return ONLY valid JSON with keys: obligations, deadlines, risks, metrics"""
     
-    response = await client.chat.completions.create(
-        model=settings.GROQ_MODEL,
-        messages=[
-            {"role": "system", "content": "You are an AI that extracts structured information from business documents. Always respond with valid JSON only."},
-            {"role": "user", "content": prompt}
-        ],
+    content = await _chat(
+        "You are an AI that extracts structured information from business documents. Always respond with valid JSON only.",
+        prompt,
         max_tokens=1000,
-        temperature=0.1
+        temperature=0.1,
+        use_cache=use_cache
     )
     
     try:
-        return json.loads(response.choices[0].message.content)
+        return json.loads(content)
     except:
-        return {"obligations": [], "deadlines": [], "risks": [], "metrics": []}
+        return {key: [] for key in KNOWLEDGE_KEYS}
+
+
+async def extract_knowledge_parts(
+    windows: List[str],
+    document_type: str,
+    use_cache: Optional[bool] = None,
+    timings: Optional[List[Dict[str, Any]]] = None
+) -> List[Dict[str, Any]]:
+    async def extract_part(index: int, window: str) -> Dict[str, Any]:
+        return await _extract_knowledge_text(window, document_type, use_cache=use_cache)
+    
+    return await _map_chunks(windows, extract_part, "extract_map", timings)
 
 
-async def answer_query(query: str, context: str) -> str:
-    response = await client.chat.completions.create(
-        model=settings.GROQ_MODEL,
-        messages=[
-            {"role": "system", "content": "You are an AI advisor for SMEs. Answer questions based on the provided context."},
-            {"role": "user", "content": f"Context:\n{context}\n\nQuestion: {query}"}
-        ],
+async def answer_query(query: str, context: str, use_cache: Optional[bool] = None) -> str:
+    return await _chat(
+        "You are an AI advisor for SMEs. Answer questions based on the provided context.",
+        f"Context:\n{context}\n\nQuestion: {query}",
         max_tokens=500,
-        temperature=0.5
+        temperature=0.5,
+        use_cache=use_cache
     )
-    return response.choices[0].message.content
 
 
-async def classify_document(filename: str, text_preview: str) -> str:
-    response = await client.chat.completions.create(
-        model=settings.GROQ_MODEL,
-        messages=[
-            {"role": "system", "content": "Classify documents into: contract, invoice, policy, report, tax_document, hr_document, compliance, or other. Respond with ONE word only."},
-            {"role": "user", "content": f"Filename: {filename}\nContent preview: {text_preview[:500]}\n\nClassify this document."}
-        ],
+async def classify_document(filename: str, text_preview: str, use_cache: Optional[bool] = None) -> str:
+    content = await _chat(
+        "Classify documents into: contract, invoice, policy, report, tax_document, hr_document, compliance, or other. Respond with ONE word only.",
+        f"Filename: {filename}\nContent preview: {text_preview[:500]}\n\nClassify this document.",
         max_tokens=10,
-        temperature=0.1
+        temperature=0.1,
+        use_cache=use_cache
     )
-    return response.choices[0].message.content.strip().lower()
+    return content.strip().lower()
@@ -0,0 +1,98 @@
+import enum
+import json
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Sequence
+import numpy as np
+from pgvector.asyncpg import register_vector
+from sqlalchemy import insert, Enum as SQLEnum, JSON
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.config import settings
+
+
+def _complete_rows(table, rows: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    # Core inserts skip ORM defaults, so resolve id/timestamps/flags up front
+    now = datetime.utcnow()
+    provided = {key for row in rows for key in row}
+    completed = []
+    for row in rows:
+        values = {}
+        for column in table.columns:
+            if column.key in row:
+                values[column.key] = row[column.key]
+            elif column.default is None:
+                # Multi-row VALUES needs the same keys in every row
+                if column.key in provided:
+                    values[column.key] = None
+            elif column.default.is_scalar:
+                values[column.key] = column.default.arg
+            elif column.default.is_callable:
+                values[column.key] = now if column.type.python_type is datetime else column.default.arg(None)
+        completed.append(values)
+    return completed
+
+
+def _copy_value(column, value):
+    if value is None:
+        return None
+    if isinstance(column.type, SQLEnum) and isinstance(value, enum.Enum):
+        # SQLAlchemy stores enum members by name
+        return value.name
+    if isinstance(column.type, JSON):
+        return json.dumps(value)
+    return value
+
+
+async def _copy_rows(db: AsyncSession, table, rows: List[Dict[str, Any]], batch_size: int):
+    columns = [column for column in table.columns if column.key in rows[0]]
+
+    connection = await db.connection()
+    raw = await connection.get_raw_connection()
+    driver_connection = raw.driver_connection
+    # Binary vector codec only for the COPY; pooled connections keep the text codec the ORM expects
+    await register_vector(driver_connection)
+    try:
+        for start in range(0, len(rows), batch_size):
+            records = [
+                tuple(_copy_value(column, row[column.key]) for column in columns)
+                for row in rows[start:start + batch_size]
+            ]
+            await driver_connection.copy_records_to_table(
+                table.name,
+                records=records,
+                columns=[column.name for column in columns]
+            )
+    finally:
+        for type_name in ("vector", "halfvec", "sparsevec"):
+            await driver_connection.reset_type_codec(type_name)
+
+
+async def bulk_insert(
+    db: AsyncSession,
+    model,
+    rows: List[Dict[str, Any]],
+    embeddings: Optional[Sequence[Sequence[float]]] = None,
+    batch_size: Optional[int] = None
+) -> int:
+    if not rows:
+        return 0
+
+    table = model.__table__
+    batch_size = batch_size or settings.BULK_INSERT_BATCH_SIZE
+    use_copy = len(rows) >= settings.BULK_COPY_MIN_ROWS and db.bind.dialect.driver == "asyncpg"
+
+    if embeddings is not None:
+        matrix = np.asarray(embeddings, dtype=np.float32)
+        if len(matrix) != len(rows):
+            raise ValueError(f"Got {len(matrix)} embeddings for {len(rows)} rows")
+        rows = [
+            {**row, "embedding": vector if use_copy else vector.tolist()}
+            for row, vector in zip(rows, matrix)
+        ]
+    rows = _complete_rows(table, rows)
+
+    if use_copy:
+        await _copy_rows(db, table, rows, batch_size)
+    else:
+        for start in range(0, len(rows), batch_size):
+            await db.execute(insert(table).values(rows[start:start + batch_size]))
+    return len(rows)
@@ -0,0 +1,188 @@
+import hashlib
+import re
+from bisect import bisect_right
+from typing import List, Dict, Any, Optional, Tuple
+from app.core.config import settings
+
+_TOKEN_RE = re.compile(r"\S+")
+_SENTENCE_END_RE = re.compile(r"[.!?;:][\"')\]]*$")
+_PARAGRAPH_RE = re.compile(r"\n\s*\n")
+
+
+def _snap_to_boundary(text: str, base: int, tokens: List[Tuple[int, int]], start: int, end: int) -> int:
+    # Prefer ending a chunk on a sentence or paragraph break in the back half of the window
+    floor = start + (end - start) // 2
+    for i in range(end, floor, -1):
+        token_start, token_end = tokens[i - 1]
+        if _SENTENCE_END_RE.search(text[token_start - base:token_end - base]):
+            return i
+        if i < len(tokens) and "\n\n" in text[token_end - base:tokens[i][0] - base]:
+            return i
+    return end
+
+
+def _locate(spans: List[Dict[str, Any]], span_starts: List[int], start_offset: int, end_offset: int) -> Dict[str, Any]:
+    if not spans:
+        return {}
+    first = max(bisect_right(span_starts, start_offset) - 1, 0)
+    last = max(bisect_right(span_starts, end_offset - 1) - 1, first)
+    return {"start": spans[first]["metadata"], "end": spans[last]["metadata"]}
+
+
+def embedding_word_limit() -> int:
+    # Two of the model's positions go to [CLS] and [SEP]
+    return int((settings.EMBEDDING_MAX_SEQ_LENGTH - 2) / settings.CHUNK_WORDPIECES_PER_WORD)
+
+
+def _resolve_limits(max_tokens: Optional[int], overlap_tokens: Optional[int]) -> Tuple[int, int]:
+    max_tokens = max_tokens or min(settings.CHUNK_MAX_TOKENS, embedding_word_limit())
+    overlap_tokens = settings.CHUNK_OVERLAP_TOKENS if overlap_tokens is None else overlap_tokens
+    return max_tokens, min(overlap_tokens, max_tokens - 1)
+
+
+def chunk_text(
+    text: str,
+    max_tokens: Optional[int] = None,
+    overlap_tokens: Optional[int] = None,
+    spans: Optional[List[Dict[str, Any]]] = None
+) -> List[Dict[str, Any]]:
+    max_tokens, overlap_tokens = _resolve_limits(max_tokens, overlap_tokens)
+
+    spans = spans or []
+    span_starts = [span["start"] for span in spans]
+    tokens = [(match.start(), match.end()) for match in _TOKEN_RE.finditer(text)]
+    chunks = []
+    start = 0
+
+    while start < len(tokens):
+        end = min(start + max_tokens, len(tokens))
+        if end < len(tokens):
+            end = _snap_to_boundary(text, 0, tokens, start, end)
+
+        start_offset = tokens[start][0]
+        end_offset = tokens[end - 1][1]
+        chunks.append({
+            "index": len(chunks),
+            "content": text[start_offset:end_offset],
+            "start_offset": start_offset,
+            "end_offset": end_offset,
+            "token_count": end - start,
+            "locator": _locate(spans, span_starts, start_offset, end_offset),
+        })
+
+        if end >= len(tokens):
+            break
+        start = max(end - overlap_tokens, start + 1)
+
+    return chunks
+
+
+class StreamingChunker:
+    # Produces the same chunks as chunk_text(join_blocks(blocks)) while blocks are still arriving
+
+    def __init__(self, max_tokens: Optional[int] = None, overlap_tokens: Optional[int] = None):
+        self.max_tokens, self.overlap_tokens = _resolve_limits(max_tokens, overlap_tokens)
+        self.spans: List[Dict[str, Any]] = []
+        self._span_starts: List[int] = []
+        self._parts: List[str] = []
+        self._length = 0
+        self._window = ""
+        self._window_base = 0
+        self._tokens: List[Tuple[int, int]] = []
+        self._index = 0
+
+    @property
+    def text(self) -> str:
+        return "".join(self._parts)
+
+    def feed(self, block: Dict[str, Any]) -> List[Dict[str, Any]]:
+        block_text = block["text"].strip()
+        if not block_text:
+            return []
+        if self._length:
+            self._append("\n\n")
+
+        block_start = self._length
+        self.spans.append({"start": block_start, "end": block_start + len(block_text), "metadata": block["metadata"]})
+        self._span_starts.append(block_start)
+        self._append(block_text)
+        self._tokens.extend(
+            (block_start + match.start(), block_start + match.end())
+            for match in _TOKEN_RE.finditer(block_text)
+        )
+        return self._drain(final=False)
+
+    def finish(self) -> List[Dict[str, Any]]:
+        return self._drain(final=True)
+
+    def _append(self, piece: str):
+        self._parts.append(piece)
+        self._window += piece
+        self._length += len(piece)
+
+    def _drain(self, final: bool) -> List[Dict[str, Any]]:
+        chunks = []
+        # A chunk is only final once a token beyond its window has been seen
+        while self._tokens and (final or len(self._tokens) > self.max_tokens):
+            end = min(self.max_tokens, len(self._tokens))
+            if end < len(self._tokens):
+                end = _snap_to_boundary(self._window, self._window_base, self._tokens, 0, end)
+
+            start_offset = self._tokens[0][0]
+            end_offset = self._tokens[end - 1][1]
+            chunks.append({
+                "index": self._index,
+                "content": self._window[start_offset - self._window_base:end_offset - self._window_base],
+                "start_offset": start_offset,
+                "end_offset": end_offset,
+                "token_count": end,
+                "locator": _locate(self.spans, self._span_starts, start_offset, end_offset),
+            })
+            self._index += 1
+
+            if end >= len(self._tokens):
+                self._tokens = []
+                break
+            self._tokens = self._tokens[max(end - self.overlap_tokens, 1):]
+            self._window = self._window[self._tokens[0][0] - self._window_base:]
+            self._window_base = self._tokens[0][0]
+
+        return chunks
+
+
+def content_hash(text: str) -> str:
+    # Whitespace-insensitive, so re-extraction noise does not read as an edit
+    return hashlib.sha256(" ".join(text.split()).encode("utf-8")).hexdigest()
+
+
+def content_defined_windows(text: str, max_tokens: int, min_tokens: int) -> List[str]:
+    # Paragraph groups whose boundaries depend on paragraph content, not position:
+    # an edit only changes the window it lands in and the windows re-align right after it
+    windows: List[str] = []
+    current: List[str] = []
+    current_tokens = 0
+
+    def close():
+        nonlocal current, current_tokens
+        if current:
+            windows.append("\n\n".join(current))
+        current, current_tokens = [], 0
+
+    for paragraph in _PARAGRAPH_RE.split(text):
+        paragraph = paragraph.strip()
+        token_count = len(_TOKEN_RE.findall(paragraph))
+        if not token_count:
+            continue
+        if token_count > max_tokens:
+            close()
+            windows.extend(chunk["content"] for chunk in chunk_text(paragraph, max_tokens, 0))
+            continue
+        if current_tokens + token_count > max_tokens:
+            close()
+        current.append(paragraph)
+        current_tokens += token_count
+        if current_tokens >= min_tokens and int(content_hash(paragraph)[:8], 16) % 4 == 0:
+            close()
+
+    close()
+    return windows
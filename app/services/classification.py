@@ -0,0 +1,47 @@
+from collections import Counter
+from typing import Dict, Any
+from app.core.config import settings
+from app.models.document import DocumentType
+from app.services.ai_service import classify_document
+from app.services.ml_service import get_local_classifier
+
+decision_counts: Counter = Counter()
+
+
+async def classify_tiered(filename: str, text: str) -> Dict[str, Any]:
+    valid_types = {dt.value for dt in DocumentType}
+    classifier = get_local_classifier(settings.LOCAL_CLASSIFIER_MODEL_PATH, settings.KEYWORD_CLASSIFIER_PATH)
+    local_label, local_confidence = None, None
+    
+    if classifier is not None:
+        proba = classifier.predict_proba(f"{filename}\n{text[:settings.LOCAL_CLASSIFIER_PREVIEW_CHARS]}")
+        local_label = max(proba, key=proba.get)
+        local_confidence = float(proba[local_label])
+        
+        if local_confidence >= settings.LOCAL_CLASSIFIER_CONFIDENCE_THRESHOLD and local_label in valid_types:
+            decision_counts["local"] += 1
+            return {
+                "document_type": local_label,
+                "path": "local",
+                "confidence": round(local_confidence, 4)
+            }
+    
+    # Only low-confidence (or model-less) cases pay for the LLM round-trip
+    llm_label = await classify_document(filename, text[:500])
+    path = "llm" if classifier is None else "llm_fallback"
+    decision_counts[path] += 1
+    return {
+        "document_type": llm_label if llm_label in valid_types else None,
+        "path": path,
+        "confidence": None,
+        "local_label": local_label,
+        "local_confidence": round(local_confidence, 4) if local_confidence is not None else None
+    }
+
+
+def stats() -> Dict[str, Any]:
+    total = sum(decision_counts.values())
+    return {
+        "decisions": dict(decision_counts),
+        "local_rate": round(decision_counts["local"] / total, 4) if total else 0.0
+    }
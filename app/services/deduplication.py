@@ -0,0 +1,98 @@
+from sqlalchemy import select, insert, func, literal, and_, exists
+from sqlalchemy.orm import aliased
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Optional, Dict, Iterable
+from datetime import datetime
+import uuid
+from app.models.document import Document, DocumentStatus
+from app.models.document_chunk import DocumentChunk
+from app.models.knowledge_entry import KnowledgeEntry
+
+_GENERATED_COLUMNS = ("id", "document_id", "created_at", "updated_at")
+
+
+async def find_document_by_hash(
+    db: AsyncSession,
+    company_id: uuid.UUID,
+    content_hash: str,
+    exclude_id: Optional[uuid.UUID] = None,
+    status: Optional[DocumentStatus] = None
+) -> Optional[Document]:
+    # Superseded versions have handed their active entries on to the newer version
+    newer = aliased(Document)
+    filters = [
+        Document.company_id == company_id,
+        Document.content_hash == content_hash,
+        ~exists().where(newer.parent_id == Document.id)
+    ]
+    if exclude_id is not None:
+        filters.append(Document.id != exclude_id)
+    if status is not None:
+        filters.append(Document.status == status)
+    else:
+        filters.append(Document.status != DocumentStatus.FAILED)
+
+    result = await db.execute(
+        select(Document).where(and_(*filters)).order_by(Document.created_at.asc()).limit(1)
+    )
+    return result.scalar_one_or_none()
+
+
+async def find_stored_files_by_hash(
+    db: AsyncSession,
+    company_id: uuid.UUID,
+    content_hashes: Iterable[str]
+) -> Dict[str, str]:
+    result = await db.execute(
+        select(Document.content_hash, Document.file_path)
+        .where(
+            Document.company_id == company_id,
+            Document.content_hash.in_(list(content_hashes)),
+            Document.status != DocumentStatus.FAILED
+        )
+        .order_by(Document.created_at.desc())
+    )
+    # Oldest document wins for each hash
+    return {content_hash: file_path for content_hash, file_path in result.all()}
+
+
+def _copy_rows_statement(model, source_id: uuid.UUID, target_id: uuid.UUID):
+    # INSERT ... SELECT keeps the copied rows (and their vectors) inside Postgres
+    table = model.__table__
+    copied = [
+        column for column in table.columns
+        if column.name not in _GENERATED_COLUMNS and column.computed is None
+    ]
+    generated = {
+        "id": func.gen_random_uuid(),
+        "document_id": literal(target_id, UUID(as_uuid=True)),
+        "created_at": func.now(),
+        "updated_at": func.now(),
+    }
+    generated = {name: value for name, value in generated.items() if name in table.columns}
+
+    source = select(*generated.values(), *copied).where(table.c.document_id == source_id)
+    return insert(table).from_select(
+        list(generated.keys()) + [column.name for column in copied],
+        source,
+        include_defaults=False
+    )
+
+
+async def clone_processed_document(db: AsyncSession, source: Document, target: Document):
+    target.extracted_text = source.extracted_text
+    target.summary = source.summary
+    target.document_type = source.document_type
+    target.embedding = source.embedding
+    target.metadata_ = {
+        **(target.metadata_ or {}),
+        "deduplicated_from": str(source.id),
+        "knowledge_windows": (source.metadata_ or {}).get("knowledge_windows", [])
+    }
+
+    await db.execute(_copy_rows_statement(DocumentChunk, source.id, target.id))
+    await db.execute(_copy_rows_statement(KnowledgeEntry, source.id, target.id))
+
+    target.status = DocumentStatus.PROCESSED
+    target.processed_at = datetime.utcnow()
@@ -1,49 +1,272 @@
 from pypdf import PdfReader
+from pypdf.errors import PdfReadError
 from docx import Document as DocxDocument
+from docx.opc.exceptions import PackageNotFoundError
+from docx.oxml.ns import qn
+from docx.table import Table
+from docx.text.paragraph import Paragraph
+from charset_normalizer import from_bytes
 from openpyxl import load_workbook
-from io import BytesIO
-from typing import Optional
+from openpyxl.utils.exceptions import InvalidFileException
+from billiard.pool import Pool
+from tempfile import NamedTemporaryFile
+from typing import Optional, BinaryIO, Iterator, Iterable, List, Dict, Any, Tuple
+from collections import deque
+from zipfile import BadZipFile
+import codecs
+import os
+import shutil
+from app.core.config import settings
 
+SUPPORTED_MIME_TYPES = [
+    "application/pdf",
+    "application/vnd.openxmlformats-officedocument.wordprocessingml.document",
+    "application/msword",
+    "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+    "application/vnd.ms-excel",
+]
 
-async def extract_text_from_pdf(file_content: bytes) -> str:
-    try:
-        pdf = PdfReader(BytesIO(file_content))
-        text = ""
-        for page in pdf.pages:
-            text += page.extract_text() + "\n"
-        return text.strip()
-    except Exception:
-        return ""
+# Raised for files that will never parse, such as legacy .doc/.xls sent to the OOXML
+# readers or encrypted and corrupt PDFs; retrying them cannot help
+PARSE_ERRORS = (BadZipFile, PackageNotFoundError, InvalidFileException, PdfReadError)
 
+_pdf_pool: Optional[Pool] = None
+_pdf_pool_pid: Optional[int] = None
+
+
+def _get_pdf_pool() -> Pool:
+    global _pdf_pool, _pdf_pool_pid
+    if _pdf_pool is None or _pdf_pool_pid != os.getpid():
+        # billiard can start workers from Celery's daemonic prefork children, and with
+        # timeouts enabled it kills a worker whose job runs past its hard limit
+        _pdf_pool = Pool(processes=settings.PDF_EXTRACTION_WORKERS, enable_timeouts=True)
+        _pdf_pool_pid = os.getpid()
+    return _pdf_pool
+
+
+def _failed_pages(start: int, stop: int, error: str) -> List[Dict[str, Any]]:
+    return [{"text": "", "metadata": {"page": number + 1, "error": error}} for number in range(start, stop)]
+
+
+def _extract_pdf_pages(path: str, start: int, stop: int) -> List[Dict[str, Any]]:
+    reader = PdfReader(path)
+    pages = []
+    for number in range(start, stop):
+        try:
+            pages.append({"text": reader.pages[number].extract_text() or "", "metadata": {"page": number + 1}})
+        except Exception as e:
+            pages.extend(_failed_pages(number, number + 1, type(e).__name__))
+    return pages
+
+
+def iter_pdf_pages(
+    file_obj: BinaryIO,
+    max_pages: Optional[int] = None,
+    page_timeout: Optional[float] = None
+) -> Iterator[Dict[str, Any]]:
+    # Pages that fail or time out are yielded empty with an "error" in their metadata
+    max_pages = max_pages or settings.PDF_MAX_PAGES
+    page_timeout = page_timeout or settings.PDF_PAGE_TIMEOUT_SECONDS
+    pages_per_task = settings.PDF_PAGES_PER_TASK
+
+    with NamedTemporaryFile(suffix=".pdf") as tmp:
+        shutil.copyfileobj(file_obj, tmp)
+        tmp.flush()
+
+        page_count = min(len(PdfReader(tmp.name).pages), max_pages)
+        ranges = deque((start, min(start + pages_per_task, page_count)) for start in range(0, page_count, pages_per_task))
+        pool = _get_pdf_pool()
+        in_flight = deque()
+
+        # A bounded window of jobs, so an abandoned generator leaves little work behind
+        while ranges or in_flight:
+            while ranges and len(in_flight) < 2 * settings.PDF_EXTRACTION_WORKERS:
+                start, stop = ranges.popleft()
+                limit = page_timeout * (stop - start)
+                job = pool.apply_async(_extract_pdf_pages, (tmp.name, start, stop), timeout=limit)
+                in_flight.append((start, stop, limit, job))
+
+            start, stop, limit, job = in_flight.popleft()
+            try:
+                # The pool kills the worker at the limit; the window keeps at most one job
+                # queued ahead per worker, so the extra wait only covers that queueing
+                pages = job.get(timeout=3 * limit)
+            except Exception as e:
+                pages = _failed_pages(start, stop, type(getattr(e, "exc", e)).__name__)
+            yield from pages
+
+
+def join_blocks(blocks: Iterable[Dict[str, Any]]) -> Tuple[str, List[Dict[str, Any]]]:
+    parts = []
+    spans = []
+    offset = 0
+
+    for block in blocks:
+        block_text = block["text"].strip()
+        if not block_text:
+            continue
+        if parts:
+            parts.append("\n\n")
+            offset += 2
+        spans.append({"start": offset, "end": offset + len(block_text), "metadata": block["metadata"]})
+        parts.append(block_text)
+        offset += len(block_text)
+
+    return "".join(parts), spans
 
-async def extract_text_from_docx(file_content: bytes) -> str:
-    try:
-        doc = DocxDocument(BytesIO(file_content))
-        text = "\n".join([para.text for para in doc.paragraphs])
-        return text.strip()
-    except Exception:
-        return ""
 
+def iter_docx_blocks(file_obj: BinaryIO, block_chars: Optional[int] = None) -> Iterator[Dict[str, Any]]:
+    block_chars = block_chars or settings.EXTRACT_BLOCK_CHARS
+    doc = DocxDocument(file_obj)
+    parts: List[str] = []
+    size = 0
+    first_paragraph = 0
+    paragraph_index = 0
+    table_index = 0
 
-async def extract_text_from_xlsx(file_content: bytes) -> str:
+    for element in doc.element.body.iterchildren():
+        if element.tag == qn("w:p"):
+            paragraph_text = Paragraph(element, doc).text
+            if paragraph_text.strip():
+                if not parts:
+                    first_paragraph = paragraph_index
+                parts.append(paragraph_text)
+                size += len(paragraph_text) + 1
+                if size >= block_chars:
+                    yield {"text": "\n".join(parts), "metadata": {"paragraph": first_paragraph}}
+                    parts, size = [], 0
+            paragraph_index += 1
+
+        elif element.tag == qn("w:tbl"):
+            if parts:
+                yield {"text": "\n".join(parts), "metadata": {"paragraph": first_paragraph}}
+                parts, size = [], 0
+
+            rows: List[str] = []
+            row_size = 0
+            first_row = 0
+            for row_index, row in enumerate(Table(element, doc).rows):
+                row_text = " | ".join(cell.text.strip() for cell in row.cells)
+                if not rows:
+                    first_row = row_index
+                rows.append(row_text)
+                row_size += len(row_text) + 1
+                if row_size >= block_chars:
+                    yield {"text": "\n".join(rows), "metadata": {"table": table_index, "row": first_row}}
+                    rows, row_size = [], 0
+            if rows:
+                yield {"text": "\n".join(rows), "metadata": {"table": table_index, "row": first_row}}
+            table_index += 1
+
+    if parts:
+        yield {"text": "\n".join(parts), "metadata": {"paragraph": first_paragraph}}
+
+
+def iter_xlsx_blocks(file_obj: BinaryIO, block_chars: Optional[int] = None) -> Iterator[Dict[str, Any]]:
+    block_chars = block_chars or settings.EXTRACT_BLOCK_CHARS
+    wb = load_workbook(file_obj, read_only=True, data_only=True)
     try:
-        wb = load_workbook(BytesIO(file_content), read_only=True)
-        text = ""
         for sheet in wb.worksheets:
-            for row in sheet.iter_rows(values_only=True):
-                text += " ".join([str(cell) for cell in row if cell]) + "\n"
-        return text.strip()
-    except Exception:
-        return ""
+            rows: List[str] = []
+            size = 0
+            first_row = 1
+            for row_number, row in enumerate(sheet.iter_rows(values_only=True), start=1):
+                row_text = " ".join(str(cell) for cell in row if cell is not None and cell != "")
+                if not row_text:
+                    continue
+                if not rows:
+                    first_row = row_number
+                rows.append(row_text)
+                size += len(row_text) + 1
+                if size >= block_chars:
+                    yield {"text": "\n".join(rows), "metadata": {"sheet": sheet.title, "row": first_row}}
+                    rows, size = [], 0
+            if rows:
+                yield {"text": "\n".join(rows), "metadata": {"sheet": sheet.title, "row": first_row}}
+    finally:
+        wb.close()
 
 
-async def extract_text(file_content: bytes, mime_type: str) -> Optional[str]:
+_READ_SIZE = 64 * 1024
+# Most non-UTF-8 business text is Windows Western European; statistical detection on a
+# short sample often mistakes it for a CJK or Baltic code page
+_LEGACY_ENCODING = "cp1252"
+
+
+def _decodes_cleanly(file_obj: BinaryIO, encoding: str) -> bool:
+    # Reads the whole stream so a bad byte past any sample window is still seen
+    start = file_obj.tell()
+    decoder = codecs.getincrementaldecoder(encoding)()
+    try:
+        while raw := file_obj.read(_READ_SIZE):
+            decoder.decode(raw)
+        decoder.decode(b"", final=True)
+        return True
+    except UnicodeDecodeError:
+        return False
+    finally:
+        file_obj.seek(start)
+
+
+def _detect_legacy_encoding(sample: bytes) -> str:
+    # UTF-16/32 without a byte order mark is never a plausible upload
+    matches = [
+        match for match in from_bytes(sample)
+        if match.bom or not match.encoding.startswith(("utf_16", "utf_32"))
+    ]
+    legacy = from_bytes(sample, cp_isolation=[_LEGACY_ENCODING]).best()
+    if not matches or (legacy is not None and legacy.chaos <= matches[0].chaos):
+        return _LEGACY_ENCODING
+    return matches[0].encoding
+
+
+def iter_plain_text_blocks(file_obj: BinaryIO, block_chars: Optional[int] = None) -> Iterator[Dict[str, Any]]:
+    # Strict UTF-8 (which covers ASCII) unless some byte anywhere in the file is not UTF-8;
+    # bytes the fallback cannot map are reported as an error block, never dropped silently
+    block_chars = block_chars or settings.EXTRACT_BLOCK_CHARS
+    encoding = "utf-8"
+    if not _decodes_cleanly(file_obj, encoding):
+        start = file_obj.tell()
+        encoding = _detect_legacy_encoding(file_obj.read(_READ_SIZE))
+        file_obj.seek(start)
+    # utf-8-sig drops a leading byte order mark and is otherwise plain UTF-8
+    decoder = codecs.getincrementaldecoder("utf-8-sig" if encoding == "utf-8" else encoding)(errors="replace")
+
+    buffer = ""
+    line = 1
+    replaced = 0
+    while raw := file_obj.read(_READ_SIZE):
+        decoded = decoder.decode(raw)
+        replaced += decoded.count("\ufffd") if encoding != "utf-8" else 0
+        buffer += decoded
+        while len(buffer) >= block_chars:
+            # Cut on the last line break inside the block so lines stay whole
+            cut = buffer.rfind("\n", 0, block_chars)
+            cut = cut + 1 if cut > 0 else block_chars
+            block, buffer = buffer[:cut], buffer[cut:]
+            yield {"text": block, "metadata": {"line": line}}
+            line += block.count("\n")
+
+    tail = decoder.decode(b"", final=True)
+    replaced += tail.count("\ufffd") if encoding != "utf-8" else 0
+    buffer += tail
+    if buffer:
+        yield {"text": buffer, "metadata": {"line": line}}
+    if replaced:
+        yield {
+            "text": "",
+            "metadata": {"line": 1, "encoding": encoding, "error": f"{replaced} undecodable characters replaced"}
+        }
+
+
+def iter_text(file_obj: BinaryIO, mime_type: str) -> Iterator[Dict[str, Any]]:
     if mime_type == "application/pdf":
-        return await extract_text_from_pdf(file_content)
+        return iter_pdf_pages(file_obj)
     elif mime_type in ["application/vnd.openxmlformats-officedocument.wordprocessingml.document", "application/msword"]:
-        return await extract_text_from_docx(file_content)
+        return iter_docx_blocks(file_obj)
     elif mime_type in ["application/vnd.openxmlformats-officedocument.spreadsheetml.sheet", "application/vnd.ms-excel"]:
-        return await extract_text_from_xlsx(file_content)
+        return iter_xlsx_blocks(file_obj)
     elif mime_type.startswith("text/"):
-        return file_content.decode('utf-8', errors='ignore')
-    return None
+        return iter_plain_text_blocks(file_obj)
+    return iter(())
+
@@ -0,0 +1,103 @@
+import hashlib
+import threading
+import unicodedata
+from collections import OrderedDict
+from typing import List, Optional, Dict, Any
+import numpy as np
+from redis.exceptions import RedisError
+from app.core.redis import get_redis_binary
+
+
+def normalize_text(text: str) -> str:
+    return " ".join(unicodedata.normalize("NFC", text).split())
+
+
+class EmbeddingCache:
+    def __init__(self, model_name: str, max_local_entries: int = 10000, ttl: int = 7 * 86400):
+        self.model_name = model_name
+        self.max_local_entries = max_local_entries
+        self.ttl = ttl
+        self._model_key = hashlib.sha256(model_name.encode("utf-8")).hexdigest()[:12]
+        self._local: "OrderedDict[str, bytes]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.local_hits = 0
+        self.redis_hits = 0
+        self.misses = 0
+
+    def key(self, text: str) -> str:
+        text_hash = hashlib.sha256(normalize_text(text).encode("utf-8")).hexdigest()
+        return f"emb:{self._model_key}:{text_hash}"
+
+    def _get_local(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            value = self._local.get(key)
+            if value is not None:
+                self._local.move_to_end(key)
+            return value
+
+    def _set_local(self, key: str, value: bytes):
+        with self._lock:
+            self._local[key] = value
+            self._local.move_to_end(key)
+            while len(self._local) > self.max_local_entries:
+                self._local.popitem(last=False)
+
+    async def get_many(self, texts: List[str]) -> List[Optional[List[float]]]:
+        keys = [self.key(text) for text in texts]
+        results: List[Optional[List[float]]] = [None] * len(texts)
+        remote = []
+
+        for i, key in enumerate(keys):
+            value = self._get_local(key)
+            if value is not None:
+                results[i] = np.frombuffer(value, dtype=np.float32).tolist()
+                self.local_hits += 1
+            else:
+                remote.append(i)
+
+        redis = await get_redis_binary()
+        if remote and redis is not None:
+            try:
+                values = await redis.mget([keys[i] for i in remote])
+            except RedisError:
+                values = [None] * len(remote)
+
+            for i, value in zip(remote, values):
+                if value is not None:
+                    self._set_local(keys[i], value)
+                    results[i] = np.frombuffer(value, dtype=np.float32).tolist()
+                    self.redis_hits += 1
+
+        self.misses += sum(1 for result in results if result is None)
+        return results
+
+    async def set_many(self, texts: List[str], vectors: List[List[float]]):
+        items = {
+            self.key(text): np.asarray(vector, dtype=np.float32).tobytes()
+            for text, vector in zip(texts, vectors)
+        }
+        for key, value in items.items():
+            self._set_local(key, value)
+
+        redis = await get_redis_binary()
+        if redis is None or not items:
+            return
+        try:
+            async with redis.pipeline(transaction=False) as pipe:
+                for key, value in items.items():
+                    pipe.set(key, value, ex=self.ttl)
+                await pipe.execute()
+        except RedisError:
+            pass
+
+    def stats(self) -> Dict[str, Any]:
+        hits = self.local_hits + self.redis_hits
+        lookups = hits + self.misses
+        return {
+            "model": self.model_name,
+            "local_entries": len(self._local),
+            "local_hits": self.local_hits,
+            "redis_hits": self.redis_hits,
+            "misses": self.misses,
+            "hit_rate": round(hits / lookups, 4) if lookups else 0.0,
+        }
@@ -0,0 +1,98 @@
+import asyncio
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Callable, List, Tuple, Dict, Any
+import numpy as np
+
+
+class EmbeddingEngine:
+    def __init__(
+        self,
+        encode: Callable[[List[str]], np.ndarray],
+        max_batch_size: int = 64,
+        max_wait_ms: float = 5.0
+    ):
+        self._encode = encode
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+        self._lock = threading.Lock()
+        self._pid = None
+        self._queue: "queue.Queue[Tuple[List[str], Future]]" = queue.Queue()
+        self._thread = None
+        self.batches_processed = 0
+        self.texts_processed = 0
+
+    def _ensure_started(self):
+        # Worker threads do not survive a fork, so each process starts its own
+        if self._pid == os.getpid() and self._thread is not None and self._thread.is_alive():
+            return
+        with self._lock:
+            if self._pid != os.getpid():
+                self._queue = queue.Queue()
+                self._thread = None
+                self._pid = os.getpid()
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="embedding-engine", daemon=True)
+                self._thread.start()
+
+    def submit(self, texts: List[str]) -> Future:
+        future: Future = Future()
+        self._ensure_started()
+        self._queue.put((texts, future))
+        return future
+
+    async def embed(self, texts: List[str]) -> List[List[float]]:
+        if not texts:
+            return []
+        return await asyncio.wrap_future(self.submit(texts))
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "batches_processed": self.batches_processed,
+            "texts_processed": self.texts_processed,
+            "avg_batch_size": round(self.texts_processed / self.batches_processed, 2) if self.batches_processed else 0.0,
+            "queue_depth": self._queue.qsize(),
+        }
+
+    def _run(self):
+        while True:
+            pending = [self._queue.get()]
+            size = len(pending[0][0])
+            deadline = time.monotonic() + self.max_wait
+
+            while size < self.max_batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    item = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                pending.append(item)
+                size += len(item[0])
+
+            self._process(pending)
+
+    def _process(self, pending: List[Tuple[List[str], Future]]):
+        pending = [(texts, future) for texts, future in pending if future.set_running_or_notify_cancel()]
+        if not pending:
+            return
+
+        texts = [text for item_texts, _ in pending for text in item_texts]
+        try:
+            vectors = np.asarray(self._encode(texts), dtype=np.float32)
+        except Exception as exc:
+            for _, future in pending:
+                future.set_exception(exc)
+            return
+
+        self.batches_processed += 1
+        self.texts_processed += len(texts)
+
+        offset = 0
+        for item_texts, future in pending:
+            future.set_result(vectors[offset:offset + len(item_texts)].tolist())
+            offset += len(item_texts)
@@ -0,0 +1,67 @@
+import asyncio
+from typing import BinaryIO, List, Dict, Any, Optional, Tuple
+from app.core.config import settings
+from app.services.ai_service import generate_embeddings
+from app.services.chunking import StreamingChunker, content_hash
+from app.services.document_processor import iter_text
+
+
+async def embed_chunks(
+    chunks: List[Dict[str, Any]],
+    known_embeddings: Optional[Dict[str, List[float]]] = None
+) -> List[List[float]]:
+    # Chunks unchanged since a previous version keep their stored vectors
+    known_embeddings = known_embeddings or {}
+    for chunk in chunks:
+        chunk["content_hash"] = content_hash(chunk["content"])
+    encoded = iter(await generate_embeddings([
+        chunk["content"] for chunk in chunks if chunk["content_hash"] not in known_embeddings
+    ]))
+    return [
+        known_embeddings[chunk["content_hash"]] if chunk["content_hash"] in known_embeddings else next(encoded)
+        for chunk in chunks
+    ]
+
+
+async def extract_chunk_and_embed(
+    file_obj: BinaryIO,
+    mime_type: str,
+    known_embeddings: Optional[Dict[str, List[float]]] = None
+) -> Tuple[str, List[Dict[str, Any]], List[Dict[str, Any]], List[List[float]], List[Dict[str, Any]]]:
+    # Chunks are embedded while later blocks are still being extracted
+    blocks = iter_text(file_obj, mime_type)
+    chunker = StreamingChunker()
+    chunks: List[Dict[str, Any]] = []
+    failures: List[Dict[str, Any]] = []
+    pending: List[Dict[str, Any]] = []
+    embedding_batches = []
+
+    def flush():
+        nonlocal pending
+        embedding_batches.append(asyncio.ensure_future(embed_chunks(pending, known_embeddings)))
+        chunks.extend(pending)
+        pending = []
+
+    try:
+        while True:
+            block = await asyncio.to_thread(next, blocks, None)
+            if block is None:
+                break
+            if block["metadata"].get("error"):
+                failures.append(block["metadata"])
+            pending.extend(chunker.feed(block))
+            if len(pending) >= settings.EMBEDDING_MAX_BATCH_SIZE:
+                flush()
+
+        pending.extend(chunker.finish())
+        if pending:
+            flush()
+
+        batches = await asyncio.gather(*embedding_batches)
+    except BaseException:
+        for batch in embedding_batches:
+            batch.cancel()
+        raise
+
+    embeddings = [embedding for batch in batches for embedding in batch]
+    return chunker.text, chunker.spans, chunks, embeddings, failures
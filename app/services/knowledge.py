@@ -0,0 +1,38 @@
+from typing import List, Dict, Any
+from app.models.knowledge_entry import KnowledgeType, RiskLevel
+from app.services.chunking import content_hash
+
+
+def build_knowledge_entries(knowledge_data: Dict[str, Any]) -> List[Dict[str, Any]]:
+    entries = []
+    for obligation in knowledge_data.get("obligations", []):
+        entries.append({
+            "knowledge_type": KnowledgeType.OBLIGATION,
+            "title": obligation.get("title", "Obligation"),
+            "content": obligation.get("content", "")
+        })
+    
+    for risk in knowledge_data.get("risks", []):
+        entries.append({
+            "knowledge_type": KnowledgeType.RISK,
+            "title": risk.get("title", "Risk"),
+            "content": risk.get("content", ""),
+            "risk_level": RiskLevel(risk.get("level", "medium"))
+        })
+    
+    return entries
+
+
+def build_sourced_entries(windows: List[str], parts: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    # Each entry remembers the window it came from; repeats across windows keep the first source
+    entries = []
+    seen = set()
+    for window, part in zip(windows, parts):
+        source_chunk_hash = content_hash(window)
+        for entry in build_knowledge_entries(part):
+            key = (entry["knowledge_type"], " ".join(entry["content"].lower().split()))
+            if key in seen:
+                continue
+            seen.add(key)
+            entries.append({**entry, "source_chunk_hash": source_chunk_hash})
+    return entries
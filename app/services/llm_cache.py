@@ -0,0 +1,137 @@
+import hashlib
+import json
+import time
+from typing import Optional, Dict, Any
+from redis.exceptions import RedisError
+from app.core.config import settings
+from app.core.redis import get_redis
+
+_INDEX_KEY = "llm:index"
+_SIZES_KEY = "llm:sizes"
+_BYTES_KEY = "llm:bytes"
+_EVICT_BATCH = 50
+
+# Store a response and charge only the size difference, so re-setting a key
+# (after expiry or from concurrent misses) never double counts it
+_STORE_LUA = """
+redis.call('SET', KEYS[1], ARGV[1], 'EX', ARGV[2])
+redis.call('ZADD', KEYS[2], ARGV[3], KEYS[1])
+local previous = tonumber(redis.call('HGET', KEYS[3], KEYS[1]) or '0')
+redis.call('HSET', KEYS[3], KEYS[1], ARGV[4])
+return redis.call('INCRBY', KEYS[4], tonumber(ARGV[4]) - previous)
+"""
+
+# Recount the budget from the size hash, then drop least recently used entries
+# until it fits. Expired responses stop being touched by get(), so they drift to
+# the head of the index and are cleared here without counting as evictions.
+_EVICT_LUA = """
+local total = 0
+for _, size in ipairs(redis.call('HVALS', KEYS[2])) do
+    total = total + tonumber(size)
+end
+local target = tonumber(ARGV[1])
+local evicted, expired = 0, 0
+while total > target do
+    local members = redis.call('ZRANGE', KEYS[1], 0, tonumber(ARGV[2]) - 1)
+    if #members == 0 then
+        break
+    end
+    for _, member in ipairs(members) do
+        total = total - tonumber(redis.call('HGET', KEYS[2], member) or '0')
+        if redis.call('DEL', member) == 1 then
+            evicted = evicted + 1
+        else
+            expired = expired + 1
+        end
+        redis.call('HDEL', KEYS[2], member)
+        redis.call('ZREM', KEYS[1], member)
+        if total <= target then
+            break
+        end
+    end
+end
+redis.call('SET', KEYS[3], total)
+return {total, evicted, expired}
+"""
+
+
+class LLMResponseCache:
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+        self.stores = 0
+        self.evictions = 0
+        self.expired = 0
+        self.errors = 0
+
+    def key(self, model: str, system_prompt: str, user_prompt: str, temperature: float, max_tokens: int) -> str:
+        payload = json.dumps([model, system_prompt, user_prompt, temperature, max_tokens], ensure_ascii=False)
+        return f"llm:{hashlib.sha256(payload.encode('utf-8')).hexdigest()}"
+
+    def should_cache(self, temperature: float) -> bool:
+        return settings.LLM_CACHE_ENABLED and temperature <= settings.LLM_CACHE_MAX_TEMPERATURE
+
+    def ttl_for(self, temperature: float) -> int:
+        if temperature <= settings.LLM_CACHE_DETERMINISTIC_TEMPERATURE:
+            return settings.LLM_CACHE_DETERMINISTIC_TTL
+        return settings.LLM_CACHE_TTL
+
+    async def get(self, key: str) -> Optional[str]:
+        redis = await get_redis()
+        if redis is None:
+            self.misses += 1
+            return None
+        try:
+            value = await redis.get(key)
+            if value is not None:
+                await redis.zadd(_INDEX_KEY, {key: time.time()})
+        except RedisError:
+            self.errors += 1
+            value = None
+
+        if value is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return value
+
+    async def set(self, key: str, value: str, temperature: float):
+        size = len(value.encode("utf-8"))
+        if size > settings.LLM_CACHE_MAX_ENTRY_BYTES:
+            return
+
+        redis = await get_redis()
+        if redis is None:
+            return
+        try:
+            total_bytes = await redis.eval(
+                _STORE_LUA, 4, key, _INDEX_KEY, _SIZES_KEY, _BYTES_KEY,
+                value, self.ttl_for(temperature), time.time(), size
+            )
+            self.stores += 1
+
+            if int(total_bytes) > settings.LLM_CACHE_MAX_BYTES:
+                await self._evict(redis)
+        except RedisError:
+            self.errors += 1
+
+    async def _evict(self, redis):
+        # Evict below the budget so the next few stores do not each trigger a full recount
+        target = int(settings.LLM_CACHE_MAX_BYTES * settings.LLM_CACHE_EVICT_TO_RATIO)
+        _, evicted, expired = await redis.eval(
+            _EVICT_LUA, 3, _INDEX_KEY, _SIZES_KEY, _BYTES_KEY, target, _EVICT_BATCH
+        )
+        self.evictions += int(evicted)
+        self.expired += int(expired)
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "stores": self.stores,
+            "evictions": self.evictions,
+            "expired": self.expired,
+            "errors": self.errors,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
@@ -1,13 +1,19 @@
+import json
+import os
 import pickle
+import re
+import threading
 from typing import List, Dict, Any
-from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.naive_bayes import MultinomialNB
-from sklearn.pipeline import Pipeline
 import numpy as np
 
 
 class CustomDocumentClassifier:
     def __init__(self):
+        # sklearn is only imported by processes that actually build a classifier
+        from sklearn.feature_extraction.text import TfidfVectorizer
+        from sklearn.naive_bayes import MultinomialNB
+        from sklearn.pipeline import Pipeline
+        
         self.model = Pipeline([
             ('tfidf', TfidfVectorizer(max_features=5000)),
             ('clf', MultinomialNB())
@@ -70,3 +76,48 @@ class RiskScorer:
         
         max_level = max(scores, key=scores.get)
         return max_level if scores[max_level] > 0 else 'low'
+
+
+class KeywordClassifier:
+    def __init__(self, keywords: Dict[str, List[str]]):
+        self.keywords = keywords
+        self.patterns = {
+            label: re.compile(r"\b(?:" + "|".join(re.escape(word) for word in words) + r")\b", re.IGNORECASE)
+            for label, words in keywords.items()
+        }
+    
+    @classmethod
+    def load(cls, path: str) -> "KeywordClassifier":
+        with open(path) as f:
+            return cls(json.load(f))
+    
+    def predict_proba(self, text: str) -> Dict[str, float]:
+        # Laplace-smoothed share of keyword occurrences, so a single hit is not a confident call
+        counts = {label: len(pattern.findall(text)) for label, pattern in self.patterns.items()}
+        total = sum(counts.values()) + len(counts)
+        return {label: (count + 1) / total for label, count in counts.items()}
+    
+    def predict(self, text: str) -> str:
+        proba = self.predict_proba(text)
+        return max(proba, key=proba.get)
+
+
+_local_classifier = None
+_local_classifier_loaded = False
+_local_classifier_lock = threading.Lock()
+
+
+def get_local_classifier(model_path: str, keyword_path: str):
+    global _local_classifier, _local_classifier_loaded
+    if _local_classifier_loaded:
+        return _local_classifier
+    with _local_classifier_lock:
+        if not _local_classifier_loaded:
+            if os.path.exists(model_path):
+                classifier = CustomDocumentClassifier()
+                classifier.load(model_path)
+                _local_classifier = classifier
+            elif os.path.exists(keyword_path):
+                _local_classifier = KeywordClassifier.load(keyword_path)
+            _local_classifier_loaded = True
+    return _local_classifier
@@ -0,0 +1,75 @@
+import asyncio
+import time
+import weakref
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Sequence, Tuple
+from app.core.config import settings
+
+StageFunc = Callable[[Dict[str, Any]], Awaitable[Any]]
+
+_limiters: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Semaphore]" = weakref.WeakKeyDictionary()
+
+
+class Stage:
+    def __init__(self, name: str, func: StageFunc, depends_on: Sequence[str] = ()):
+        self.name = name
+        self.func = func
+        self.depends_on = tuple(depends_on)
+
+
+def stage_limiter() -> asyncio.Semaphore:
+    # One limiter per event loop, shared by every pipeline running on it
+    loop = asyncio.get_running_loop()
+    limiter = _limiters.get(loop)
+    if limiter is None:
+        limiter = asyncio.Semaphore(settings.PIPELINE_MAX_CONCURRENCY)
+        _limiters[loop] = limiter
+    return limiter
+
+
+async def run_stages(
+    stages: List[Stage],
+    on_complete: Optional[Callable[[str, Any], Awaitable[None]]] = None
+) -> Tuple[Dict[str, Any], Dict[str, float]]:
+    by_name = {stage.name: stage for stage in stages}
+    for stage in stages:
+        missing = [name for name in stage.depends_on if name not in by_name]
+        if missing:
+            raise ValueError(f"Stage '{stage.name}' depends on unknown stages: {missing}")
+
+    limiter = stage_limiter()
+    results: Dict[str, Any] = {}
+    timings: Dict[str, float] = {}
+    tasks: Dict[str, asyncio.Task] = {}
+
+    async def run(stage: Stage):
+        await asyncio.gather(*(tasks[name] for name in stage.depends_on))
+        # Acquire only after dependencies resolve so waiting stages never hold a slot
+        async with limiter:
+            started = time.perf_counter()
+            result = await stage.func(results)
+            timings[stage.name] = round(time.perf_counter() - started, 4)
+        results[stage.name] = result
+        if on_complete is not None:
+            await on_complete(stage.name, result)
+
+    def schedule(stage: Stage, path: Tuple[str, ...] = ()):
+        if stage.name in tasks:
+            return
+        if stage.name in path:
+            raise ValueError(f"Stage cycle detected: {' -> '.join(path + (stage.name,))}")
+        for name in stage.depends_on:
+            schedule(by_name[name], path + (stage.name,))
+        tasks[stage.name] = asyncio.ensure_future(run(stage))
+
+    for stage in stages:
+        schedule(stage)
+
+    try:
+        await asyncio.gather(*tasks.values())
+    except BaseException:
+        for task in tasks.values():
+            task.cancel()
+        await asyncio.gather(*tasks.values(), return_exceptions=True)
+        raise
+
+    return results, timings
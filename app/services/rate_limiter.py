@@ -0,0 +1,197 @@
+import asyncio
+import random
+import time
+import weakref
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+from groq import APIConnectionError, APITimeoutError, InternalServerError, RateLimitError
+from redis.exceptions import RedisError
+from app.core.config import settings
+from app.core.redis import get_redis
+
+# Refills and debits the RPM and TPM buckets atomically; returns seconds to wait (0 = granted)
+_TOKEN_BUCKET_LUA = """
+local clock = redis.call('TIME')
+local now = tonumber(clock[1]) + tonumber(clock[2]) / 1000000
+local levels = {}
+local wait = 0
+for i = 1, #KEYS do
+    local capacity = tonumber(ARGV[i * 2 - 1])
+    local requested = tonumber(ARGV[i * 2])
+    local rate = capacity / 60.0
+    local state = redis.call('HMGET', KEYS[i], 'tokens', 'ts')
+    local tokens = tonumber(state[1]) or capacity
+    local ts = tonumber(state[2]) or now
+    tokens = math.min(capacity, tokens + math.max(0, now - ts) * rate)
+    levels[i] = tokens
+    if tokens < requested then
+        wait = math.max(wait, (requested - tokens) / rate)
+    end
+end
+for i = 1, #KEYS do
+    local tokens = levels[i]
+    if wait == 0 then
+        tokens = tokens - tonumber(ARGV[i * 2])
+    end
+    redis.call('HSET', KEYS[i], 'tokens', tokens, 'ts', now)
+    redis.call('EXPIRE', KEYS[i], 120)
+end
+return tostring(wait)
+"""
+
+RETRYABLE_ERRORS = (RateLimitError, APITimeoutError, APIConnectionError, InternalServerError, asyncio.TimeoutError)
+
+
+class LocalTokenBucket:
+    def __init__(self):
+        self._state: Dict[str, Tuple[float, float]] = {}
+
+    def take(self, budgets: Dict[str, Tuple[float, float]]) -> float:
+        now = time.monotonic()
+        levels = {}
+        wait = 0.0
+        for name, (capacity, requested) in budgets.items():
+            rate = capacity / 60.0
+            tokens, ts = self._state.get(name, (capacity, now))
+            tokens = min(capacity, tokens + max(0.0, now - ts) * rate)
+            levels[name] = tokens
+            if tokens < requested:
+                wait = max(wait, (requested - tokens) / rate)
+        for name, (_, requested) in budgets.items():
+            self._state[name] = (levels[name] - (requested if wait == 0 else 0), now)
+        return wait
+
+
+class AdaptiveConcurrency:
+    # AIMD: grow the in-flight limit slowly on healthy calls, halve it on 429s or slow calls
+    def __init__(self, initial: int, minimum: int, maximum: int, latency_target: float):
+        self.limit = float(initial)
+        self.minimum = minimum
+        self.maximum = maximum
+        self.latency_target = latency_target
+        self.in_flight = 0
+        self._conditions: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Condition]" = weakref.WeakKeyDictionary()
+
+    def _condition(self) -> asyncio.Condition:
+        loop = asyncio.get_running_loop()
+        condition = self._conditions.get(loop)
+        if condition is None:
+            condition = asyncio.Condition()
+            self._conditions[loop] = condition
+        return condition
+
+    async def acquire(self):
+        condition = self._condition()
+        async with condition:
+            await condition.wait_for(lambda: self.in_flight < int(self.limit))
+            self.in_flight += 1
+
+    async def release(self):
+        condition = self._condition()
+        async with condition:
+            self.in_flight -= 1
+            condition.notify_all()
+
+    def on_success(self, latency: float):
+        if latency > self.latency_target:
+            self.on_overload()
+        else:
+            self.limit = min(self.maximum, self.limit + 1.0 / self.limit)
+
+    def on_overload(self):
+        self.limit = max(float(self.minimum), self.limit / 2)
+
+
+class GroqRateLimiter:
+    def __init__(self):
+        self.local_bucket = LocalTokenBucket()
+        self.concurrency = AdaptiveConcurrency(
+            initial=max(1, settings.GROQ_MAX_CONCURRENCY // 2),
+            minimum=1,
+            maximum=settings.GROQ_MAX_CONCURRENCY,
+            latency_target=settings.GROQ_LATENCY_TARGET_SECONDS
+        )
+        self._scripts: Dict[int, Any] = {}
+        self.throttled_seconds = 0.0
+        self.rate_limited = 0
+        self.retries = 0
+        self.failures = 0
+
+    async def _reserve(self, tokens: int) -> float:
+        tokens = min(tokens, settings.GROQ_TOKENS_PER_MINUTE)
+        budgets = {
+            "groq:bucket:rpm": (settings.GROQ_REQUESTS_PER_MINUTE, 1),
+            "groq:bucket:tpm": (settings.GROQ_TOKENS_PER_MINUTE, tokens),
+        }
+        redis = await get_redis()
+        if redis is not None:
+            try:
+                script = self._scripts.get(id(redis))
+                if script is None:
+                    script = redis.register_script(_TOKEN_BUCKET_LUA)
+                    self._scripts[id(redis)] = script
+                args = [value for budget in budgets.values() for value in budget]
+                return float(await script(keys=list(budgets.keys()), args=args))
+            except RedisError:
+                pass
+        # Without Redis the budget is enforced per process only
+        return self.local_bucket.take(budgets)
+
+    async def acquire_budget(self, tokens: int):
+        while True:
+            wait = await self._reserve(tokens)
+            if wait <= 0:
+                return
+            wait += random.uniform(0, 0.25)
+            self.throttled_seconds += wait
+            await asyncio.sleep(wait)
+
+    def _backoff(self, attempt: int, error: Exception) -> float:
+        retry_after = None
+        response = getattr(error, "response", None)
+        if response is not None:
+            try:
+                retry_after = float(response.headers.get("retry-after"))
+            except (TypeError, ValueError):
+                retry_after = None
+        ceiling = min(settings.GROQ_BACKOFF_MAX_SECONDS, settings.GROQ_BACKOFF_BASE_SECONDS * 2 ** attempt)
+        delay = random.uniform(0, ceiling)
+        return max(delay, retry_after) if retry_after is not None else delay
+
+    async def call(self, request: Callable[[], Awaitable[Any]], estimated_tokens: int) -> Any:
+        attempt = 0
+        while True:
+            await self.acquire_budget(estimated_tokens)
+            await self.concurrency.acquire()
+            started = time.perf_counter()
+            try:
+                result = await asyncio.wait_for(request(), timeout=settings.GROQ_TIMEOUT_SECONDS)
+                self.concurrency.on_success(time.perf_counter() - started)
+                return result
+            except RETRYABLE_ERRORS as error:
+                if isinstance(error, RateLimitError):
+                    self.rate_limited += 1
+                    self.concurrency.on_overload()
+                if attempt >= settings.GROQ_MAX_RETRIES:
+                    self.failures += 1
+                    raise
+                delay = self._backoff(attempt, error)
+            finally:
+                await self.concurrency.release()
+
+            attempt += 1
+            self.retries += 1
+            await asyncio.sleep(delay)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "concurrency_limit": round(self.concurrency.limit, 2),
+            "in_flight": self.concurrency.in_flight,
+            "throttled_seconds": round(self.throttled_seconds, 2),
+            "rate_limited": self.rate_limited,
+            "retries": self.retries,
+            "failures": self.failures,
+        }
+
+
+def estimate_tokens(*texts: Optional[str]) -> int:
+    return sum(len(text or "") for text in texts) // 4 + 1
@@ -0,0 +1,245 @@
+import asyncio
+import time
+import uuid
+from datetime import datetime
+from typing import Any, Callable, List, Optional, Tuple
+import numpy as np
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.config import settings
+from app.core.vectors import EMBEDDING_STORAGE, vector_sql_type, vector_index_sql, binary_index_sql
+from app.models.reindex_job import ReindexJob, ReindexStatus
+from app.services.tenant_vector_cache import bump_all_tenant_versions
+from app.services.vector_index import create_index_concurrently, drop_column_indexes
+from app.services.vector_storage import VECTOR_TABLES, record_embedding_columns
+
+SHADOW_COLUMN = "embedding_next"
+PREVIOUS_COLUMN = "embedding_previous"
+# Tables encoded from their own text; documents get the centroid of their chunks
+SOURCE_TABLES = ("document_chunks", "knowledge_entries")
+# Full keyset pass per table, then a sweep for rows inserted behind the cursor
+STEPS = [("backfill", table) for table in SOURCE_TABLES] + [("catchup", table) for table in SOURCE_TABLES]
+
+Encoder = Callable[[List[str]], np.ndarray]
+ProgressCallback = Callable[[ReindexJob], Any]
+
+
+def load_encoder(model_name: str) -> Tuple[Encoder, int]:
+    if model_name == settings.HUGGINGFACE_MODEL:
+        from app.services.ai_service import get_embedding_model
+        model = get_embedding_model()
+    else:
+        from sentence_transformers import SentenceTransformer
+        model = SentenceTransformer(model_name)
+
+    def encode(texts: List[str]) -> np.ndarray:
+        return model.encode(texts, batch_size=settings.EMBEDDING_BATCH_SIZE, convert_to_numpy=True)
+
+    return encode, model.get_sentence_embedding_dimension()
+
+
+def _vector_literal(vector: np.ndarray) -> str:
+    return "[" + ",".join(f"{value:.7g}" for value in vector) + "]"
+
+
+async def prepare_shadow_columns(db: AsyncSession, dimension: int):
+    for table in VECTOR_TABLES:
+        await db.execute(text(f"ALTER TABLE {table} DROP COLUMN IF EXISTS {SHADOW_COLUMN}"))
+        await db.execute(text(f"ALTER TABLE {table} ADD COLUMN {SHADOW_COLUMN} {vector_sql_type(dimension)}"))
+
+
+async def count_source_rows(db: AsyncSession) -> int:
+    total = 0
+    for table in SOURCE_TABLES:
+        total += await db.scalar(text(f"SELECT count(*) FROM {table} WHERE content IS NOT NULL"))
+    return total
+
+
+async def _fetch_batch(db: AsyncSession, table: str, last_id: Optional[str], only_missing: bool) -> List[Any]:
+    conditions = ["content IS NOT NULL"]
+    params = {"limit": settings.REINDEX_BATCH_SIZE}
+    if last_id is not None:
+        conditions.append("id > CAST(:last_id AS uuid)")
+        params["last_id"] = last_id
+    if only_missing:
+        conditions.append(f"{SHADOW_COLUMN} IS NULL")
+
+    result = await db.execute(
+        text(f"SELECT id, content FROM {table} WHERE {' AND '.join(conditions)} ORDER BY id LIMIT :limit"),
+        params
+    )
+    return result.fetchall()
+
+
+async def _write_batch(db: AsyncSession, table: str, ids: List[uuid.UUID], vectors: np.ndarray):
+    # One UPDATE ... FROM unnest() per batch instead of a statement per row
+    await db.execute(
+        text(f"""
+            UPDATE {table} AS t
+            SET {SHADOW_COLUMN} = CAST(u.embedding AS {EMBEDDING_STORAGE.value})
+            FROM unnest(CAST(:ids AS uuid[]), CAST(:embeddings AS text[])) AS u(id, embedding)
+            WHERE t.id = u.id
+        """),
+        {"ids": [str(row_id) for row_id in ids], "embeddings": [_vector_literal(vector) for vector in vectors]}
+    )
+
+
+async def refresh_document_centroids(db: AsyncSession):
+    await db.execute(text(f"""
+        UPDATE documents AS d
+        SET {SHADOW_COLUMN} = c.centroid
+        FROM (
+            SELECT document_id, avg({SHADOW_COLUMN}) AS centroid
+            FROM document_chunks
+            WHERE {SHADOW_COLUMN} IS NOT NULL
+            GROUP BY document_id
+        ) AS c
+        WHERE d.id = c.document_id
+    """))
+
+
+def _update_rate(job: ReindexJob, started: float, rows_at_start: int):
+    elapsed = time.monotonic() - started
+    if elapsed <= 0:
+        return
+    job.rows_per_second = round((job.rows_done - rows_at_start) / elapsed, 2)
+    remaining = max(job.rows_total - job.rows_done, 0)
+    job.eta_seconds = round(remaining / job.rows_per_second, 1) if job.rows_per_second else None
+
+
+async def _sweep(
+    db: AsyncSession,
+    job: ReindexJob,
+    step: int,
+    encode: Encoder,
+    deadline: Optional[float],
+    on_progress: Optional[ProgressCallback]
+) -> bool:
+    phase, table = STEPS[step]
+    started, rows_at_start = time.monotonic(), job.rows_done
+    last_id = (job.checkpoint or {}).get("last_id")
+
+    while deadline is None or time.monotonic() < deadline:
+        rows = await _fetch_batch(db, table, last_id, only_missing=phase == "catchup")
+        if not rows:
+            return True
+        vectors = await asyncio.to_thread(encode, [row.content for row in rows])
+        await _write_batch(db, table, [row.id for row in rows], vectors)
+
+        # The batch and the cursor commit together, so a crash never skips or repeats work
+        last_id = str(rows[-1].id)
+        job.checkpoint = {"step": step, "phase": phase, "table": table, "last_id": last_id}
+        job.rows_done += len(rows)
+        _update_rate(job, started, rows_at_start)
+        await db.commit()
+        if on_progress is not None:
+            on_progress(job)
+    return False
+
+
+async def run_reindex(
+    db: AsyncSession,
+    job_id: uuid.UUID,
+    max_seconds: Optional[float] = None,
+    on_progress: Optional[ProgressCallback] = None
+) -> ReindexJob:
+    # Returns with status RUNNING when max_seconds ran out; calling again resumes from the checkpoint
+    job = await db.get(ReindexJob, job_id)
+    if job is None:
+        raise ValueError(f"Reindex job {job_id} not found")
+    if job.status in (ReindexStatus.READY, ReindexStatus.COMPLETED):
+        return job
+
+    deadline = time.monotonic() + max_seconds if max_seconds else None
+    encode, dimension = await asyncio.to_thread(load_encoder, job.model_name)
+
+    try:
+        if not job.checkpoint:
+            await prepare_shadow_columns(db, dimension)
+            job.dimension = dimension
+            job.rows_total = await count_source_rows(db)
+            job.rows_done = 0
+            job.checkpoint = {"step": 0, "last_id": None}
+        job.status = ReindexStatus.RUNNING
+        job.error = None
+        await db.commit()
+
+        for step in range(job.checkpoint["step"], len(STEPS)):
+            if not await _sweep(db, job, step, encode, deadline, on_progress):
+                return job
+            job.checkpoint = {"step": step + 1, "last_id": None}
+            await db.commit()
+
+        await refresh_document_centroids(db)
+        job.checkpoint = {"step": len(STEPS), "phase": "index", "last_id": None}
+        await db.commit()
+        await build_shadow_indexes(job.dimension)
+
+        job.status = ReindexStatus.READY
+        job.eta_seconds = 0
+        await db.commit()
+
+        if job.auto_cutover:
+            await cutover(db, job, encode)
+    except Exception as e:
+        await db.rollback()
+        await db.refresh(job)
+        job.status = ReindexStatus.FAILED
+        job.error = f"{type(e).__name__}: {e}"
+        await db.commit()
+        raise
+
+    return job
+
+
+async def build_shadow_indexes(dimension: int):
+    # Built before cutover so search never runs unindexed on the new vectors
+    for table in VECTOR_TABLES:
+        name = f"ix_{table}_{SHADOW_COLUMN}"
+        await create_index_concurrently(name, vector_index_sql(table, name, column=SHADOW_COLUMN))
+        # Always built so EMBEDDING_BINARY_RESCORE can be switched on without a rebuild
+        name = f"ix_{table}_{SHADOW_COLUMN}_binary"
+        await create_index_concurrently(
+            name,
+            binary_index_sql(table, name, column=SHADOW_COLUMN, dimension=dimension)
+        )
+
+
+async def cutover(db: AsyncSession, job: ReindexJob, encode: Optional[Encoder] = None) -> ReindexJob:
+    if job.status != ReindexStatus.READY:
+        raise ValueError(f"Reindex job {job.id} is {job.status.value}, not ready for cutover")
+    if encode is None:
+        encode, _ = await asyncio.to_thread(load_encoder, job.model_name)
+
+    # Writers wait while the last rows are filled in; readers keep going until the renames below,
+    # which take ACCESS EXCLUSIVE and block them until commit. lock_timeout makes the cutover
+    # fail (the job can be resumed) instead of queueing every query behind a long-running reader
+    await db.execute(text(f"SET LOCAL lock_timeout = {int(settings.REINDEX_CUTOVER_LOCK_TIMEOUT_MS)}"))
+    await db.execute(text(f"LOCK TABLE {', '.join(VECTOR_TABLES)} IN SHARE ROW EXCLUSIVE MODE"))
+    for table in SOURCE_TABLES:
+        while True:
+            rows = await _fetch_batch(db, table, None, only_missing=True)
+            if not rows:
+                break
+            vectors = await asyncio.to_thread(encode, [row.content for row in rows])
+            await _write_batch(db, table, [row.id for row in rows], vectors)
+    await refresh_document_centroids(db)
+
+    for table in VECTOR_TABLES:
+        await db.execute(text(f"ALTER TABLE {table} DROP COLUMN IF EXISTS {PREVIOUS_COLUMN}"))
+        # The old vectors stay for rollback, their ANN indexes would only take memory
+        await drop_column_indexes(db, table, "embedding")
+        await db.execute(text(f"ALTER TABLE {table} RENAME COLUMN embedding TO {PREVIOUS_COLUMN}"))
+        await db.execute(text(f"ALTER TABLE {table} RENAME COLUMN {SHADOW_COLUMN} TO embedding"))
+        await db.execute(text(f"ALTER INDEX IF EXISTS ix_{table}_{SHADOW_COLUMN} RENAME TO ix_{table}_embedding"))
+        await db.execute(text(
+            f"ALTER INDEX IF EXISTS ix_{table}_{SHADOW_COLUMN}_binary RENAME TO ix_{table}_embedding_binary"
+        ))
+    await record_embedding_columns(db, job.model_name, job.dimension)
+
+    job.status = ReindexStatus.COMPLETED
+    job.completed_at = datetime.utcnow()
+    await db.commit()
+    # Cached tenant matrices hold the old model's vectors
+    await bump_all_tenant_versions()
+    return job
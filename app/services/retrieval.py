@@ -0,0 +1,230 @@
+import asyncio
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Any, Dict, Optional, Sequence
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal
+from app.core.vectors import query_vector_sql, binary_candidates_sql
+from app.services.vector_index import apply_search_settings
+from app.services.tenant_vector_cache import tenant_vector_cache
+
+QUERY_VECTOR = query_vector_sql()
+
+
+def _rescore_filter(table: str, where: str, column: str = "id") -> str:
+    # With binary rescoring only the quantized-index candidates reach the exact distance
+    if not settings.EMBEDDING_BINARY_RESCORE:
+        return ""
+    return f"AND {column} IN ({binary_candidates_sql(table, where)})"
+
+
+def _query_params(company_id: str, query_embedding: List[float], limit: int, candidates: int) -> Dict[str, Any]:
+    return {
+        "query_embedding": str(query_embedding),
+        "company_id": str(company_id),
+        "limit": limit,
+        "rescore_candidates": candidates * settings.EMBEDDING_RESCORE_OVERSAMPLE
+    }
+
+
+def _index_candidates(params: Dict[str, Any]) -> int:
+    # Rows the index scan has to return for the query's LIMIT
+    if settings.EMBEDDING_BINARY_RESCORE:
+        return params["rescore_candidates"]
+    return params.get("candidates", params["limit"])
+
+
+async def search_knowledge_entries(
+    db: AsyncSession,
+    company_id: str,
+    query_embedding: List[float],
+    limit: int,
+    ef_search: Optional[int] = None,
+    probes: Optional[int] = None
+) -> List[Any]:
+    if settings.VECTOR_CACHE_ENABLED:
+        # Small tenants are searched exactly in memory; None means pgvector serves this one
+        cached = await tenant_vector_cache.search(db, company_id, query_embedding, limit)
+        if cached is not None:
+            return cached
+
+    sql = text(f"""
+        SELECT id, title, content, knowledge_type, risk_level, deadline,
+               embedding <=> {QUERY_VECTOR} as distance
+        FROM knowledge_entries
+        WHERE company_id = :company_id AND is_active = true
+              {_rescore_filter("knowledge_entries", "company_id = :company_id AND is_active = true")}
+        ORDER BY distance
+        LIMIT :limit
+    """)
+
+    params = _query_params(company_id, query_embedding, limit, limit)
+    await apply_search_settings(db, ef_search, probes, _index_candidates(params))
+    result = await db.execute(sql, params)
+    return result.fetchall()
+
+
+async def search_chunks(
+    db: AsyncSession,
+    company_id: str,
+    query_embedding: List[float],
+    limit: int,
+    ef_search: Optional[int] = None,
+    probes: Optional[int] = None
+) -> List[Any]:
+    sql = text(f"""
+        SELECT c.id, c.document_id, c.chunk_index, c.content, c.start_offset, c.end_offset,
+               c.locator, d.original_filename, c.embedding <=> {QUERY_VECTOR} as distance
+        FROM document_chunks c
+        JOIN documents d ON d.id = c.document_id
+        WHERE c.company_id = :company_id
+              {_rescore_filter("document_chunks", "company_id = :company_id", "c.id")}
+        ORDER BY distance
+        LIMIT :limit
+    """)
+
+    params = _query_params(company_id, query_embedding, limit, limit)
+    await apply_search_settings(db, ef_search, probes, _index_candidates(params))
+    result = await db.execute(sql, params)
+    return result.fetchall()
+
+
+async def search_documents_by_chunks(
+    db: AsyncSession,
+    company_id: str,
+    query_embedding: List[float],
+    limit: int,
+    ef_search: Optional[int] = None,
+    probes: Optional[int] = None
+) -> List[Any]:
+    # Rank the closest chunks first, then keep the best-matching chunk per document
+    sql = text(f"""
+        SELECT * FROM (
+            SELECT DISTINCT ON (ranked.document_id)
+                   d.id, d.filename, d.original_filename, d.document_type, d.status, d.created_at,
+                   ranked.chunk_index, ranked.content, ranked.locator, ranked.distance
+            FROM (
+                SELECT document_id, chunk_index, content, locator,
+                       embedding <=> {QUERY_VECTOR} as distance
+                FROM document_chunks
+                WHERE company_id = :company_id
+                      {_rescore_filter("document_chunks", "company_id = :company_id")}
+                ORDER BY distance
+                LIMIT :candidates
+            ) ranked
+            JOIN documents d ON d.id = ranked.document_id
+            ORDER BY ranked.document_id, ranked.distance
+        ) best
+        ORDER BY distance
+        LIMIT :limit
+    """)
+
+    candidates = limit * settings.CHUNK_SEARCH_OVERSAMPLE
+    params = {**_query_params(company_id, query_embedding, limit, candidates), "candidates": candidates}
+    await apply_search_settings(db, ef_search, probes, _index_candidates(params))
+    result = await db.execute(sql, params)
+    return result.fetchall()
+
+
+async def search_knowledge_entries_lexical(
+    db: AsyncSession,
+    company_id: str,
+    query: str,
+    limit: int
+) -> List[Any]:
+    # websearch syntax keeps quoted phrases and identifiers such as "Section 4.2" or INV-2024-017 intact
+    sql = text("""
+        SELECT id, title, content, knowledge_type, risk_level, deadline,
+               ts_rank_cd(search_vector, query) as rank
+        FROM knowledge_entries, websearch_to_tsquery(CAST(:ts_config AS regconfig), :query) query
+        WHERE company_id = :company_id AND is_active = true AND search_vector @@ query
+        ORDER BY rank DESC
+        LIMIT :limit
+    """)
+
+    result = await db.execute(
+        sql,
+        {"ts_config": settings.FULLTEXT_SEARCH_CONFIG, "query": query, "company_id": str(company_id), "limit": limit}
+    )
+    return result.fetchall()
+
+
+async def search_chunks_lexical(
+    db: AsyncSession,
+    company_id: str,
+    query: str,
+    limit: int
+) -> List[Any]:
+    sql = text("""
+        SELECT c.id, c.document_id, c.chunk_index, c.content, c.start_offset, c.end_offset,
+               c.locator, d.original_filename, ts_rank_cd(c.search_vector, query) as rank
+        FROM document_chunks c
+        JOIN documents d ON d.id = c.document_id,
+             websearch_to_tsquery(CAST(:ts_config AS regconfig), :query) query
+        WHERE c.company_id = :company_id AND c.search_vector @@ query
+        ORDER BY rank DESC
+        LIMIT :limit
+    """)
+
+    result = await db.execute(
+        sql,
+        {"ts_config": settings.FULLTEXT_SEARCH_CONFIG, "query": query, "company_id": str(company_id), "limit": limit}
+    )
+    return result.fetchall()
+
+
+def reciprocal_rank_fusion(rankings: Sequence[Sequence[Any]], limit: int, k: Optional[int] = None) -> List[Any]:
+    # Ranks, not raw scores, are fused, so cosine distances and ts_rank values never need calibrating
+    k = k or settings.RRF_K
+    scores: Dict[Any, float] = {}
+    rows: Dict[Any, Any] = {}
+    for ranking in rankings:
+        for position, row in enumerate(ranking):
+            scores[row.id] = scores.get(row.id, 0.0) + 1.0 / (k + position + 1)
+            rows.setdefault(row.id, row)
+    ranked = sorted(scores, key=scores.get, reverse=True)
+    return [rows[row_id] for row_id in ranked[:limit]]
+
+
+async def _hybrid_search(vector_search, lexical_search, company_id, query, query_embedding, limit, **search_options):
+    candidates = limit * settings.HYBRID_CANDIDATE_MULTIPLIER
+
+    # Separate sessions: one connection cannot run two statements at once
+    async def run_vector():
+        async with AsyncSessionLocal() as db:
+            return await vector_search(db, company_id, query_embedding, candidates, **search_options)
+
+    async def run_lexical():
+        async with AsyncSessionLocal() as db:
+            return await lexical_search(db, company_id, query, candidates)
+
+    vector_rows, lexical_rows = await asyncio.gather(run_vector(), run_lexical())
+    return reciprocal_rank_fusion([vector_rows, lexical_rows], limit)
+
+
+async def hybrid_search_knowledge_entries(
+    company_id: str,
+    query: str,
+    query_embedding: List[float],
+    limit: int,
+    ef_search: Optional[int] = None,
+    probes: Optional[int] = None
+) -> List[Any]:
+    return await _hybrid_search(
+        search_knowledge_entries, search_knowledge_entries_lexical,
+        company_id, query, query_embedding, limit, ef_search=ef_search, probes=probes
+    )
+
+
+async def hybrid_search_chunks(
+    company_id: str,
+    query: str,
+    query_embedding: List[float],
+    limit: int,
+    ef_search: Optional[int] = None,
+    probes: Optional[int] = None
+) -> List[Any]:
+    return await _hybrid_search(
+        search_chunks, search_chunks_lexical,
+        company_id, query, query_embedding, limit, ef_search=ef_search, probes=probes
+    )
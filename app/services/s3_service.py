@@ -1,58 +1,273 @@
+import asyncio
+import os
+import shutil
 import boto3
+from boto3.s3.transfer import TransferConfig
+from botocore.config import Config
 from botocore.exceptions import ClientError
-from typing import Optional
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from io import BytesIO
+from pathlib import Path
+from tempfile import SpooledTemporaryFile
+from typing import Optional, BinaryIO
 from app.core.config import settings
 
-s3_client = boto3.client(
-    's3',
-    aws_access_key_id=settings.AWS_ACCESS_KEY_ID,
-    aws_secret_access_key=settings.AWS_SECRET_ACCESS_KEY,
-    region_name=settings.AWS_REGION
-)
+MB = 1024 * 1024
 
 
-async def upload_file(file_content: bytes, file_key: str, content_type: str) -> bool:
-    try:
-        s3_client.put_object(
-            Bucket=settings.S3_BUCKET_NAME,
-            Key=file_key,
-            Body=file_content,
-            ContentType=content_type
+class ObjectStorage:
+    def __init__(self, max_workers: int):
+        # Blocking SDK/file calls run here, never on the event loop
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="storage")
+
+    async def _run(self, func, *args, **kwargs):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, partial(func, *args, **kwargs))
+
+    def _spool(self) -> SpooledTemporaryFile:
+        return SpooledTemporaryFile(max_size=settings.DOWNLOAD_SPOOL_MAX_MB * MB)
+
+    async def upload_file(self, file_content: bytes, file_key: str, content_type: str) -> bool:
+        raise NotImplementedError
+
+    async def upload_fileobj(self, file_obj: BinaryIO, file_key: str, content_type: str) -> bool:
+        raise NotImplementedError
+
+    async def download_file(self, file_key: str) -> Optional[bytes]:
+        raise NotImplementedError
+
+    async def download_fileobj(self, file_key: str) -> Optional[BinaryIO]:
+        raise NotImplementedError
+
+    async def download_range(self, file_key: str, start: int, end: int) -> Optional[bytes]:
+        raise NotImplementedError
+
+    async def delete_file(self, file_key: str) -> bool:
+        raise NotImplementedError
+
+    async def generate_presigned_url(self, file_key: str, expiration: int = 3600) -> Optional[str]:
+        raise NotImplementedError
+
+
+class S3Storage(ObjectStorage):
+    def __init__(self):
+        super().__init__(max_workers=settings.S3_EXECUTOR_WORKERS)
+        self.bucket = settings.S3_BUCKET_NAME
+        self.client = boto3.client(
+            's3',
+            aws_access_key_id=settings.AWS_ACCESS_KEY_ID,
+            aws_secret_access_key=settings.AWS_SECRET_ACCESS_KEY,
+            region_name=settings.AWS_REGION,
+            config=Config(
+                max_pool_connections=settings.S3_MAX_POOL_CONNECTIONS,
+                retries={"max_attempts": 5, "mode": "adaptive"}
+            )
+        )
+        # Multipart upload and ranged parallel download above the threshold
+        self.transfer_config = TransferConfig(
+            multipart_threshold=settings.S3_MULTIPART_THRESHOLD_MB * MB,
+            multipart_chunksize=settings.S3_MULTIPART_CHUNKSIZE_MB * MB,
+            max_concurrency=settings.S3_MULTIPART_CONCURRENCY,
+            use_threads=True
         )
-        return True
-    except ClientError:
-        return False
+
+    async def upload_file(self, file_content: bytes, file_key: str, content_type: str) -> bool:
+        try:
+            await self._run(
+                self.client.put_object,
+                Bucket=self.bucket,
+                Key=file_key,
+                Body=file_content,
+                ContentType=content_type
+            )
+            return True
+        except ClientError:
+            return False
+
+    async def upload_fileobj(self, file_obj: BinaryIO, file_key: str, content_type: str) -> bool:
+        try:
+            await self._run(
+                self.client.upload_fileobj,
+                file_obj,
+                self.bucket,
+                file_key,
+                ExtraArgs={"ContentType": content_type},
+                Config=self.transfer_config
+            )
+            return True
+        except ClientError:
+            return False
+
+    async def download_file(self, file_key: str) -> Optional[bytes]:
+        def read():
+            response = self.client.get_object(Bucket=self.bucket, Key=file_key)
+            return response['Body'].read()
+
+        try:
+            return await self._run(read)
+        except ClientError:
+            return None
+
+    async def download_fileobj(self, file_key: str) -> Optional[BinaryIO]:
+        file_obj = self._spool()
+        try:
+            await self._run(
+                self.client.download_fileobj,
+                self.bucket,
+                file_key,
+                file_obj,
+                Config=self.transfer_config
+            )
+        except ClientError:
+            file_obj.close()
+            return None
+        file_obj.seek(0)
+        return file_obj
+
+    async def download_range(self, file_key: str, start: int, end: int) -> Optional[bytes]:
+        def read():
+            response = self.client.get_object(Bucket=self.bucket, Key=file_key, Range=f"bytes={start}-{end}")
+            return response['Body'].read()
+
+        try:
+            return await self._run(read)
+        except ClientError:
+            return None
+
+    async def delete_file(self, file_key: str) -> bool:
+        try:
+            await self._run(self.client.delete_object, Bucket=self.bucket, Key=file_key)
+            return True
+        except ClientError:
+            return False
+
+    async def generate_presigned_url(self, file_key: str, expiration: int = 3600) -> Optional[str]:
+        # Signing is local computation, no network round-trip
+        try:
+            return self.client.generate_presigned_url(
+                'get_object',
+                Params={'Bucket': self.bucket, 'Key': file_key},
+                ExpiresIn=expiration
+            )
+        except ClientError:
+            return None
+
+
+class LocalStorage(ObjectStorage):
+    def __init__(self, root: str):
+        super().__init__(max_workers=settings.S3_EXECUTOR_WORKERS)
+        self.root = Path(root).resolve()
+
+    def _path(self, file_key: str) -> Path:
+        path = (self.root / file_key).resolve()
+        if self.root not in path.parents:
+            raise ValueError(f"Invalid storage key: {file_key}")
+        return path
+
+    def _write(self, file_obj: BinaryIO, file_key: str):
+        path = self._path(file_key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(f".{path.name}.{os.getpid()}.part")
+        try:
+            with open(tmp_path, "wb") as target:
+                shutil.copyfileobj(file_obj, target, settings.S3_MULTIPART_CHUNKSIZE_MB * MB)
+            os.replace(tmp_path, path)
+        except BaseException:
+            tmp_path.unlink(missing_ok=True)
+            raise
+
+    def _read_into(self, file_key: str, file_obj: BinaryIO):
+        with open(self._path(file_key), "rb") as source:
+            shutil.copyfileobj(source, file_obj, settings.S3_MULTIPART_CHUNKSIZE_MB * MB)
+
+    def _read_range(self, file_key: str, start: int, end: int) -> bytes:
+        with open(self._path(file_key), "rb") as source:
+            source.seek(start)
+            return source.read(end - start + 1)
+
+    async def upload_file(self, file_content: bytes, file_key: str, content_type: str) -> bool:
+        return await self.upload_fileobj(BytesIO(file_content), file_key, content_type)
+
+    async def upload_fileobj(self, file_obj: BinaryIO, file_key: str, content_type: str) -> bool:
+        try:
+            await self._run(self._write, file_obj, file_key)
+            return True
+        except (OSError, ValueError):
+            return False
+
+    async def download_file(self, file_key: str) -> Optional[bytes]:
+        try:
+            return await self._run(self._path(file_key).read_bytes)
+        except (OSError, ValueError):
+            return None
+
+    async def download_fileobj(self, file_key: str) -> Optional[BinaryIO]:
+        file_obj = self._spool()
+        try:
+            await self._run(self._read_into, file_key, file_obj)
+        except (OSError, ValueError):
+            file_obj.close()
+            return None
+        file_obj.seek(0)
+        return file_obj
+
+    async def download_range(self, file_key: str, start: int, end: int) -> Optional[bytes]:
+        try:
+            return await self._run(self._read_range, file_key, start, end)
+        except (OSError, ValueError):
+            return None
+
+    async def delete_file(self, file_key: str) -> bool:
+        try:
+            await self._run(self._path(file_key).unlink)
+            return True
+        except (OSError, ValueError):
+            return False
+
+    async def generate_presigned_url(self, file_key: str, expiration: int = 3600) -> Optional[str]:
+        try:
+            return self._path(file_key).as_uri()
+        except ValueError:
+            return None
+
+
+_storage: Optional[ObjectStorage] = None
+
+
+def get_storage() -> ObjectStorage:
+    global _storage
+    if _storage is None:
+        if settings.STORAGE_BACKEND == "local":
+            _storage = LocalStorage(settings.LOCAL_STORAGE_PATH)
+        else:
+            _storage = S3Storage()
+    return _storage
+
+
+async def upload_file(file_content: bytes, file_key: str, content_type: str) -> bool:
+    return await get_storage().upload_file(file_content, file_key, content_type)
+
+
+async def upload_fileobj(file_obj: BinaryIO, file_key: str, content_type: str) -> bool:
+    return await get_storage().upload_fileobj(file_obj, file_key, content_type)
 
 
 async def download_file(file_key: str) -> Optional[bytes]:
-    try:
-        response = s3_client.get_object(
-            Bucket=settings.S3_BUCKET_NAME,
-            Key=file_key
-        )
-        return response['Body'].read()
-    except ClientError:
-        return None
+    return await get_storage().download_file(file_key)
+
+
+async def download_fileobj(file_key: str) -> Optional[BinaryIO]:
+    return await get_storage().download_fileobj(file_key)
+
+
+async def download_range(file_key: str, start: int, end: int) -> Optional[bytes]:
+    return await get_storage().download_range(file_key, start, end)
 
 
 async def delete_file(file_key: str) -> bool:
-    try:
-        s3_client.delete_object(
-            Bucket=settings.S3_BUCKET_NAME,
-            Key=file_key
-        )
-        return True
-    except ClientError:
-        return False
+    return await get_storage().delete_file(file_key)
 
 
 async def generate_presigned_url(file_key: str, expiration: int = 3600) -> Optional[str]:
-    try:
-        url = s3_client.generate_presigned_url(
-            'get_object',
-            Params={'Bucket': settings.S3_BUCKET_NAME, 'Key': file_key},
-            ExpiresIn=expiration
-        )
-        return url
-    except ClientError:
-        return None
+    return await get_storage().generate_presigned_url(file_key, expiration)
@@ -0,0 +1,120 @@
+import asyncio
+import json
+from typing import Any, Dict, List, Tuple
+from redis.exceptions import RedisError
+from app.core.celery_app import celery_app, QUEUE_INTERACTIVE, QUEUE_BULK, QUEUE_SCHEDULED
+from app.core.config import settings
+from app.core.redis import get_redis
+
+_RING_KEY = "queue:bulk:ring"
+_ACTIVE_KEY = "queue:bulk:active"
+_TENANT_PREFIX = "queue:bulk:tenant:"
+_PUMP_LOCK_KEY = "queue:bulk:pump-lock"
+
+# Append tasks to their tenants' backlogs (ARGV holds tenant, payload pairs); a tenant joins
+# the round-robin ring when its backlog starts
+_ENQUEUE_LUA = """
+for i = 1, #ARGV, 2 do
+    redis.call('RPUSH', KEYS[1] .. ARGV[i], ARGV[i + 1])
+    if redis.call('SADD', KEYS[2], ARGV[i]) == 1 then
+        redis.call('RPUSH', KEYS[3], ARGV[i])
+    end
+end
+return #ARGV / 2
+"""
+
+# Take one task from the tenant at the head of the ring and rotate it to the back if it has more
+_POP_LUA = """
+local tenant = redis.call('LPOP', KEYS[1])
+if not tenant then
+    return false
+end
+local key = ARGV[1] .. tenant
+local payload = redis.call('LPOP', key)
+if redis.call('LLEN', key) > 0 then
+    redis.call('RPUSH', KEYS[1], tenant)
+else
+    redis.call('SREM', KEYS[2], tenant)
+end
+return {tenant, payload or ''}
+"""
+
+
+def _send_direct(task_name: str, jobs: List[Tuple[Any, List[Any]]]):
+    for _, args in jobs:
+        celery_app.send_task(task_name, args=args, queue=QUEUE_BULK)
+
+
+async def enqueue_bulk(task_name: str, jobs: List[Tuple[Any, List[Any]]]):
+    # jobs are (company_id, args) pairs; one script call and one pump for the whole set
+    if not jobs:
+        return
+    redis = await get_redis()
+    if redis is not None:
+        argv = []
+        for company_id, args in jobs:
+            argv.extend((str(company_id), json.dumps({"task": task_name, "args": args})))
+        try:
+            await redis.eval(_ENQUEUE_LUA, 3, _TENANT_PREFIX, _ACTIVE_KEY, _RING_KEY, *argv)
+        except RedisError:
+            # The rows are already committed; skipping the fair queue beats leaving them unqueued
+            pass
+        else:
+            celery_app.send_task("app.tasks.queue_tasks.pump_bulk_queue", queue=QUEUE_SCHEDULED)
+            return
+    await asyncio.to_thread(_send_direct, task_name, jobs)
+
+
+def broker_queue_depth(queue: str) -> int:
+    with celery_app.connection_for_read() as connection:
+        return connection.default_channel.queue_declare(queue=queue, passive=True).message_count
+
+
+async def pump_bulk_queue() -> int:
+    # Keeps the broker's bulk queue shallow and fills it tenant by tenant, so one
+    # company's backlog waits in Redis instead of in front of everyone else's
+    redis = await get_redis()
+    if redis is None or not await redis.set(_PUMP_LOCK_KEY, "1", nx=True, ex=30):
+        return 0
+
+    dispatched = 0
+    try:
+        slots = settings.BULK_QUEUE_TARGET_DEPTH - await asyncio.to_thread(broker_queue_depth, QUEUE_BULK)
+        while slots > 0:
+            popped = await redis.eval(_POP_LUA, 2, _RING_KEY, _ACTIVE_KEY, _TENANT_PREFIX)
+            if not popped:
+                break
+            _, payload = popped
+            if not payload:
+                continue
+            task = json.loads(payload)
+            celery_app.send_task(task["task"], args=task["args"], queue=QUEUE_BULK)
+            dispatched += 1
+            slots -= 1
+    finally:
+        await redis.delete(_PUMP_LOCK_KEY)
+    return dispatched
+
+
+async def queue_stats() -> Dict[str, Any]:
+    depths = {}
+    for queue in (QUEUE_INTERACTIVE, QUEUE_BULK, QUEUE_SCHEDULED):
+        try:
+            depths[queue] = await asyncio.to_thread(broker_queue_depth, queue)
+        except Exception:
+            depths[queue] = None
+
+    backlog: Dict[str, int] = {}
+    redis = await get_redis()
+    if redis is not None:
+        try:
+            tenants = await redis.smembers(_ACTIVE_KEY)
+            for tenant in tenants:
+                backlog[tenant] = await redis.llen(f"{_TENANT_PREFIX}{tenant}")
+        except RedisError:
+            pass
+
+    return {
+        "broker_depth": depths,
+        "bulk_backlog": {"tenants": len(backlog), "tasks": sum(backlog.values()), "by_tenant": backlog},
+    }
@@ -0,0 +1,241 @@
+import asyncio
+import threading
+import time
+from collections import OrderedDict, namedtuple
+from typing import Dict, List, Optional
+import numpy as np
+from redis.exceptions import RedisError
+from sqlalchemy import select, func
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.config import settings
+from app.core.redis import get_redis
+from app.core.vectors import EMBEDDING_DIMENSION
+from app.models.knowledge_entry import KnowledgeEntry
+
+VERSION_KEY = "vecidx:knowledge:{company_id}"
+# Bumped when every tenant's vectors change at once, e.g. a reindex cutover
+EPOCH_KEY = "vecidx:knowledge:epoch"
+# Cap on remembered oversized tenants; forgetting one only costs a COUNT(*) on its next search
+MAX_OVERSIZED_TENANTS = 4096
+
+KnowledgeHit = namedtuple(
+    "KnowledgeHit",
+    ["id", "title", "content", "knowledge_type", "risk_level", "deadline", "distance"]
+)
+
+
+class _TenantMatrix:
+    __slots__ = ("version", "matrix", "rows", "nbytes", "loaded_at")
+
+    def __init__(self, version: str, matrix: np.ndarray, rows: List[tuple], nbytes: int):
+        self.version = version
+        self.matrix = matrix
+        self.rows = rows
+        self.nbytes = nbytes
+        self.loaded_at = time.monotonic()
+
+
+async def bump_tenant_version(company_id):
+    # Called after commits that change a tenant's knowledge entries
+    redis = await get_redis()
+    if redis is None:
+        return
+    try:
+        await redis.incr(VERSION_KEY.format(company_id=company_id))
+    except RedisError:
+        # Entries also expire after VECTOR_CACHE_MAX_AGE_SECONDS
+        pass
+
+
+async def bump_all_tenant_versions():
+    redis = await get_redis()
+    if redis is None:
+        return
+    try:
+        await redis.incr(EPOCH_KEY)
+    except RedisError:
+        pass
+
+
+def _as_array(value) -> np.ndarray:
+    # HALFVEC columns come back as pgvector HalfVector objects
+    if hasattr(value, "to_numpy"):
+        value = value.to_numpy()
+    return np.asarray(value, dtype=np.float32)
+
+
+class TenantVectorCache:
+    def __init__(self, max_bytes: int, max_tenant_rows: int, max_age_seconds: float):
+        self.max_bytes = max_bytes
+        self.max_tenant_rows = max_tenant_rows
+        self.max_age_seconds = max_age_seconds
+        self._entries: "OrderedDict[str, _TenantMatrix]" = OrderedDict()
+        # Tenants that did not fit at a given version go straight to pgvector
+        self._oversized: "OrderedDict[str, str]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._load_locks: Dict[str, asyncio.Lock] = {}
+        self.hits = 0
+        self.loads = 0
+        self.fallbacks = 0
+        self.evictions = 0
+
+    async def _current_version(self, company_id: str) -> Optional[str]:
+        redis = await get_redis()
+        if redis is None:
+            return None
+        try:
+            epoch, version = await redis.mget(EPOCH_KEY, VERSION_KEY.format(company_id=company_id))
+        except RedisError:
+            return None
+        return f"{epoch or 0}:{version or 0}"
+
+    def _get(self, company_id: str, version: str) -> Optional[_TenantMatrix]:
+        with self._lock:
+            entry = self._entries.get(company_id)
+            if entry is None:
+                return None
+            if entry.version != version or time.monotonic() - entry.loaded_at > self.max_age_seconds:
+                self._remove(company_id)
+                return None
+            self._entries.move_to_end(company_id)
+            return entry
+
+    def _remove(self, company_id: str):
+        entry = self._entries.pop(company_id, None)
+        if entry is not None:
+            self._bytes -= entry.nbytes
+
+    def _put(self, company_id: str, entry: _TenantMatrix):
+        with self._lock:
+            self._remove(company_id)
+            while self._entries and self._bytes + entry.nbytes > self.max_bytes:
+                evicted_id, evicted = self._entries.popitem(last=False)
+                self._bytes -= evicted.nbytes
+                self._load_locks.pop(evicted_id, None)
+                self.evictions += 1
+            self._entries[company_id] = entry
+            self._bytes += entry.nbytes
+
+    def _mark_oversized(self, company_id: str, version: str):
+        with self._lock:
+            self._oversized[company_id] = version
+            self._oversized.move_to_end(company_id)
+            while len(self._oversized) > MAX_OVERSIZED_TENANTS:
+                self._oversized.popitem(last=False)
+            # Searches go straight to pgvector until the version changes
+            self._load_locks.pop(company_id, None)
+
+    async def _load(self, db: AsyncSession, company_id, version: str) -> Optional[_TenantMatrix]:
+        filters = [
+            KnowledgeEntry.company_id == company_id,
+            KnowledgeEntry.is_active == True,
+            KnowledgeEntry.embedding.isnot(None)
+        ]
+        count = await db.scalar(select(func.count(KnowledgeEntry.id)).where(*filters))
+        if count > self.max_tenant_rows:
+            return None
+
+        result = await db.execute(
+            select(
+                KnowledgeEntry.id,
+                KnowledgeEntry.title,
+                KnowledgeEntry.content,
+                KnowledgeEntry.knowledge_type,
+                KnowledgeEntry.risk_level,
+                KnowledgeEntry.deadline,
+                KnowledgeEntry.embedding
+            ).where(*filters)
+        )
+        records = result.all()
+
+        # One contiguous, pre-normalised matrix so cosine similarity is a single matmul
+        matrix = np.empty((len(records), EMBEDDING_DIMENSION), dtype=np.float32)
+        for i, record in enumerate(records):
+            matrix[i] = _as_array(record.embedding)
+        matrix /= np.maximum(np.linalg.norm(matrix, axis=1, keepdims=True), 1e-12)
+        # Enum names, matching the labels the pgvector path returns
+        rows = [
+            (
+                record.id,
+                record.title,
+                record.content,
+                record.knowledge_type.name,
+                record.risk_level.name if record.risk_level is not None else None,
+                record.deadline
+            )
+            for record in records
+        ]
+
+        nbytes = matrix.nbytes + sum(len(row[1]) + len(row[2]) for row in rows)
+        if nbytes > self.max_bytes:
+            return None
+        self.loads += 1
+        return _TenantMatrix(version, matrix, rows, nbytes)
+
+    async def search(
+        self,
+        db: AsyncSession,
+        company_id,
+        query_embedding: List[float],
+        limit: int
+    ) -> Optional[List[KnowledgeHit]]:
+        # None means "not served from memory"; the caller falls back to pgvector
+        key = str(company_id)
+        version = await self._current_version(key)
+        if version is None or self._oversized.get(key) == version:
+            self.fallbacks += 1
+            return None
+        with self._lock:
+            self._oversized.pop(key, None)
+
+        entry = self._get(key, version)
+        if entry is None:
+            lock = self._load_locks.setdefault(key, asyncio.Lock())
+            async with lock:
+                entry = self._get(key, version)
+                if entry is None:
+                    entry = await self._load(db, company_id, version)
+                    if entry is None:
+                        self._mark_oversized(key, version)
+                        self.fallbacks += 1
+                        return None
+                    self._put(key, entry)
+        else:
+            self.hits += 1
+
+        return self._top_k(entry, query_embedding, limit)
+
+    @staticmethod
+    def _top_k(entry: _TenantMatrix, query_embedding: List[float], limit: int) -> List[KnowledgeHit]:
+        k = min(limit, len(entry.rows))
+        if k <= 0:
+            return []
+        query = np.array(query_embedding, dtype=np.float32)
+        query /= max(float(np.linalg.norm(query)), 1e-12)
+
+        scores = entry.matrix @ query
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        return [KnowledgeHit(*entry.rows[i], distance=float(1.0 - scores[i])) for i in top]
+
+    def stats(self) -> Dict[str, float]:
+        with self._lock:
+            return {
+                "enabled": settings.VECTOR_CACHE_ENABLED,
+                "tenants": len(self._entries),
+                "oversized_tenants": len(self._oversized),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "loads": self.loads,
+                "fallbacks": self.fallbacks,
+                "evictions": self.evictions,
+            }
+
+
+tenant_vector_cache = TenantVectorCache(
+    max_bytes=settings.VECTOR_CACHE_MAX_BYTES,
+    max_tenant_rows=settings.VECTOR_CACHE_MAX_TENANT_ROWS,
+    max_age_seconds=settings.VECTOR_CACHE_MAX_AGE_SECONDS
+)
@@ -0,0 +1,107 @@
+import uuid
+from typing import List, Optional
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core import database
+from app.core.config import settings
+from app.core.vectors import vector_index_sql
+
+# Tenants above VECTOR_TENANT_INDEX_MIN_ROWS get their own partial index on these
+TENANT_INDEXED_TABLES = ("document_chunks", "knowledge_entries")
+MAX_EF_SEARCH = 1000
+
+
+async def apply_search_settings(
+    db: AsyncSession,
+    ef_search: Optional[int] = None,
+    probes: Optional[int] = None,
+    min_candidates: int = 0
+):
+    # SET LOCAL only lasts for the current transaction, so pooled connections are left untouched
+    if settings.VECTOR_INDEX_TYPE == "ivfflat":
+        statements = [f"SET LOCAL ivfflat.probes = {int(probes or settings.IVFFLAT_PROBES)}"]
+        if settings.VECTOR_ITERATIVE_SCAN != "off":
+            # IVFFlat only supports the relaxed variant
+            statements.append("SET LOCAL ivfflat.iterative_scan = relaxed_order")
+    else:
+        # A graph search returns at most ef_search rows, so it must cover the LIMIT
+        ef = min(max(int(ef_search or settings.HNSW_EF_SEARCH), min_candidates), MAX_EF_SEARCH)
+        statements = [
+            f"SET LOCAL hnsw.ef_search = {ef}",
+            f"SET LOCAL hnsw.iterative_scan = {settings.VECTOR_ITERATIVE_SCAN}",
+            f"SET LOCAL hnsw.max_scan_tuples = {int(settings.HNSW_MAX_SCAN_TUPLES)}",
+        ]
+    if settings.VECTOR_TENANT_INDEX_MIN_ROWS:
+        # A generic plan cannot prove company_id matches a partial index predicate
+        statements.append("SET LOCAL plan_cache_mode = force_custom_plan")
+
+    for statement in statements:
+        await db.execute(text(statement))
+
+
+def tenant_index_name(table: str, company_id: uuid.UUID, column: str = "embedding") -> str:
+    return f"ix_{table}_{column}_{company_id.hex}"
+
+
+async def create_index_concurrently(name: str, statement: str):
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction block
+    async with database.engine.connect() as connection:
+        connection = await connection.execution_options(isolation_level="AUTOCOMMIT")
+        # An interrupted concurrent build leaves an invalid index that IF NOT EXISTS would keep
+        invalid = await connection.scalar(
+            text("SELECT NOT indisvalid FROM pg_index WHERE indexrelid = to_regclass(:name)"),
+            {"name": name}
+        )
+        if invalid:
+            await connection.execute(text(f"DROP INDEX CONCURRENTLY IF EXISTS {name}"))
+        await connection.execute(text(f"SET maintenance_work_mem = '{settings.VECTOR_INDEX_MAINTENANCE_WORK_MEM}'"))
+        await connection.execute(text(statement))
+
+
+async def large_tenants(db: AsyncSession, table: str) -> List[uuid.UUID]:
+    result = await db.execute(
+        text(f"""
+            SELECT company_id FROM {table}
+            WHERE embedding IS NOT NULL
+            GROUP BY company_id
+            HAVING count(*) >= :min_rows
+        """),
+        {"min_rows": settings.VECTOR_TENANT_INDEX_MIN_ROWS}
+    )
+    return [row.company_id for row in result]
+
+
+async def ensure_tenant_indexes() -> List[str]:
+    if not settings.VECTOR_TENANT_INDEX_MIN_ROWS:
+        return []
+
+    async with database.AsyncSessionLocal() as db:
+        tenants = {table: await large_tenants(db, table) for table in TENANT_INDEXED_TABLES}
+
+    built = []
+    for table, company_ids in tenants.items():
+        for company_id in company_ids:
+            name = tenant_index_name(table, company_id)
+            await create_index_concurrently(
+                name,
+                vector_index_sql(table, name, where=f"company_id = '{company_id}'")
+            )
+            built.append(name)
+    return built
+
+
+async def drop_column_indexes(db: AsyncSession, table: str, column: str):
+    # Matches plain, partial and expression indexes (binary_quantize) on the column
+    result = await db.execute(
+        text(r"""
+            SELECT i.relname AS name
+            FROM pg_index x
+            JOIN pg_class i ON i.oid = x.indexrelid
+            WHERE x.indrelid = CAST(:table AS regclass)
+              AND NOT x.indisprimary
+              AND pg_get_indexdef(x.indexrelid) ~ ('\m' || :column || '\M')
+        """),
+        {"table": table, "column": column}
+    )
+    for row in result.fetchall():
+        await db.execute(text(f'DROP INDEX IF EXISTS "{row.name}"'))
@@ -0,0 +1,53 @@
+from typing import Iterable
+from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.config import settings
+from app.core.vectors import EMBEDDING_DIMENSION, EMBEDDING_STORAGE
+from app.models.embedding_column import EmbeddingColumn
+
+VECTOR_TABLES = ("document_chunks", "knowledge_entries", "documents")
+
+
+async def record_embedding_columns(
+    db: AsyncSession,
+    model_name: str,
+    dimension: int,
+    tables: Iterable[str] = VECTOR_TABLES,
+    column_name: str = "embedding"
+):
+    for table in tables:
+        statement = insert(EmbeddingColumn).values(
+            table_name=table,
+            column_name=column_name,
+            model_name=model_name,
+            dimension=dimension,
+            storage=EMBEDDING_STORAGE.value
+        )
+        await db.execute(statement.on_conflict_do_update(
+            constraint="uq_embedding_columns_table_column",
+            set_={
+                "model_name": statement.excluded.model_name,
+                "dimension": statement.excluded.dimension,
+                "storage": statement.excluded.storage,
+                "updated_at": statement.excluded.updated_at
+            }
+        ))
+
+
+async def verify_embedding_columns(db: AsyncSession):
+    # Query vectors from one model compared against stored vectors from another return noise, not errors
+    result = await db.execute(
+        select(EmbeddingColumn).where(EmbeddingColumn.column_name == "embedding")
+    )
+    expected = (settings.HUGGINGFACE_MODEL, EMBEDDING_DIMENSION, EMBEDDING_STORAGE.value)
+    mismatched = [
+        f"{column.table_name}: {column.model_name} ({column.storage}({column.dimension}))"
+        for column in result.scalars()
+        if (column.model_name, column.dimension, column.storage) != expected
+    ]
+    if mismatched:
+        raise RuntimeError(
+            f"Embedding columns do not match {expected[0]} ({expected[2]}({expected[1]})): "
+            + "; ".join(mismatched)
+        )
@@ -0,0 +1,57 @@
+from sqlalchemy import select, update, and_
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Dict, List, Optional, Set, Tuple
+import uuid
+from app.models.document import Document
+from app.models.document_chunk import DocumentChunk
+from app.models.knowledge_entry import KnowledgeEntry
+
+
+async def find_newer_version(db: AsyncSession, document_id: uuid.UUID) -> Optional[Document]:
+    result = await db.execute(
+        select(Document).where(Document.parent_id == document_id).order_by(Document.version.desc()).limit(1)
+    )
+    return result.scalar_one_or_none()
+
+
+async def load_chunk_embeddings(db: AsyncSession, document_id: uuid.UUID) -> Dict[str, List[float]]:
+    result = await db.execute(
+        select(DocumentChunk.content_hash, DocumentChunk.embedding).where(
+            DocumentChunk.document_id == document_id,
+            DocumentChunk.content_hash.isnot(None),
+            DocumentChunk.embedding.isnot(None)
+        )
+    )
+    return {chunk_hash: embedding for chunk_hash, embedding in result.all()}
+
+
+def knowledge_windows(document: Document) -> Set[str]:
+    return set((document.metadata_ or {}).get("knowledge_windows") or [])
+
+
+async def carry_over_entries(
+    db: AsyncSession,
+    parent_id: uuid.UUID,
+    document_id: uuid.UUID,
+    kept_windows: Set[str]
+) -> Tuple[int, int]:
+    # Entries from unchanged windows move to the new version; the rest stay on the parent, inactive
+    active_on_parent = and_(KnowledgeEntry.document_id == parent_id, KnowledgeEntry.is_active == True)
+
+    carried = 0
+    if kept_windows:
+        result = await db.execute(
+            update(KnowledgeEntry)
+            .where(active_on_parent, KnowledgeEntry.source_chunk_hash.in_(kept_windows))
+            .values(document_id=document_id)
+            .execution_options(synchronize_session=False)
+        )
+        carried = result.rowcount
+
+    retired = await db.execute(
+        update(KnowledgeEntry)
+        .where(active_on_parent)
+        .values(is_active=False)
+        .execution_options(synchronize_session=False)
+    )
+    return carried, retired.rowcount
@@ -1,81 +1,379 @@
 from app.core.celery_app import celery_app
-from app.services.document_processor import extract_text
-from app.services.ai_service import summarize_document, extract_knowledge, classify_document, generate_embedding
-from app.services.s3_service import upload_file
+from app.core.worker_runtime import run_async
+from app.core.config import settings
+from app.services.ai_service import summarize_document, split_for_extraction, extract_knowledge_parts, generate_embeddings
+from app.services.chunking import chunk_text, content_hash
+from app.services.classification import classify_tiered
+from app.services.document_processor import PARSE_ERRORS
+from app.services.ingestion import extract_chunk_and_embed, embed_chunks
+from app.services.s3_service import download_fileobj
+from app.services.deduplication import find_document_by_hash, clone_processed_document
+from app.services.pipeline import Stage, run_stages
+from app.services.bulk_writer import bulk_insert
+from app.services.knowledge import build_sourced_entries
+from app.services.versioning import load_chunk_embeddings, knowledge_windows, carry_over_entries
+from app.services.tenant_vector_cache import bump_tenant_version
 from datetime import datetime
+from typing import Optional
+import time
 
 
-@celery_app.task(name="app.tasks.document_tasks.process_document_task")
-def process_document_task(document_id: str, file_content: bytes, mime_type: str):
+class DocumentProcessingError(Exception):
+    # Failures a retry cannot fix (missing file, unparseable file, no extractable text)
+    pass
+
+
+class ParentVersionPending(Exception):
+    # Polled on its own budget, so waiting never uses up the retries meant for real failures
+    pass
+
+
+async def _mark_failed(document_id: str, error: BaseException):
+    from app.core.database import AsyncSessionLocal
+    from app.models.document import Document, DocumentStatus
+    
+    async with AsyncSessionLocal() as db:
+        document = await db.get(Document, document_id)
+        if document is None:
+            return None
+        if document.status not in (DocumentStatus.PROCESSED, DocumentStatus.FAILED):
+            document.status = DocumentStatus.FAILED
+            document.metadata_ = {**(document.metadata_ or {}), "last_error": f"{type(error).__name__}: {error}"}
+            await db.commit()
+        return document.batch_id
+
+
+class DocumentTask(celery_app.Task):
+    def on_failure(self, exc, task_id, args, kwargs, einfo):
+        # Terminal failures process() could not record itself: errors outside its try
+        # block, or retries running out. The batch still has to learn the document is done
+        batch_id = run_async(_mark_failed(args[0] if args else kwargs["document_id"], exc))
+        if batch_id is not None:
+            finalize_batch_task.delay(str(batch_id))
+
+
+@celery_app.task(
+    bind=True,
+    base=DocumentTask,
+    name="app.tasks.document_tasks.process_document_task",
+    max_retries=settings.DOCUMENT_TASK_MAX_RETRIES
+)
+def process_document_task(
+    self,
+    document_id: str,
+    file_key: Optional[str] = None,
+    parent_waits: int = 0,
+    waiting_since: Optional[float] = None
+):
     import asyncio
     from app.core.database import AsyncSessionLocal
-    from app.models.document import Document, DocumentStatus, DocumentType
-    from app.models.knowledge_entry import KnowledgeEntry, KnowledgeType, RiskLevel
+    import numpy as np
+    from app.models.document import Document, DocumentStatus, DocumentType, ProcessingStage
+    from app.models.document_chunk import DocumentChunk
+    from app.models.knowledge_entry import KnowledgeEntry
     from sqlalchemy import select
     
+    checkpoints = {
+        "extract": ProcessingStage.EXTRACTED,
+        "embed": ProcessingStage.EMBEDDED,
+        "classify": ProcessingStage.CLASSIFIED,
+        "summarize": ProcessingStage.SUMMARIZED,
+        "knowledge": ProcessingStage.KNOWLEDGE_EXTRACTED,
+    }
+    # Celery counts parent waits as retries too; only real failures spend the retry budget
+    failures = self.request.retries - parent_waits
+    final_attempt = failures >= self.max_retries
+    
     async def process():
         async with AsyncSessionLocal() as db:
             result = await db.execute(select(Document).where(Document.id == document_id))
             document = result.scalar_one_or_none()
             
-            if not document:
+            if not document or document.status == DocumentStatus.PROCESSED:
                 return
             
             document.status = DocumentStatus.PROCESSING
             await db.commit()
             
+            # Outputs of stages that already succeeded on an earlier attempt
+            outputs = dict(document.stage_outputs or {})
+            
             try:
-                await upload_file(file_content, document.file_path, mime_type)
+                # Re-uploads of an already processed file reuse its results. New versions
+                # skip this: identical bytes still go through carry-over against the parent
+                if document.content_hash and not outputs and document.parent_id is None:
+                    source = await find_document_by_hash(
+                        db,
+                        document.company_id,
+                        document.content_hash,
+                        exclude_id=document.id,
+                        status=DocumentStatus.PROCESSED
+                    )
+                    if source is not None:
+                        await clone_processed_document(db, source, document)
+                        document.processing_stage = ProcessingStage.COMPLETED
+                        await db.commit()
+                        await bump_tenant_version(document.company_id)
+                        return document.batch_id
                 
-                extracted_text = await extract_text(file_content, mime_type)
-                if not extracted_text:
-                    document.status = DocumentStatus.FAILED
-                    await db.commit()
-                    return
+                # New versions only redo the work for content that changed since the parent
+                parent = await db.get(Document, document.parent_id) if document.parent_id else None
+                if parent is not None and parent.status in (DocumentStatus.UPLOADED, DocumentStatus.PROCESSING):
+                    # Wait for the parent's entries to exist before carrying over or retiring them
+                    waited = time.time() - (waiting_since or time.time())
+                    if waited > settings.DOCUMENT_PARENT_WAIT_TIMEOUT_SECONDS:
+                        raise DocumentProcessingError(
+                            f"Parent version {parent.id} did not finish within "
+                            f"{settings.DOCUMENT_PARENT_WAIT_TIMEOUT_SECONDS} seconds"
+                        )
+                    raise ParentVersionPending(f"Parent version {parent.id} is still processing")
+                if parent is not None and parent.status != DocumentStatus.PROCESSED:
+                    # A failed parent is not reused, but whatever entries it has are still retired below
+                    parent = None
+                known_embeddings = await load_chunk_embeddings(db, parent.id) if parent else {}
+                previous_windows = knowledge_windows(parent) if parent else set()
                 
-                document.extracted_text = extracted_text
+                async def extract_stage(results):
+                    if "extract" in outputs:
+                        stored = outputs["extract"]
+                        return document.extracted_text, stored["spans"], None, None, stored.get("failures", [])
+                    file_obj = await download_fileobj(file_key or document.file_path)
+                    if file_obj is None:
+                        raise DocumentProcessingError(f"Stored file not found for document {document_id}")
+                    try:
+                        extracted_text, spans, chunks, chunk_embeddings, failures = await extract_chunk_and_embed(
+                            file_obj, document.mime_type, known_embeddings=known_embeddings
+                        )
+                    except PARSE_ERRORS as e:
+                        raise DocumentProcessingError(
+                            f"Document {document_id} could not be parsed: {type(e).__name__}: {e}"
+                        ) from e
+                    finally:
+                        file_obj.close()
+                    if not extracted_text:
+                        raise DocumentProcessingError(f"No text could be extracted from document {document_id}")
+                    return extracted_text, spans, chunks, chunk_embeddings, failures
                 
-                doc_type = await classify_document(document.original_filename, extracted_text[:500])
-                if doc_type in [dt.value for dt in DocumentType]:
-                    document.document_type = DocumentType(doc_type)
+                async def embed_stage(results):
+                    if "embed" in outputs:
+                        return None
+                    extracted_text, spans, chunks, chunk_embeddings, _ = results["extract"]
+                    if chunks is None:
+                        # Resumed after the extract checkpoint: rebuild chunks from the stored text
+                        chunks = chunk_text(extracted_text, spans=spans)
+                        chunk_embeddings = await embed_chunks(chunks, known_embeddings)
+                    return chunks, chunk_embeddings
                 
-                summary = await summarize_document(extracted_text)
-                document.summary = summary
+                async def classify_stage(results):
+                    if "classify" in outputs:
+                        return {**outputs["classify"], "document_type": DocumentType(outputs["classify"]["document_type"])}
+                    if parent is not None:
+                        return {"document_type": parent.document_type, "path": "parent_version"}
+                    extracted_text = results["extract"][0]
+                    decision = await classify_tiered(document.original_filename, extracted_text)
+                    if decision["document_type"]:
+                        decision["document_type"] = DocumentType(decision["document_type"])
+                    else:
+                        decision["document_type"] = document.document_type
+                    return decision
                 
-                embedding = await generate_embedding(extracted_text[:8000])
-                document.embedding = embedding
+                chunk_timings = []
                 
-                knowledge_data = await extract_knowledge(extracted_text, document.document_type.value)
+                async def summarize_stage(results):
+                    if "summarize" in outputs:
+                        return document.summary
+                    return await summarize_document(results["extract"][0], timings=chunk_timings)
                 
-                for obligation in knowledge_data.get("obligations", []):
-                    entry = KnowledgeEntry(
-                        company_id=document.company_id,
-                        document_id=document.id,
-                        knowledge_type=KnowledgeType.OBLIGATION,
-                        title=obligation.get("title", "Obligation"),
-                        content=obligation.get("content", ""),
-                        embedding=await generate_embedding(obligation.get("content", ""))
+                async def knowledge_stage(results):
+                    if "knowledge" in outputs:
+                        return None
+                    windows = split_for_extraction(results["extract"][0])
+                    window_hashes = [content_hash(window) for window in windows]
+                    changed = [
+                        window for window, window_hash in zip(windows, window_hashes)
+                        if window_hash not in previous_windows
+                    ]
+                    parts = await extract_knowledge_parts(
+                        changed,
+                        results["classify"]["document_type"].value,
+                        timings=chunk_timings
                     )
-                    db.add(entry)
+                    entries = build_sourced_entries(changed, parts)
+                    embeddings = await generate_embeddings([entry["content"] for entry in entries])
+                    return entries, embeddings, window_hashes, len(changed)
                 
-                for risk in knowledge_data.get("risks", []):
-                    entry = KnowledgeEntry(
-                        company_id=document.company_id,
-                        document_id=document.id,
-                        knowledge_type=KnowledgeType.RISK,
-                        title=risk.get("title", "Risk"),
-                        content=risk.get("content", ""),
-                        risk_level=RiskLevel(risk.get("level", "medium")),
-                        embedding=await generate_embedding(risk.get("content", ""))
-                    )
-                    db.add(entry)
+                checkpoint_lock = asyncio.Lock()
+                
+                async def checkpoint(name, stage_result):
+                    # Persist each stage as it finishes so a retry resumes after it
+                    if name in outputs:
+                        return
+                    async with checkpoint_lock:
+                        if name == "extract":
+                            document.extracted_text = stage_result[0]
+                            output = {"spans": stage_result[1], "failures": stage_result[4]}
+                        elif name == "embed":
+                            chunks, chunk_embeddings = stage_result
+                            await bulk_insert(
+                                db,
+                                DocumentChunk,
+                                [
+                                    {
+                                        "company_id": document.company_id,
+                                        "document_id": document.id,
+                                        "chunk_index": chunk["index"],
+                                        "content": chunk["content"],
+                                        "start_offset": chunk["start_offset"],
+                                        "end_offset": chunk["end_offset"],
+                                        "token_count": chunk["token_count"],
+                                        "content_hash": chunk["content_hash"],
+                                        "locator": chunk["locator"]
+                                    }
+                                    for chunk in chunks
+                                ],
+                                embeddings=chunk_embeddings
+                            )
+                            # Document-level vector is the normalised centroid of its chunks
+                            if chunk_embeddings:
+                                centroid = np.mean(np.asarray(chunk_embeddings, dtype=np.float32), axis=0)
+                                document.embedding = (centroid / (np.linalg.norm(centroid) or 1.0)).tolist()
+                            output = {
+                                "chunks": len(chunks),
+                                "chunks_reused": sum(1 for chunk in chunks if chunk["content_hash"] in known_embeddings)
+                            }
+                        elif name == "classify":
+                            document.document_type = stage_result["document_type"]
+                            output = {**stage_result, "document_type": stage_result["document_type"].value}
+                        elif name == "summarize":
+                            document.summary = stage_result
+                            output = {}
+                        else:
+                            entries, entry_embeddings, window_hashes, windows_extracted = stage_result
+                            await bulk_insert(
+                                db,
+                                KnowledgeEntry,
+                                [
+                                    {"company_id": document.company_id, "document_id": document.id, **entry}
+                                    for entry in entries
+                                ],
+                                embeddings=entry_embeddings
+                            )
+                            output = {
+                                "knowledge_windows": window_hashes,
+                                "windows_extracted": windows_extracted,
+                                "entries": len(entries)
+                            }
+                            if document.parent_id is not None:
+                                output["entries_carried"], output["entries_retired"] = await carry_over_entries(
+                                    db, document.parent_id, document.id, set(window_hashes) & previous_windows
+                                )
+                        
+                        outputs[name] = output
+                        document.stage_outputs = dict(outputs)
+                        document.processing_stage = checkpoints[name]
+                        await db.commit()
+                        if name == "knowledge":
+                            await bump_tenant_version(document.company_id)
                 
+                # classify and summarize run concurrently; knowledge waits on classify
+                _, timings = await run_stages([
+                    Stage("extract", extract_stage),
+                    Stage("embed", embed_stage, depends_on=["extract"]),
+                    Stage("classify", classify_stage, depends_on=["extract"]),
+                    Stage("summarize", summarize_stage, depends_on=["extract"]),
+                    Stage("knowledge", knowledge_stage, depends_on=["extract", "classify"]),
+                ], on_complete=checkpoint)
+                
+                metadata = {
+                    "stage_timings": timings,
+                    "chunk_timings": chunk_timings,
+                    "knowledge_windows": outputs["knowledge"]["knowledge_windows"],
+                    "classification": outputs["classify"]
+                }
+                if outputs["extract"].get("failures"):
+                    # Pages that timed out or failed to parse, so partial text is visible
+                    metadata["extraction_failures"] = outputs["extract"]["failures"]
+                if parent is not None:
+                    metadata["incremental"] = {
+                        "parent_id": str(parent.id),
+                        "windows_total": len(outputs["knowledge"]["knowledge_windows"]),
+                        "windows_extracted": outputs["knowledge"]["windows_extracted"],
+                        "chunks_reused": outputs["embed"]["chunks_reused"],
+                        "chunks_total": outputs["embed"]["chunks"],
+                        "entries_carried": outputs["knowledge"].get("entries_carried", 0),
+                        "entries_retired": outputs["knowledge"].get("entries_retired", 0)
+                    }
+                document.metadata_ = {**(document.metadata_ or {}), **metadata}
+                document.processing_stage = ProcessingStage.COMPLETED
                 document.status = DocumentStatus.PROCESSED
                 document.processed_at = datetime.utcnow()
                 await db.commit()
+                return document.batch_id
                 
+            except ParentVersionPending:
+                await db.rollback()
+                await db.refresh(document)
+                document.status = DocumentStatus.UPLOADED
+                await db.commit()
+                raise
             except Exception as e:
-                document.status = DocumentStatus.FAILED
+                # Checkpointed stages are already committed; only the failed stage is lost
+                await db.rollback()
+                await db.refresh(document)
+                retry = not final_attempt and not isinstance(e, DocumentProcessingError)
+                document.status = DocumentStatus.PROCESSING if retry else DocumentStatus.FAILED
+                document.metadata_ = {**(document.metadata_ or {}), "last_error": f"{type(e).__name__}: {e}"}
                 await db.commit()
+                if retry:
+                    raise
+                return document.batch_id
+    
+    try:
+        batch_id = run_async(process())
+    except ParentVersionPending as exc:
+        raise self.retry(
+            exc=exc,
+            kwargs={**self.request.kwargs, "parent_waits": parent_waits + 1, "waiting_since": waiting_since or time.time()},
+            countdown=min(
+                settings.DOCUMENT_PARENT_WAIT_SECONDS * 2 ** parent_waits,
+                settings.DOCUMENT_PARENT_WAIT_MAX_INTERVAL_SECONDS
+            ),
+            max_retries=self.request.retries + 1
+        )
+    except Exception as exc:
+        raise self.retry(
+            exc=exc,
+            countdown=settings.DOCUMENT_TASK_RETRY_BACKOFF_SECONDS * 2 ** failures,
+            max_retries=self.max_retries + parent_waits
+        )
+    
+    if batch_id is not None:
+        finalize_batch_task.delay(str(batch_id))
+
+
+@celery_app.task(name="app.tasks.document_tasks.finalize_batch_task")
+def finalize_batch_task(batch_id: str):
+    # Sent whenever a batch document reaches a final state; completes the batch once none are left
+    from app.core.database import AsyncSessionLocal
+    from app.models.document import Document, DocumentStatus
+    from app.models.document_batch import DocumentBatch, BatchStatus
+    from sqlalchemy import select, func
+    
+    async def finalize():
+        async with AsyncSessionLocal() as db:
+            batch = await db.get(DocumentBatch, batch_id)
+            if not batch or batch.status == BatchStatus.COMPLETED:
+                return
+            remaining = await db.scalar(
+                select(func.count()).select_from(Document).where(
+                    Document.batch_id == batch.id,
+                    Document.status.notin_([DocumentStatus.PROCESSED, DocumentStatus.FAILED])
+                )
+            )
+            if remaining:
+                return
+            batch.status = BatchStatus.COMPLETED
+            batch.completed_at = datetime.utcnow()
+            await db.commit()
     
-    asyncio.run(process())
+    run_async(finalize())
@@ -1,10 +1,10 @@
 from app.core.celery_app import celery_app
+from app.core.worker_runtime import run_async
 from datetime import datetime, timedelta
 
 
 @celery_app.task(name="app.tasks.notification_tasks.check_compliance_deadlines")
 def check_compliance_deadlines():
-    import asyncio
     from app.core.database import AsyncSessionLocal
     from app.models.knowledge_entry import KnowledgeEntry, KnowledgeType
     from app.models.notification import Notification, NotificationType
@@ -45,12 +45,11 @@ def check_compliance_deadlines():
             
             await db.commit()
     
-    asyncio.run(check())
+    run_async(check())
 
 
 @celery_app.task(name="app.tasks.notification_tasks.check_expiring_contracts")
 def check_expiring_contracts():
-    import asyncio
     from app.core.database import AsyncSessionLocal
     from app.models.document import Document, DocumentType
     from app.models.notification import Notification, NotificationType
@@ -65,8 +64,8 @@ def check_expiring_contracts():
             contracts = result.scalars().all()
             
             for contract in contracts:
-                if contract.metadata.get("expiry_date"):
-                    expiry = datetime.fromisoformat(contract.metadata["expiry_date"])
+                if contract.metadata_.get("expiry_date"):
+                    expiry = datetime.fromisoformat(contract.metadata_["expiry_date"])
                     if expiry <= datetime.utcnow() + timedelta(days=30):
                         users_result = await db.execute(
                             select(User).where(User.company_id == contract.company_id)
@@ -84,4 +83,4 @@ def check_expiring_contracts():
             
             await db.commit()
     
-    asyncio.run(check())
+    run_async(check())
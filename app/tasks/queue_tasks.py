@@ -0,0 +1,9 @@
+from app.core.celery_app import celery_app
+from app.core.worker_runtime import run_async
+
+
+@celery_app.task(name="app.tasks.queue_tasks.pump_bulk_queue")
+def pump_bulk_queue():
+    from app.services.task_queues import pump_bulk_queue as pump
+    
+    return run_async(pump())
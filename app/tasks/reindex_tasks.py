@@ -0,0 +1,34 @@
+from app.core.celery_app import celery_app
+from app.core.worker_runtime import run_async
+from app.core.config import settings
+
+
+@celery_app.task(
+    name="app.tasks.reindex_tasks.reindex_embeddings_task",
+    time_limit=settings.VECTOR_INDEX_BUILD_TIME_LIMIT_SECONDS,
+    soft_time_limit=settings.VECTOR_INDEX_BUILD_TIME_LIMIT_SECONDS - 60
+)
+def reindex_embeddings_task(job_id: str):
+    from app.core.database import AsyncSessionLocal
+    from app.models.reindex_job import ReindexStatus
+    from app.services.reindex import run_reindex
+    
+    async def reindex():
+        async with AsyncSessionLocal() as db:
+            job = await run_reindex(db, job_id, max_seconds=settings.REINDEX_TASK_SLICE_SECONDS)
+            return job.status
+    
+    # Work in time slices under the task time limit; the checkpoint carries over to the next slice
+    if run_async(reindex()) == ReindexStatus.RUNNING:
+        reindex_embeddings_task.delay(job_id)
+
+
+@celery_app.task(
+    name="app.tasks.reindex_tasks.ensure_tenant_vector_indexes",
+    time_limit=settings.VECTOR_INDEX_BUILD_TIME_LIMIT_SECONDS,
+    soft_time_limit=settings.VECTOR_INDEX_BUILD_TIME_LIMIT_SECONDS - 60
+)
+def ensure_tenant_vector_indexes():
+    from app.services.vector_index import ensure_tenant_indexes
+    
+    return run_async(ensure_tenant_indexes())
@@ -0,0 +1,26 @@
+import hashlib
+from typing import BinaryIO
+
+
+class UploadTooLargeError(Exception):
+    pass
+
+
+class CountingReader:
+    def __init__(self, file_obj: BinaryIO, max_bytes: int):
+        self._file_obj = file_obj
+        self._hash = hashlib.sha256()
+        self.max_bytes = max_bytes
+        self.bytes_read = 0
+    
+    def read(self, size: int = -1) -> bytes:
+        chunk = self._file_obj.read(size)
+        self.bytes_read += len(chunk)
+        if self.bytes_read > self.max_bytes:
+            raise UploadTooLargeError(f"Upload exceeds {self.max_bytes} bytes")
+        self._hash.update(chunk)
+        return chunk
+    
+    @property
+    def sha256(self) -> str:
+        return self._hash.hexdigest()
@@ -0,0 +1,91 @@
+"""Latency and recall of hybrid (lexical + vector, RRF) against vector-only retrieval.
+
+Runs each labelled query through both paths against a live database and reports
+recall@k, MRR and latency percentiles. The queries file is JSONL with one
+object per line: {"query": "...", "relevant": ["<entry or chunk id>", ...]}.
+Needs the app's environment variables (DATABASE_URL, ...).
+
+    python benchmarks/hybrid_retrieval.py --company-id <uuid> --queries queries.jsonl
+    python benchmarks/hybrid_retrieval.py --company-id <uuid> --queries queries.jsonl --target chunks --k 10
+"""
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core.database import AsyncSessionLocal
+from app.services.ai_service import generate_embedding
+from app.services.retrieval import (
+    search_knowledge_entries,
+    search_chunks,
+    hybrid_search_knowledge_entries,
+    hybrid_search_chunks
+)
+
+TARGETS = {
+    "knowledge": (search_knowledge_entries, hybrid_search_knowledge_entries),
+    "chunks": (search_chunks, hybrid_search_chunks),
+}
+
+
+def load_queries(path: str):
+    with open(path) as handle:
+        return [json.loads(line) for line in handle if line.strip()]
+
+
+def percentile(values, fraction: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(int(len(ordered) * fraction), len(ordered) - 1)]
+
+
+async def run(company_id: str, queries, target: str, k: int):
+    vector_search, hybrid_search = TARGETS[target]
+    results = {"vector": {"latency": [], "recall": [], "rr": []}, "hybrid": {"latency": [], "recall": [], "rr": []}}
+
+    for item in queries:
+        embedding = await generate_embedding(item["query"])
+        relevant = set(item["relevant"])
+
+        started = time.perf_counter()
+        async with AsyncSessionLocal() as db:
+            vector_rows = await vector_search(db, company_id, embedding, k)
+        vector_latency = time.perf_counter() - started
+
+        started = time.perf_counter()
+        hybrid_rows = await hybrid_search(company_id, item["query"], embedding, k)
+        hybrid_latency = time.perf_counter() - started
+
+        for name, rows, latency in (("vector", vector_rows, vector_latency), ("hybrid", hybrid_rows, hybrid_latency)):
+            ids = [str(row.id) for row in rows]
+            hits = [position for position, row_id in enumerate(ids) if row_id in relevant]
+            results[name]["latency"].append(latency * 1000)
+            results[name]["recall"].append(len(hits) / len(relevant) if relevant else 0.0)
+            results[name]["rr"].append(1.0 / (hits[0] + 1) if hits else 0.0)
+
+    print(f"{len(queries)} queries against {target}, k={k}\n")
+    print(f"{'path':<8} {'recall@k':>9} {'MRR':>6} {'p50 ms':>8} {'p95 ms':>8}")
+    for name, measured in results.items():
+        print(
+            f"{name:<8} {statistics.mean(measured['recall']):>9.3f} {statistics.mean(measured['rr']):>6.3f} "
+            f"{percentile(measured['latency'], 0.5):>8.1f} {percentile(measured['latency'], 0.95):>8.1f}"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--company-id", required=True)
+    parser.add_argument("--queries", required=True, help="JSONL file of queries with relevant ids")
+    parser.add_argument("--target", choices=sorted(TARGETS), default="knowledge")
+    parser.add_argument("--k", type=int, default=5)
+    args = parser.parse_args()
+
+    asyncio.run(run(args.company_id, load_queries(args.queries), args.target, args.k))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+"""Cold-start import benchmark for the API.
+
+Imports a module in fresh interpreters and reports wall time plus the slowest
+imports from ``python -X importtime``. Needs the same environment variables as
+the app (DATABASE_URL, REDIS_URL, ...) since settings are read at import.
+
+    python benchmarks/import_time.py --module app.main --runs 5
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def time_import(module: str) -> float:
+    started = time.perf_counter()
+    subprocess.run([sys.executable, "-c", f"import {module}"], cwd=ROOT, check=True)
+    return time.perf_counter() - started
+
+
+def slowest_imports(module: str, top: int):
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=ROOT, check=True, capture_output=True, text=True
+    )
+    rows = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative_us, name = line[len("import time:"):].split("|")
+        rows.append((int(cumulative_us), name.strip()))
+    # Only top-level packages, otherwise every submodule repeats its parent's cost
+    top_level = {}
+    for cumulative_us, name in rows:
+        package = name.split(".")[0]
+        top_level[package] = max(top_level.get(package, 0), cumulative_us)
+    return sorted(top_level.items(), key=lambda item: item[1], reverse=True)[:top]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--module", default="app.main")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=15)
+    args = parser.parse_args()
+
+    timings = [time_import(args.module) for _ in range(args.runs)]
+    print(f"import {args.module}: median {statistics.median(timings):.3f}s "
+          f"min {min(timings):.3f}s max {max(timings):.3f}s over {args.runs} runs")
+
+    print("\nslowest top-level imports (cumulative):")
+    for package, cumulative_us in slowest_imports(args.module, args.top):
+        print(f"  {cumulative_us / 1000:9.1f} ms  {package}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""Recall and size of reduced-precision vector storage.
+
+Compares exact float32 cosine top-k against halfvec (float16) storage and
+binary-quantized candidates rescored at full precision, the two modes behind
+EMBEDDING_STORAGE and EMBEDDING_BINARY_RESCORE. Pass real embeddings exported
+with numpy.save to measure on the actual corpus; otherwise clustered synthetic
+vectors are used.
+
+    python benchmarks/vector_quantization.py --dimension 384 --rows 50000
+    python benchmarks/vector_quantization.py --vectors chunks.npy --k 10 --oversample 8
+"""
+import argparse
+import numpy as np
+
+
+def normalise(matrix: np.ndarray) -> np.ndarray:
+    return matrix / np.maximum(np.linalg.norm(matrix, axis=1, keepdims=True), 1e-12)
+
+
+def synthetic_vectors(rows: int, dimension: int, seed: int) -> np.ndarray:
+    # Clustered like real document embeddings, not uniform on the sphere
+    rng = np.random.default_rng(seed)
+    centres = rng.standard_normal((max(rows // 200, 1), dimension))
+    labels = rng.integers(0, len(centres), rows)
+    return normalise(centres[labels] + 0.6 * rng.standard_normal((rows, dimension))).astype(np.float32)
+
+
+def top_k(scores: np.ndarray, k: int) -> np.ndarray:
+    candidates = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+    order = np.take_along_axis(scores, candidates, axis=1).argsort(axis=1)[:, ::-1]
+    return np.take_along_axis(candidates, order, axis=1)
+
+
+def recall(found: np.ndarray, exact: np.ndarray) -> float:
+    return float(np.mean([len(set(a) & set(b)) / len(b) for a, b in zip(found, exact)]))
+
+
+def binary_rescored(corpus: np.ndarray, queries: np.ndarray, k: int, oversample: int) -> np.ndarray:
+    corpus_bits = np.packbits(corpus > 0, axis=1)
+    query_bits = np.packbits(queries > 0, axis=1)
+    results = []
+    for query, bits in zip(queries, query_bits):
+        hamming = np.unpackbits(np.bitwise_xor(corpus_bits, bits), axis=1).sum(axis=1)
+        candidates = np.argpartition(hamming, k * oversample)[:k * oversample]
+        exact = corpus[candidates] @ query
+        results.append(candidates[np.argsort(-exact)[:k]])
+    return np.asarray(results)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--vectors", help=".npy file of embeddings, one row per vector")
+    parser.add_argument("--rows", type=int, default=50000)
+    parser.add_argument("--dimension", type=int, default=384)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--oversample", type=int, default=8)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    if args.vectors:
+        corpus = normalise(np.load(args.vectors).astype(np.float32))
+    else:
+        corpus = synthetic_vectors(args.rows, args.dimension, args.seed)
+    rng = np.random.default_rng(args.seed + 1)
+    queries = corpus[rng.choice(len(corpus), args.queries, replace=False)]
+    queries = normalise(queries + 0.3 * rng.standard_normal(queries.shape).astype(np.float32))
+    rows, dimension = corpus.shape
+
+    exact = top_k(queries @ corpus.T, args.k)
+    # pgvector stores 4 bytes per float32, 2 per half and 8 bytes of header per value
+    modes = [("vector", 4 * dimension + 8, None)]
+
+    half = top_k(queries.astype(np.float16).astype(np.float32) @ corpus.astype(np.float16).astype(np.float32).T, args.k)
+    modes.append(("halfvec", 2 * dimension + 8, recall(half, exact)))
+
+    rescored = binary_rescored(corpus, queries, args.k, args.oversample)
+    modes.append((f"binary index + rescore x{args.oversample}", (dimension + 7) // 8 + 8, recall(rescored, exact)))
+
+    print(f"{rows} vectors x {dimension} dims, {args.queries} queries, recall@{args.k} against exact float32\n")
+    print(f"{'mode':<28} {'bytes/vector':>12} {'size':>6} {'recall':>7}")
+    for name, size, measured in modes:
+        print(f"{name:<28} {size:>12} {size / modes[0][1]:>6.2f} {measured if measured is not None else 1.0:>7.3f}")
+    print("\nbinary row is index size; rows are still rescored from the stored vector column")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+"""Re-embed chunks, knowledge entries and documents with a new embedding model.
+
+Vectors are written to a shadow column while search keeps using the current
+ones. Progress is checkpointed per batch, so an interrupted run resumes where it
+stopped. Cutover swaps the columns; deploy the new HUGGINGFACE_MODEL together
+with it.
+
+    python scripts/reindex_embeddings.py start --model sentence-transformers/all-mpnet-base-v2
+    python scripts/reindex_embeddings.py start --model ... --celery
+    python scripts/reindex_embeddings.py resume <job_id>
+    python scripts/reindex_embeddings.py status <job_id>
+    python scripts/reindex_embeddings.py cutover <job_id>
+"""
+import argparse
+import asyncio
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core.database import AsyncSessionLocal
+from app.models.reindex_job import ReindexJob
+from app.services.reindex import run_reindex, cutover
+
+
+def print_progress(job: ReindexJob):
+    eta = f"{job.eta_seconds / 60:.1f} min" if job.eta_seconds is not None else "?"
+    step = (job.checkpoint or {}).get("table", "")
+    print(
+        f"\r{job.status.value:<9} {job.rows_done}/{job.rows_total} rows "
+        f"{job.rows_per_second or 0:.0f} rows/s  ETA {eta}  {step:<20}",
+        end="", flush=True
+    )
+
+
+async def start(model: str, auto_cutover: bool, use_celery: bool):
+    async with AsyncSessionLocal() as db:
+        job = ReindexJob(model_name=model, auto_cutover=auto_cutover)
+        db.add(job)
+        await db.commit()
+        print(f"job {job.id}")
+
+    if use_celery:
+        from app.tasks.reindex_tasks import reindex_embeddings_task
+        reindex_embeddings_task.delay(str(job.id))
+        print("queued on the bulk queue")
+    else:
+        await resume(str(job.id))
+
+
+async def resume(job_id: str):
+    async with AsyncSessionLocal() as db:
+        job = await run_reindex(db, job_id, on_progress=print_progress)
+        print_progress(job)
+        print()
+
+
+async def status(job_id: str):
+    async with AsyncSessionLocal() as db:
+        job = await db.get(ReindexJob, job_id)
+        if job is None:
+            sys.exit(f"job {job_id} not found")
+        print_progress(job)
+        print()
+        if job.error:
+            print(f"error: {job.error}")
+
+
+async def run_cutover(job_id: str):
+    async with AsyncSessionLocal() as db:
+        job = await db.get(ReindexJob, job_id)
+        if job is None:
+            sys.exit(f"job {job_id} not found")
+        await cutover(db, job)
+        print(f"cutover done; set HUGGINGFACE_MODEL={job.model_name} and restart API and workers")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    start_parser = commands.add_parser("start")
+    start_parser.add_argument("--model", required=True)
+    start_parser.add_argument("--auto-cutover", action="store_true")
+    start_parser.add_argument("--celery", action="store_true", help="run as a Celery job instead of in this process")
+
+    for name in ("resume", "status", "cutover"):
+        commands.add_parser(name).add_argument("job_id")
+
+    args = parser.parse_args()
+    if args.command == "start":
+        asyncio.run(start(args.model, args.auto_cutover, args.celery))
+    elif args.command == "resume":
+        asyncio.run(resume(args.job_id))
+    elif args.command == "status":
+        asyncio.run(status(args.job_id))
+    else:
+        asyncio.run(run_cutover(args.job_id))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,46 @@
+import uuid
+from datetime import datetime
+from sqlalchemy import Boolean, Column, DateTime, Integer, JSON, MetaData, String, Table
+from app.services.bulk_writer import _complete_rows
+
+table = Table(
+    "items",
+    MetaData(),
+    Column("id", String, default=lambda context: str(uuid.uuid4())),
+    Column("name", String),
+    Column("note", String),
+    Column("is_active", Boolean, default=True),
+    Column("tags", JSON, default=[]),
+    Column("version", Integer, default=1),
+    Column("created_at", DateTime, default=datetime.utcnow),
+)
+
+
+def test_fills_scalar_and_callable_defaults():
+    rows = _complete_rows(table, [{"name": "a"}])
+
+    row = rows[0]
+    assert row["name"] == "a"
+    assert row["is_active"] is True
+    assert row["tags"] == []
+    assert row["version"] == 1
+    assert isinstance(row["created_at"], datetime)
+    assert uuid.UUID(row["id"])
+    # Columns without a default are left out when no row provides them
+    assert "note" not in row
+
+
+def test_every_row_gets_the_same_keys():
+    rows = _complete_rows(table, [{"name": "a", "note": "x"}, {"name": "b"}])
+
+    assert rows[0].keys() == rows[1].keys()
+    assert rows[1]["note"] is None
+    assert rows[0]["id"] != rows[1]["id"]
+    assert rows[0]["created_at"] == rows[1]["created_at"]
+
+
+def test_provided_values_win_over_defaults():
+    rows = _complete_rows(table, [{"id": "fixed", "name": "a", "version": 3}])
+
+    assert rows[0]["id"] == "fixed"
+    assert rows[0]["version"] == 3
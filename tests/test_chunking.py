@@ -0,0 +1,75 @@
+from app.core.config import settings
+from app.services.chunking import StreamingChunker, chunk_text, content_defined_windows, embedding_word_limit
+from app.services.document_processor import join_blocks
+
+
+def _text(sentences=300):
+    sentence = "The supplier shall deliver the goods within thirty days of the order."
+    return "\n\n".join(" ".join([sentence] * (1 + i % 4)) for i in range(sentences // 4))
+
+
+def _blocks():
+    sentence = "The supplier shall deliver the goods within thirty days of the order."
+    return [
+        {"text": " ".join([sentence] * (5 + i % 7)), "metadata": {"page": i + 1}}
+        for i in range(40)
+    ]
+
+
+def _paragraphs(count, words=40):
+    return [" ".join(f"p{i}w{j}" for j in range(words)) + "." for i in range(count)]
+
+
+def test_streaming_chunker_matches_chunk_text():
+    blocks = _blocks()
+    chunker = StreamingChunker(max_tokens=60, overlap_tokens=10)
+    streamed = []
+    for block in blocks:
+        streamed.extend(chunker.feed(block))
+    streamed.extend(chunker.finish())
+
+    text, spans = join_blocks(blocks)
+    assert chunker.text == text
+    assert chunker.spans == spans
+    assert streamed == chunk_text(text, max_tokens=60, overlap_tokens=10, spans=spans)
+
+
+def test_chunks_respect_token_limit_and_overlap():
+    text = _text()
+    chunks = chunk_text(text, max_tokens=50, overlap_tokens=8)
+
+    assert all(chunk["token_count"] <= 50 for chunk in chunks)
+    assert all(text[chunk["start_offset"]:chunk["end_offset"]] == chunk["content"] for chunk in chunks)
+    for previous, current in zip(chunks, chunks[1:]):
+        assert current["start_offset"] < previous["end_offset"]
+
+
+def test_default_chunk_size_fits_embedding_model():
+    limit = embedding_word_limit()
+    text = " ".join(f"word{i}" for i in range(1000))
+
+    assert limit <= (settings.EMBEDDING_MAX_SEQ_LENGTH - 2) / settings.CHUNK_WORDPIECES_PER_WORD
+    assert max(chunk["token_count"] for chunk in chunk_text(text)) == min(settings.CHUNK_MAX_TOKENS, limit)
+
+
+def test_content_defined_windows_realign_after_an_edit():
+    paragraphs = _paragraphs(60)
+    original = content_defined_windows("\n\n".join(paragraphs), max_tokens=400, min_tokens=100)
+
+    edited = list(paragraphs)
+    edited[5] = "An inserted clause about late payment penalties. " + edited[5]
+    changed = content_defined_windows("\n\n".join(edited), max_tokens=400, min_tokens=100)
+
+    differing = set(original) ^ set(changed)
+    assert len(original) > 3
+    # Only the window holding the edit differs; every later window is reused
+    assert len(set(original) - set(changed)) == 1
+    assert len(differing) == 2
+    assert original[-1] == changed[-1]
+
+
+def test_content_defined_windows_split_oversized_paragraphs():
+    paragraph = " ".join(f"w{i}" for i in range(250))
+    windows = content_defined_windows(paragraph, max_tokens=100, min_tokens=20)
+
+    assert [len(window.split()) for window in windows] == [100, 100, 50]
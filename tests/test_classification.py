@@ -0,0 +1,67 @@
+import pytest
+from app.core.config import settings
+from app.services import classification
+from app.services.classification import classify_tiered
+from app.services.ml_service import KeywordClassifier
+
+
+@pytest.fixture
+def keyword_classifier(monkeypatch):
+    classifier = KeywordClassifier({
+        "contract": ["agreement", "party", "termination"],
+        "invoice": ["invoice", "amount due", "payment"],
+    })
+    monkeypatch.setattr(classification, "get_local_classifier", lambda *paths: classifier)
+    return classifier
+
+
+@pytest.fixture
+def llm_calls(monkeypatch):
+    calls = []
+
+    async def classify_document(filename, preview):
+        calls.append(filename)
+        return "invoice"
+
+    monkeypatch.setattr(classification, "classify_document", classify_document)
+    return calls
+
+
+def test_keyword_probabilities_are_smoothed_and_sum_to_one():
+    classifier = KeywordClassifier({"contract": ["agreement"], "invoice": ["invoice"]})
+
+    proba = classifier.predict_proba("This agreement and that Agreement")
+
+    assert proba == pytest.approx({"contract": 0.75, "invoice": 0.25})
+    assert classifier.predict_proba("no keywords here") == {"contract": 0.5, "invoice": 0.5}
+
+
+async def test_confident_local_prediction_skips_llm(keyword_classifier, llm_calls, monkeypatch):
+    monkeypatch.setattr(settings, "LOCAL_CLASSIFIER_CONFIDENCE_THRESHOLD", 0.6)
+
+    decision = await classify_tiered("msa.pdf", "This agreement binds each party until termination.")
+
+    assert decision["document_type"] == "contract"
+    assert decision["path"] == "local"
+    assert decision["confidence"] == pytest.approx(0.8)
+    assert llm_calls == []
+
+
+async def test_low_confidence_falls_back_to_llm(keyword_classifier, llm_calls, monkeypatch):
+    monkeypatch.setattr(settings, "LOCAL_CLASSIFIER_CONFIDENCE_THRESHOLD", 0.9)
+
+    decision = await classify_tiered("msa.pdf", "This agreement binds each party until termination.")
+
+    assert decision["document_type"] == "invoice"
+    assert decision["path"] == "llm_fallback"
+    assert decision["local_label"] == "contract"
+    assert llm_calls == ["msa.pdf"]
+
+
+async def test_without_local_model_uses_llm(llm_calls, monkeypatch):
+    monkeypatch.setattr(classification, "get_local_classifier", lambda *paths: None)
+
+    decision = await classify_tiered("scan.pdf", "text")
+
+    assert decision["path"] == "llm"
+    assert decision["local_confidence"] is None
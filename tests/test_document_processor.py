@@ -0,0 +1,48 @@
+import io
+from app.services.document_processor import iter_plain_text_blocks
+
+
+def decode(data: bytes):
+    blocks = list(iter_plain_text_blocks(io.BytesIO(data), block_chars=4000))
+    text = "".join(block["text"] for block in blocks)
+    errors = [block["metadata"] for block in blocks if block["metadata"].get("error")]
+    return text, errors
+
+
+def test_utf8_after_an_ascii_sample_window_round_trips():
+    tail = "Payment: 1.200 € to Müller"
+    text, errors = decode(b"Contract terms\n" * 4000 + tail.encode("utf-8"))
+
+    assert text.endswith(tail)
+    assert "�" not in text
+    assert errors == []
+
+
+def test_multibyte_character_on_the_read_boundary_round_trips():
+    data = ("a" * 65535 + "é").encode("utf-8")
+
+    text, errors = decode(data)
+
+    assert text == "a" * 65535 + "é"
+    assert errors == []
+
+
+def test_short_cp1252_text_is_not_misdetected():
+    text, errors = decode("Die Lieferung erfolgt über die Straße.".encode("cp1252"))
+
+    assert text == "Die Lieferung erfolgt über die Straße."
+    assert errors == []
+
+
+def test_undecodable_bytes_past_the_sample_are_reported():
+    prefix = "Die Lieferung erfolgt über die Straße.\n" * 2000
+    text, errors = decode(prefix.encode("cp1252") + b"\x81")
+
+    assert text == prefix + "\ufffd"
+    assert errors == [{"line": 1, "encoding": "cp1252", "error": "1 undecodable characters replaced"}]
+
+
+def test_utf8_byte_order_mark_is_dropped():
+    text, _ = decode("\ufeffNet 30 days".encode("utf-8"))
+
+    assert text == "Net 30 days"
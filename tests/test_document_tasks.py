@@ -0,0 +1,95 @@
+import pytest
+from app.core.config import settings
+from app.tasks import document_tasks
+from app.tasks.document_tasks import ParentVersionPending, process_document_task
+
+
+class FakeRunner:
+    # Stands in for run_async: each call takes the next outcome instead of touching the database
+    def __init__(self, outcomes):
+        self.outcomes = list(outcomes)
+        self.calls = 0
+
+    def __call__(self, coro):
+        coro.close()
+        self.calls += 1
+        outcome = self.outcomes.pop(0)
+        if isinstance(outcome, BaseException):
+            raise outcome
+        return outcome
+
+
+@pytest.fixture
+def finalized(monkeypatch):
+    batches = []
+    monkeypatch.setattr(document_tasks.finalize_batch_task, "delay", batches.append)
+    return batches
+
+
+def test_waiting_for_parent_does_not_spend_failure_retries(monkeypatch, finalized):
+    waits = settings.DOCUMENT_TASK_MAX_RETRIES + 2
+    runner = FakeRunner(
+        [ParentVersionPending("parent busy")] * waits
+        + [RuntimeError("flaky")] * settings.DOCUMENT_TASK_MAX_RETRIES
+        + ["batch-1"]
+    )
+    monkeypatch.setattr(document_tasks, "run_async", runner)
+
+    result = process_document_task.apply(args=["doc-1"])
+
+    assert result.successful()
+    assert runner.calls == waits + settings.DOCUMENT_TASK_MAX_RETRIES + 1
+    assert finalized == ["batch-1"]
+
+
+def test_parent_wait_interval_backs_off_to_a_cap(monkeypatch):
+    countdowns = []
+    original_retry = process_document_task.retry
+
+    def retry(*args, **kwargs):
+        countdowns.append(kwargs["countdown"])
+        return original_retry(*args, **kwargs)
+
+    monkeypatch.setattr(process_document_task, "retry", retry)
+    monkeypatch.setattr(document_tasks, "run_async", FakeRunner([ParentVersionPending("busy")] * 6 + [None]))
+
+    assert process_document_task.apply(args=["doc-1"]).successful()
+    assert countdowns == [
+        min(settings.DOCUMENT_PARENT_WAIT_SECONDS * 2 ** i, settings.DOCUMENT_PARENT_WAIT_MAX_INTERVAL_SECONDS)
+        for i in range(6)
+    ]
+
+
+def test_real_failures_keep_their_retry_budget(monkeypatch, finalized):
+    # The last outcome is the on_failure hook marking the document FAILED
+    runner = FakeRunner([RuntimeError("down")] * (settings.DOCUMENT_TASK_MAX_RETRIES + 1) + [None])
+    monkeypatch.setattr(document_tasks, "run_async", runner)
+
+    result = process_document_task.apply(args=["doc-1"])
+
+    assert result.failed()
+    assert runner.calls == settings.DOCUMENT_TASK_MAX_RETRIES + 2
+    assert finalized == []
+
+
+def test_exhausted_retries_still_finalize_the_batch(monkeypatch, finalized):
+    monkeypatch.setattr(
+        document_tasks,
+        "run_async",
+        FakeRunner([ConnectionError("db down")] * (settings.DOCUMENT_TASK_MAX_RETRIES + 1) + ["batch-1"])
+    )
+
+    assert process_document_task.apply(args=["doc-1"]).failed()
+    assert finalized == ["batch-1"]
+
+
+def test_bulk_dispatched_failures_finalize_the_batch(monkeypatch, finalized):
+    # The fair-queue pump sends positional (document_id, file_key) args
+    monkeypatch.setattr(
+        document_tasks,
+        "run_async",
+        FakeRunner([RuntimeError("down")] * (settings.DOCUMENT_TASK_MAX_RETRIES + 1) + ["batch-1"])
+    )
+
+    assert process_document_task.apply(args=["doc-1", "uploads/doc-1.pdf"]).failed()
+    assert finalized == ["batch-1"]
@@ -0,0 +1,55 @@
+import fakeredis
+import pytest
+from redis.exceptions import RedisError
+from app.services import embedding_cache as embedding_cache_module
+from app.services.embedding_cache import EmbeddingCache
+
+
+@pytest.fixture
+def redis(monkeypatch):
+    client = fakeredis.FakeAsyncRedis(server=fakeredis.FakeServer())
+
+    async def get_redis_binary():
+        return client
+
+    monkeypatch.setattr(embedding_cache_module, "get_redis_binary", get_redis_binary)
+    return client
+
+
+async def test_local_tier_keeps_most_recently_used_entries(redis):
+    cache = EmbeddingCache("model", max_local_entries=2)
+
+    await cache.set_many(["a", "b"], [[1.0], [2.0]])
+    await cache.get_many(["a"])
+    await cache.set_many(["c"], [[3.0]])
+
+    assert list(cache._local) == [cache.key("a"), cache.key("c")]
+    assert cache.stats()["local_entries"] == 2
+
+
+async def test_local_miss_is_served_from_redis_and_promoted(redis):
+    cache = EmbeddingCache("model", max_local_entries=1)
+    await cache.set_many(["a", "b"], [[1.0, 0.5], [2.0, 0.5]])
+
+    assert await cache.get_many(["a", "b", "c"]) == [[1.0, 0.5], [2.0, 0.5], None]
+    assert (cache.local_hits, cache.redis_hits, cache.misses) == (1, 1, 1)
+    assert list(cache._local) == [cache.key("a")]
+
+
+def test_keys_ignore_whitespace_and_separate_models():
+    cache = EmbeddingCache("model")
+
+    assert cache.key("net  30\n days") == cache.key("net 30 days")
+    assert cache.key("net 30 days") != EmbeddingCache("other-model").key("net 30 days")
+
+
+async def test_redis_errors_count_as_misses(redis, monkeypatch):
+    cache = EmbeddingCache("model", max_local_entries=0)
+
+    async def failing_mget(keys):
+        raise RedisError("down")
+
+    monkeypatch.setattr(redis, "mget", failing_mget)
+
+    assert await cache.get_many(["a"]) == [None]
+    assert cache.misses == 1
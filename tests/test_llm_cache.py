@@ -0,0 +1,70 @@
+import fakeredis
+import pytest
+from app.core.config import settings
+from app.services import llm_cache as llm_cache_module
+from app.services.llm_cache import LLMResponseCache, _BYTES_KEY, _INDEX_KEY, _SIZES_KEY
+
+
+@pytest.fixture
+def redis(monkeypatch):
+    client = fakeredis.FakeAsyncRedis(server=fakeredis.FakeServer(), decode_responses=True)
+
+    async def get_redis():
+        return client
+
+    monkeypatch.setattr(llm_cache_module, "get_redis", get_redis)
+    return client
+
+
+async def test_setting_same_key_twice_charges_size_once(redis):
+    cache = LLMResponseCache()
+
+    await cache.set("llm:a", "x" * 100, temperature=0.0)
+    await cache.set("llm:a", "x" * 100, temperature=0.0)
+
+    assert int(await redis.get(_BYTES_KEY)) == 100
+
+
+async def test_resetting_key_charges_size_difference(redis):
+    cache = LLMResponseCache()
+
+    await cache.set("llm:a", "x" * 100, temperature=0.0)
+    await cache.set("llm:a", "x" * 40, temperature=0.0)
+
+    assert int(await redis.get(_BYTES_KEY)) == 40
+    assert int(await redis.hget(_SIZES_KEY, "llm:a")) == 40
+
+
+async def test_evicts_least_recently_used_down_to_target(redis, monkeypatch):
+    monkeypatch.setattr(settings, "LLM_CACHE_MAX_BYTES", 300)
+    monkeypatch.setattr(settings, "LLM_CACHE_EVICT_TO_RATIO", 1.0)
+    cache = LLMResponseCache()
+
+    for name in ("a", "b", "c"):
+        await cache.set(f"llm:{name}", "x" * 100, temperature=0.0)
+    assert await cache.get("llm:a") is not None
+    await cache.set("llm:d", "x" * 100, temperature=0.0)
+
+    assert await redis.exists("llm:b") == 0
+    assert await redis.exists("llm:a") == 1
+    assert int(await redis.get(_BYTES_KEY)) == 300
+    assert cache.evictions == 1
+
+
+async def test_eviction_clears_expired_entries_and_reconciles_counter(redis, monkeypatch):
+    monkeypatch.setattr(settings, "LLM_CACHE_MAX_BYTES", 250)
+    monkeypatch.setattr(settings, "LLM_CACHE_EVICT_TO_RATIO", 1.0)
+    cache = LLMResponseCache()
+
+    await cache.set("llm:a", "x" * 100, temperature=0.0)
+    await cache.set("llm:b", "x" * 100, temperature=0.0)
+    # Expired response and a drifted counter
+    await redis.delete("llm:a")
+    await redis.incrby(_BYTES_KEY, 1000)
+
+    await cache.set("llm:c", "x" * 100, temperature=0.0)
+
+    assert cache.expired == 1
+    assert cache.evictions == 0
+    assert await redis.zcard(_INDEX_KEY) == 2
+    assert int(await redis.get(_BYTES_KEY)) == 200
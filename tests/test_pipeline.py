@@ -0,0 +1,73 @@
+import asyncio
+import pytest
+from app.services.pipeline import Stage, run_stages
+
+
+async def test_stages_run_after_their_dependencies():
+    order = []
+
+    def stage(name, depends_on=(), delay=0.0):
+        async def run(results):
+            await asyncio.sleep(delay)
+            order.append(name)
+            return sorted(results)
+        return Stage(name, run, depends_on=depends_on)
+
+    # Listed out of order on purpose
+    results, timings = await run_stages([
+        stage("knowledge", depends_on=["extract", "classify"]),
+        stage("summarize", depends_on=["extract"], delay=0.05),
+        stage("classify", depends_on=["extract"]),
+        stage("extract"),
+    ])
+
+    assert order.index("extract") < order.index("classify") < order.index("knowledge")
+    # summarize does not hold up knowledge; being slower, it finishes last
+    assert order[-1] == "summarize"
+    assert results["knowledge"] == ["classify", "extract"]
+    assert set(timings) == {"extract", "summarize", "classify", "knowledge"}
+
+
+async def test_on_complete_runs_once_per_stage_in_completion_order():
+    completed = []
+
+    async def value(results):
+        return len(results)
+
+    async def on_complete(name, result):
+        completed.append((name, result))
+
+    await run_stages([Stage("a", value), Stage("b", value, depends_on=["a"])], on_complete=on_complete)
+
+    assert completed == [("a", 0), ("b", 1)]
+
+
+async def test_failure_cancels_pending_stages():
+    started = []
+
+    async def fail(results):
+        raise RuntimeError("boom")
+
+    async def slow(results):
+        started.append("slow")
+        await asyncio.sleep(10)
+
+    async def after(results):
+        started.append("after")
+
+    with pytest.raises(RuntimeError):
+        await asyncio.wait_for(
+            run_stages([Stage("fail", fail), Stage("slow", slow), Stage("after", after, depends_on=["fail"])]),
+            timeout=2
+        )
+    assert "after" not in started
+
+
+async def test_rejects_cycles_and_unknown_dependencies():
+    async def noop(results):
+        return None
+
+    with pytest.raises(ValueError, match="cycle"):
+        await run_stages([Stage("a", noop, depends_on=["b"]), Stage("b", noop, depends_on=["a"])])
+    with pytest.raises(ValueError, match="unknown"):
+        await run_stages([Stage("a", noop, depends_on=["missing"])])
@@ -0,0 +1,26 @@
+from collections import namedtuple
+from app.services.retrieval import reciprocal_rank_fusion
+
+Row = namedtuple("Row", ["id", "source"])
+
+
+def test_rows_ranked_well_in_both_lists_come_first():
+    vector = [Row("a", "vector"), Row("b", "vector"), Row("c", "vector")]
+    lexical = [Row("b", "lexical"), Row("d", "lexical"), Row("a", "lexical")]
+
+    fused = reciprocal_rank_fusion([vector, lexical], limit=10, k=60)
+
+    assert [row.id for row in fused] == ["b", "a", "d", "c"]
+
+
+def test_first_ranking_supplies_the_row_and_limit_applies():
+    vector = [Row("a", "vector"), Row("b", "vector")]
+    lexical = [Row("a", "lexical")]
+
+    fused = reciprocal_rank_fusion([vector, lexical], limit=1, k=60)
+
+    assert fused == [Row("a", "vector")]
+
+
+def test_empty_rankings():
+    assert reciprocal_rank_fusion([[], []], limit=5, k=60) == []
@@ -0,0 +1,55 @@
+import fakeredis
+import pytest
+from redis.exceptions import RedisError
+from app.core.celery_app import QUEUE_BULK, QUEUE_SCHEDULED
+from app.services import task_queues
+from app.services.task_queues import enqueue_bulk, _ACTIVE_KEY, _RING_KEY, _TENANT_PREFIX
+
+
+@pytest.fixture
+def sent(monkeypatch):
+    calls = []
+    monkeypatch.setattr(
+        task_queues.celery_app,
+        "send_task",
+        lambda name, args=None, queue=None: calls.append((name, args, queue))
+    )
+    return calls
+
+
+@pytest.fixture
+def redis(monkeypatch):
+    client = fakeredis.FakeAsyncRedis(server=fakeredis.FakeServer(), decode_responses=True)
+
+    async def get_redis():
+        return client
+
+    monkeypatch.setattr(task_queues, "get_redis", get_redis)
+    return client
+
+
+async def test_enqueues_all_jobs_with_one_pump(redis, sent):
+    await enqueue_bulk("process", [("a", [1]), ("b", [2]), ("a", [3])])
+
+    assert await redis.lrange(_RING_KEY, 0, -1) == ["a", "b"]
+    assert await redis.smembers(_ACTIVE_KEY) == {"a", "b"}
+    assert await redis.llen(f"{_TENANT_PREFIX}a") == 2
+    assert await redis.llen(f"{_TENANT_PREFIX}b") == 1
+    assert sent == [("app.tasks.queue_tasks.pump_bulk_queue", None, QUEUE_SCHEDULED)]
+
+
+async def test_redis_error_sends_jobs_directly(redis, sent, monkeypatch):
+    async def failing_eval(*args, **kwargs):
+        raise RedisError("down")
+
+    monkeypatch.setattr(redis, "eval", failing_eval)
+
+    await enqueue_bulk("process", [("a", [1]), ("b", [2])])
+
+    assert sent == [("process", [1], QUEUE_BULK), ("process", [2], QUEUE_BULK)]
+
+
+async def test_empty_job_list_sends_nothing(redis, sent):
+    await enqueue_bulk("process", [])
+
+    assert sent == []
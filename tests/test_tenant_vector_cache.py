@@ -0,0 +1,116 @@
+from collections import namedtuple
+import fakeredis
+import numpy as np
+import pytest
+from app.core.vectors import EMBEDDING_DIMENSION
+from app.models.knowledge_entry import KnowledgeType, RiskLevel
+from app.services import tenant_vector_cache as cache_module
+from app.services.tenant_vector_cache import TenantVectorCache, bump_all_tenant_versions, bump_tenant_version
+
+Record = namedtuple("Record", ["id", "title", "content", "knowledge_type", "risk_level", "deadline", "embedding"])
+MATRIX_BYTES = EMBEDDING_DIMENSION * 4
+
+
+class FakeResult:
+    def __init__(self, records):
+        self.records = records
+
+    def all(self):
+        return self.records
+
+
+class FakeSession:
+    def __init__(self, rows: int):
+        self.rows = rows
+        self.loads = 0
+
+    async def scalar(self, statement):
+        return self.rows
+
+    async def execute(self, statement):
+        self.loads += 1
+        records = [
+            Record(i, "t", "c", KnowledgeType.RISK, RiskLevel.HIGH if i == 0 else None, None,
+                   np.eye(EMBEDDING_DIMENSION, dtype=np.float32)[i])
+            for i in range(self.rows)
+        ]
+        return FakeResult(records)
+
+
+@pytest.fixture
+def redis(monkeypatch):
+    client = fakeredis.FakeAsyncRedis(server=fakeredis.FakeServer(), decode_responses=True)
+
+    async def get_redis():
+        return client
+
+    monkeypatch.setattr(cache_module, "get_redis", get_redis)
+    return client
+
+
+def query(index: int):
+    return np.eye(EMBEDDING_DIMENSION)[index].tolist()
+
+
+async def test_hits_carry_enum_names_like_the_sql_path(redis):
+    cache = TenantVectorCache(max_bytes=10 * MATRIX_BYTES, max_tenant_rows=10, max_age_seconds=60)
+
+    hits = await cache.search(FakeSession(2), "t1", query(1), limit=2)
+
+    assert [hit.id for hit in hits] == [1, 0]
+    assert hits[0].distance == pytest.approx(0.0)
+    assert (hits[1].knowledge_type, hits[1].risk_level) == ("RISK", "HIGH")
+    assert hits[0].risk_level is None
+
+
+async def test_byte_budget_evicts_least_recently_used_tenant(redis):
+    # Room for two one-row tenants (matrix plus title and content bytes), not three
+    cache = TenantVectorCache(max_bytes=2 * (MATRIX_BYTES + 2), max_tenant_rows=10, max_age_seconds=60)
+    for tenant in ("t1", "t2"):
+        await cache.search(FakeSession(1), tenant, query(0), limit=1)
+    await cache.search(FakeSession(1), "t1", query(0), limit=1)
+    await cache.search(FakeSession(1), "t3", query(0), limit=1)
+
+    stats = cache.stats()
+    assert list(cache._entries) == ["t1", "t3"]
+    assert stats["bytes"] == 2 * (MATRIX_BYTES + 2)
+    assert (stats["hits"], stats["loads"], stats["evictions"]) == (1, 3, 1)
+    assert "t2" not in cache._load_locks
+
+
+async def test_version_bump_reloads_tenant(redis):
+    cache = TenantVectorCache(max_bytes=10 * MATRIX_BYTES, max_tenant_rows=10, max_age_seconds=60)
+    session = FakeSession(1)
+
+    await cache.search(session, "t1", query(0), limit=1)
+    await cache.search(session, "t1", query(0), limit=1)
+    await bump_tenant_version("t1")
+    await cache.search(session, "t1", query(0), limit=1)
+
+    assert session.loads == 2
+    assert cache.stats()["bytes"] == MATRIX_BYTES + 2
+
+
+async def test_epoch_bump_reloads_every_tenant(redis):
+    cache = TenantVectorCache(max_bytes=10 * MATRIX_BYTES, max_tenant_rows=10, max_age_seconds=60)
+    sessions = {"t1": FakeSession(1), "t2": FakeSession(1)}
+
+    for company_id, session in sessions.items():
+        await cache.search(session, company_id, query(0), limit=1)
+    await bump_all_tenant_versions()
+    for company_id, session in sessions.items():
+        await cache.search(session, company_id, query(0), limit=1)
+
+    assert [session.loads for session in sessions.values()] == [2, 2]
+
+
+async def test_oversized_tenants_fall_back_and_are_bounded(redis, monkeypatch):
+    monkeypatch.setattr(cache_module, "MAX_OVERSIZED_TENANTS", 2)
+    cache = TenantVectorCache(max_bytes=10 * MATRIX_BYTES, max_tenant_rows=1, max_age_seconds=60)
+
+    for tenant in ("t1", "t2", "t3"):
+        assert await cache.search(FakeSession(5), tenant, query(0), limit=1) is None
+
+    assert list(cache._oversized) == ["t2", "t3"]
+    assert cache._load_locks == {}
+    assert cache.stats()["fallbacks"] == 3
@@ -0,0 +1,49 @@
+import asyncio
+import os
+import signal
+import pytest
+from app.core import worker_runtime
+
+
+class FakeSoftTimeLimit(Exception):
+    pass
+
+
+@pytest.fixture
+def started(monkeypatch):
+    monkeypatch.setattr(worker_runtime, "_started_pid", os.getpid())
+    yield
+    loop = worker_runtime.get_loop()
+    loop.close()
+
+
+def test_interrupted_task_does_not_resume_in_next_run(started):
+    progress = []
+
+    async def slow_task():
+        await asyncio.sleep(0.3)
+        progress.append("resumed")
+
+    def raise_soft_limit(signum, frame):
+        raise FakeSoftTimeLimit()
+
+    previous = signal.signal(signal.SIGALRM, raise_soft_limit)
+    try:
+        signal.setitimer(signal.ITIMER_REAL, 0.05)
+        with pytest.raises(FakeSoftTimeLimit):
+            worker_runtime.run_async(slow_task())
+    finally:
+        signal.setitimer(signal.ITIMER_REAL, 0)
+        signal.signal(signal.SIGALRM, previous)
+
+    worker_runtime.run_async(asyncio.sleep(0.5))
+
+    assert progress == []
+    assert not asyncio.all_tasks(worker_runtime.get_loop())
+
+
+def test_returns_coroutine_result(started):
+    async def answer():
+        return 42
+
+    assert worker_runtime.run_async(answer()) == 42